@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Benchmark the memory-mapped pcap reader.
+
+Builds a capture of the requested size by repeating the packets of the
+bundled sample capture (security_assessment/network/traffic_capture.pcap)
+and reports analysis time, throughput and peak Python memory. The raw
+read speed of the same file is printed for comparison.
+
+    python3 benchmarks/bench_pcap_reader.py --size-mb 64 512
+"""
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+from modules.parsers.pcap import analyze_capture
+
+SAMPLE = os.path.join(ROOT, 'security_assessment', 'network', 'traffic_capture.pcap')
+
+
+def write_capture(path, size_mb):
+    with open(SAMPLE, 'rb') as f:
+        sample = f.read()
+    header, records = sample[:24], sample[24:]
+    target = size_mb * 1024 * 1024
+    endian = '<' if header[:4] == b'\xd4\xc3\xb2\xa1' else '>'
+    with open(path, 'wb') as f:
+        f.write(header)
+        written, round_no = 24, 0
+        while written < target:
+            # Shift timestamps so the repeated packets read as one long capture
+            offset = 0
+            chunk = bytearray(records)
+            while offset + 16 <= len(chunk):
+                seconds, _, caplen, _ = struct.unpack_from(endian + 'IIII', chunk, offset)
+                struct.pack_into(endian + 'I', chunk, offset, seconds + round_no * 10)
+                offset += 16 + caplen
+            f.write(chunk)
+            written += len(chunk)
+            round_no += 1
+
+
+def read_speed(path):
+    start = time.perf_counter()
+    with open(path, 'rb') as f:
+        while f.read(8 * 1024 * 1024):
+            pass
+    return os.path.getsize(path) / (time.perf_counter() - start)
+
+
+def bench(size_mb):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'capture.pcap')
+        write_capture(path, size_mb)
+        size = os.path.getsize(path)
+
+        start = time.perf_counter()
+        summary = analyze_capture(path)
+        elapsed = time.perf_counter() - start
+        disk = read_speed(path)
+
+        # Separate traced pass: tracemalloc would distort the timing above
+        tracemalloc.start()
+        analyze_capture(path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    print(f"{size / 1024 / 1024:>7.0f} MB  {summary.packets:>10} packets  {elapsed:>7.2f}s  "
+          f"{summary.packets / elapsed:>9.0f} pkt/s  {size / elapsed / 1024 / 1024:>7.1f} MB/s  "
+          f"(raw read {disk / 1024 / 1024:.0f} MB/s)  peak {peak / 1024 / 1024:.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the memory-mapped pcap reader')
+    parser.add_argument('--size-mb', type=int, nargs='+', default=[16, 128],
+                        help='Capture sizes to benchmark in MB (default: 16 128)')
+    args = parser.parse_args()
+    for size_mb in args.size_mb:
+        bench(size_mb)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming HTML report renderer.
+
+Fills a temporary findings store with synthetic findings, renders the
+report and reports render time, output size and peak Python memory.
+
+    python3 benchmarks/bench_report_renderer.py --findings 100000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from modules.findings_store import SEVERITY_ORDER, FindingsStore
+from modules.report_renderer import HTMLReportRenderer
+
+
+def synthetic_findings(count):
+    for i in range(count):
+        yield {
+            'tool': 'Nikto',
+            'type': 'Web Vulnerability',
+            'target': f"10.0.{(i >> 8) & 255}.{i & 255}",
+            'port': 80,
+            'path': f"/app/{i}",
+            'severity': SEVERITY_ORDER[i % len(SEVERITY_ORDER)],
+            'description': f"/app/{i}: <script>alert({i})</script> reflected & not escaped",
+        }
+
+
+def directory_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(root, f)) for f in files)
+    return total
+
+
+def bench(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FindingsStore(os.path.join(tmp, 'findings.db'))
+        store.ingest('synthetic', (0, 0, ''), {}, synthetic_findings(count), '2024-01-01 00:00:00')
+
+        report_file = os.path.join(tmp, 'report.html')
+        start = time.perf_counter()
+        HTMLReportRenderer(store).render(report_file, '2024-01-01 00:00:00')
+        elapsed = time.perf_counter() - start
+        size_mb = (directory_size(tmp) - os.path.getsize(os.path.join(tmp, 'findings.db'))) / 1024 / 1024
+
+        # Separate traced pass: tracemalloc would distort the timing above
+        tracemalloc.start()
+        HTMLReportRenderer(store).render(os.path.join(tmp, 'traced.html'), '2024-01-01 00:00:00')
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        store.close()
+
+    print(f"{count:>8} findings  {elapsed:>7.2f}s  {count / elapsed:>9.0f} findings/s  "
+          f"~{size_mb:>7.1f} MB written  peak {peak / 1024 / 1024:.2f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the streaming HTML report renderer')
+    parser.add_argument('--findings', type=int, nargs='+', default=[1000, 100000],
+                        help='Finding counts to benchmark (default: 1000 100000)')
+    args = parser.parse_args()
+    for count in args.findings:
+        bench(count)
+
+
+if __name__ == '__main__':
+    main()
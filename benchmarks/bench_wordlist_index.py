@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark the wordlist index build.
+
+Writes a synthetic wordlist with the requested number of lines, a skewed
+word frequency and many duplicates, then indexes it and reports build
+time, throughput and the growth of the process's peak RSS. Running it with
+two sizes shows that build memory does not grow with the list.
+
+    python3 benchmarks/bench_wordlist_index.py --lines 1000000 10000000
+"""
+import argparse
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.wordlists import WordlistManager
+
+
+def write_wordlist(path, lines):
+    rng = random.Random(lines)
+    with open(path, 'w') as f:
+        for _ in range(lines):
+            f.write(f"pw{int(rng.paretovariate(1.1))}_{rng.randrange(lines // 2)}\n")
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def bench(lines):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'wordlist.txt')
+        write_wordlist(path, lines)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        manager = WordlistManager(os.path.join(tmp, 'index'))
+
+        rss_before = peak_rss_mb()
+        start = time.perf_counter()
+        index = manager.index(path)
+        elapsed = time.perf_counter() - start
+
+        print(f"{lines:>10} lines  {size_mb:>7.1f} MB  {index.count:>10} unique  "
+              f"{elapsed:>7.2f}s  {lines / elapsed:>9.0f} lines/s  "
+              f"peak RSS +{max(0, peak_rss_mb() - rss_before):.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the wordlist index build')
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000000, 10000000],
+                        help='Wordlist sizes to benchmark (default: 1000000 10000000)')
+    args = parser.parse_args()
+    for lines in args.lines:
+        bench(lines)
+
+
+if __name__ == '__main__':
+    main()
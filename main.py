@@ -1,26 +1,29 @@
 #!/usr/bin/env python3
 
 import argparse
+import asyncio
 import os
 import sys
 import subprocess
 import time
 from datetime import datetime
-from urllib.parse import urlparse
+
+_STARTUP = time.perf_counter()
 
 # Import modules from local directories
 try:
-    from modules.web_scanner import WebScanner
-    from modules.api_tester import APITester
-    from modules.phishing_tools import PhishingAnalyzer
-    from modules.network_scanner import NetworkScanner
-    from modules.wireless_scanner import WirelessScanner
-    from modules.password_tools import PasswordTools
-    from modules.forensics_tools import ForensicsTools
-    from modules.exploitation import ExploitationTools
-    from modules.social_engineering import SocialEngineeringTools
+    import modules
+    from modules.registry import StagePlan
     from utils.tool_checker import check_required_tools, install_missing_tools, setup_environment
-    from modules.results_analyzer import ResultsAnalyzer, analyze_results
+    from utils.scheduler import StageScheduler
+    from utils.tool_runner import ToolRunner, set_runner
+    from utils.journal import RunJournal
+    from utils.result_cache import DEFAULT_MAX_BYTES, DEFAULT_TTL, ResultCache, set_cache
+    from utils.wordlists import WORDLISTS, WordlistManager, set_wordlists
+    from utils.batch import BatchRunner, DEFAULT_WORKERS, load_targets, parse_target
+    from utils.timings import Timings
+    from modules.results_analyzer import REPORT_FORMATS, ResultsAnalyzer, analyze_results
+    from modules.live_analysis import DEFAULT_LIVE_INTERVAL, LiveAnalysis
 except ImportError as e:
     print(f"[-] Error importing modules: {str(e)}")
     print("[-] Please ensure all required modules are in the correct directories:")
@@ -28,6 +31,9 @@ except ImportError as e:
     print("    - utils/")
     sys.exit(1)
 
+timings = Timings(_STARTUP)
+timings.record('Module imports', time.perf_counter() - _STARTUP)
+
 def print_banner():
     banner = """
     ╔═══════════════════════════════════════════╗
@@ -40,7 +46,8 @@ def print_banner():
 def check_and_install_tools():
     """Check and install all required tools"""
     print("[+] Checking required tools...")
-    missing_tools = check_required_tools()
+    with timings.phase('Tool availability check'):
+        missing_tools = check_required_tools()
     
     if missing_tools:
         print(f"[+] Installing missing tools: {', '.join(missing_tools)}")
@@ -51,13 +58,15 @@ def check_and_install_tools():
                 sys.exit(1)
     
     print("[+] Setting up environment...")
-    if not setup_environment():
+    with timings.phase('Environment setup'):
+        environment_ready = setup_environment()
+    if not environment_ready:
         print("[-] Failed to setup environment completely")
         response = input("Do you want to continue anyway? (y/n): ")
         if response.lower() != 'y':
             sys.exit(1)
 
-def create_output_structure(base_dir):
+def create_output_structure(base_dir, verbose=True):
     """Create output directory structure"""
     directories = [
         'web',
@@ -74,48 +83,156 @@ def create_output_structure(base_dir):
     for directory in directories:
         path = os.path.join(base_dir, directory)
         os.makedirs(path, exist_ok=True)
-        print(f"[+] Created directory: {path}")
+        if verbose:
+            print(f"[+] Created directory: {path}")
 
-def run_web_scans(web_scanner):
-    """Run all web-related scans"""
-    print("\n[+] Starting web vulnerability scans...")
-    
+def _parse_assignment(value, what, placeholder):
+    """Parse a NAME=N command line assignment with a positive integer value"""
     try:
-        print("[*] Running Nikto scan...")
-        web_scanner.run_nikto_scan()
-        
-        print("[*] Running SQLMap scan...")
-        web_scanner.run_sqlmap()
-        
-        print("[*] Running directory enumeration...")
-        web_scanner.run_dirb()
-        
-        print("[*] Running XSS tests...")
-        web_scanner.run_xsser()
-        
-    except Exception as e:
-        print(f"[-] Error during web scanning: {str(e)}")
+        name, number = value.split('=', 1)
+        number = int(number)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid {what} '{value}', expected {placeholder}=N")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"{what} for {name} must be at least 1")
+    return name, number
 
-def run_network_scans(network_scanner, interface):
-    """Run all network-related scans"""
-    print("\n[+] Starting network security assessment...")
-    
-    try:
-        print("[*] Running Nmap scan...")
-        network_scanner.run_nmap_scan()
-        
-        print(f"[*] Capturing network traffic on {interface}...")
-        network_scanner.capture_traffic(interface)
-        
-    except Exception as e:
-        print(f"[-] Error during network scanning: {str(e)}")
+def parse_stage_limit(value):
+    """Parse a CLASS=N stage concurrency limit"""
+    return _parse_assignment(value, 'stage limit', 'CLASS')
+
+def parse_tool_timeout(value):
+    """Parse a TOOL=SECONDS per-tool timeout"""
+    return _parse_assignment(value, 'tool timeout', 'TOOL')
+
+def parse_wordlist(value):
+    """Parse a NAME=PATH wordlist override"""
+    name, _, path = value.partition('=')
+    if not path or name not in WORDLISTS:
+        raise argparse.ArgumentTypeError(
+            f"invalid wordlist '{value}', expected NAME=PATH with NAME one of {', '.join(WORDLISTS)}")
+    return name, path
+
+def add_target_stages(scheduler, args, target, output_dir):
+    """Register the stages that assess a single target"""
+    interface = f"interface:{args.interface}"
+    plan = StagePlan(scheduler, {
+        'WebScanner': (target.url, output_dir),
+        'APITester': (args.api, output_dir),
+        'NetworkScanner': (target.host, output_dir),
+        'ExploitationTools': (output_dir,),
+    })
+
+    # Web Application Testing
+    if target.is_web:
+        plan.add('web.nikto')
+        plan.add('web.sqlmap')
+        plan.add('web.dirb')
+        plan.add('web.xsser')
+
+    # API Testing
+    if args.api:
+        plan.add('api.zap')
+
+    # Network Scanning
+    plan.add('network.nmap', args.nmap_workers, args.nmap_ports)
+    plan.add('network.capture', args.interface, args.capture_duration, args.capture_segment,
+             args.capture_budget, resources=[interface])
+    if not args.capture_segment:
+        # Ring captures analyze their segments while capturing
+        plan.add('network.pcap', depends_on=['network.capture'])
+
+    # Exploitation Testing
+    plan.add('exploitation.metasploit', target.host)
+    plan.add('exploitation.searchsploit', target.host)
+
+    return scheduler
+
+def add_global_stages(scheduler, args, output_dir):
+    """Register the stages that do not depend on a target"""
+    interface = f"interface:{args.interface}"
+    plan = StagePlan(scheduler, {
+        'WirelessScanner': (args.interface, output_dir),
+        'PasswordTools': (output_dir,),
+        'ForensicsTools': (output_dir,),
+        'SocialEngineeringTools': (output_dir,),
+    })
+
+    # Wireless Scanning takes the interface over and kills network managers,
+    # so it must not overlap with anything else
+    if args.wireless:
+        plan.add('wireless.aircrack', resources=[interface], exclusive=True)
+        plan.add('wireless.wifite', resources=[interface], exclusive=True,
+                 depends_on=['wireless.aircrack'])
+
+    # Password Testing
+    if args.password_file:
+        plan.add('password.prep', args.password_file)
+        plan.add('password.john', args.password_file, resources=['cracker'],
+                 depends_on=['password.prep'])
+        plan.add('password.hashcat', args.password_file, resources=['cracker'],
+                 depends_on=['password.john'])
+
+    # Forensics Analysis
+    if args.memory_dump:
+        plan.add('forensics.volatility', args.memory_dump, args.volatility_workers)
+    if args.forensics_image:
+        plan.add('forensics.triage', args.forensics_image)
+        plan.add('forensics.autopsy', args.forensics_image, depends_on=['forensics.triage'])
+
+    # Social Engineering Setup
+    plan.add('social_engineering.set')
+    plan.add('social_engineering.gophish')
+
+    return scheduler
+
+def record_import_times():
+    """Add the cost of lazily imported tool modules to the startup timings"""
+    for name, seconds in modules.import_times.items():
+        timings.record(f"import {name}", seconds)
 
-def analyze_results(output_dir):
+def start_live_analysis(args, output_dir, label=None):
+    """Follow tool output while the stages run, unless disabled"""
+    if args.no_live:
+        return None
+    return LiveAnalysis(output_dir, interval=args.live_interval, polling=args.live_polling, label=label).start()
+
+def new_scheduler(args, journal=None, journal_scope=''):
+    return StageScheduler(class_limits=dict(args.stage_limit), max_parallel=args.max_parallel,
+                          journal=journal, journal_scope=journal_scope)
+
+async def run_batch(args, targets, batch, journal=None):
+    """Run target-independent stages once, then every target through the worker pool"""
+    global_scheduler = add_global_stages(new_scheduler(args, journal), args, args.output)
+    await global_scheduler.execute()
+
+    async def assess(target):
+        output_dir = os.path.join(args.output, 'targets', target.slug)
+        create_output_structure(output_dir, verbose=False)
+        scheduler = add_target_stages(new_scheduler(args, journal, f"{target.slug}/"), args, target, output_dir)
+        live = start_live_analysis(args, output_dir, target.slug)
+        try:
+            await scheduler.execute()
+        finally:
+            if live:
+                await asyncio.to_thread(live.stop)
+        analyzer = ResultsAnalyzer(output_dir, workers=args.parse_workers)
+        return await asyncio.to_thread(analyzer.generate_report, args.format)
+
+    await batch.run(targets, assess)
+
+def analyze_results(output_dir, parse_workers=None, show_timings=False, formats=('html',), diff=None):
     """Analyze scan results and generate report"""
     print("\n[+] Analyzing scan results...")
-    analyzer = ResultsAnalyzer(output_dir)
-    report_file = analyzer.generate_report()
+    analyzer = ResultsAnalyzer(output_dir, workers=parse_workers)
+    report_file = analyzer.generate_report(formats)
+    if show_timings:
+        analyzer.print_parser_timings()
+    if diff is not None:
+        analyzer.diff_runs(*diff)
     print(f"[+] Analysis complete! Report saved to: {report_file}")
+    if not report_file or not report_file.endswith('.html'):
+        return
     
     # Open report in default browser
     try:
@@ -139,22 +256,79 @@ def main():
     parser = argparse.ArgumentParser(description='Kali Linux Security Testing Framework')
     
     # Required arguments
-    parser.add_argument('--url', required=True, help='Target URL')
+    scope = parser.add_mutually_exclusive_group()
+    scope.add_argument('--url', help='Target URL')
+    scope.add_argument('--targets-file', help='File with one URL, host or CIDR per line')
     
     # Optional arguments
     parser.add_argument('--api', help='API endpoint to test')
     parser.add_argument('--interface', default='eth0', help='Network interface for traffic capture')
+    parser.add_argument('--nmap-workers', type=int, default=4,
+                        help='Parallel nmap processes for the sharded port and service scans (default: 4)')
+    parser.add_argument('--nmap-ports', metavar='PORTS',
+                        help='Ports to scan, e.g. 1-65535 (default: the 1000 most common)')
+    parser.add_argument('--capture-duration', type=int, default=30,
+                        help='Seconds of traffic to capture (default: 30)')
+    parser.add_argument('--capture-segment', type=int, metavar='MB',
+                        help='Capture continuously into rotating segments of this size, analyzing each closed segment')
+    parser.add_argument('--capture-budget', type=int, metavar='MB', default=1024,
+                        help='Disk space for all capture segments together (default: 1024)')
     parser.add_argument('--output', default='security_assessment', help='Output directory')
     parser.add_argument('--wireless', action='store_true', help='Enable wireless scanning')
     parser.add_argument('--password-file', help='File containing hashes to crack')
     parser.add_argument('--forensics-image', help='Path to forensics image')
     parser.add_argument('--memory-dump', help='Path to memory dump file')
+    parser.add_argument('--volatility-workers', type=int, default=4,
+                        help='Volatility plugins run at once on the memory dump (default: 4)')
     parser.add_argument('--stealth', action='store_true', help='Enable stealth mode (slower but quieter)')
     parser.add_argument('--timeout', type=int, default=300, help='Timeout in seconds for each scan 	(default: 300)')
     parser.add_argument('--quick', action='store_true', help='Perform quick scans only')
     parser.add_argument('--report-only', action='store_true', help='Only analyze existing results without scanning')
+    parser.add_argument('--format', nargs='+', choices=REPORT_FORMATS, default=['html'],
+                        help='Report formats to write (default: html)')
+    parser.add_argument('--diff', type=int, nargs='*', metavar='RUN',
+                        help='Also write a diff report between two analysis runs '
+                             '(default: the previous run and this one)')
+    parser.add_argument('--max-parallel', type=int, help='Maximum number of stages running at once (default: unlimited)')
+    parser.add_argument('--stage-limit', type=parse_stage_limit, action='append', default=[],
+                        metavar='CLASS=N', help='Concurrency limit for a stage class, e.g. web=3 (repeatable)')
+    parser.add_argument('--tool-timeout', type=parse_tool_timeout, action='append', default=[],
+                        metavar='TOOL=SECONDS', help='Timeout for a single tool, e.g. nmap=1800 (repeatable)')
+    parser.add_argument('--global-timeout', type=int, help='Stop all tools after this many seconds')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Targets assessed concurrently in batch mode (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--timings', action='store_true', help='Report how long each startup phase and parser took')
+    parser.add_argument('--parse-workers', type=int,
+                        help='Processes used to parse tool output (default: one per CPU core)')
+    parser.add_argument('--no-live', action='store_true',
+                        help='Only analyze results after all stages finish instead of while tools write them')
+    parser.add_argument('--live-interval', type=float, default=DEFAULT_LIVE_INTERVAL, metavar='SECONDS',
+                        help=f'How often live analysis picks up new tool output (default: {DEFAULT_LIVE_INTERVAL:g})')
+    parser.add_argument('--live-polling', action='store_true',
+                        help='Watch tool output by polling instead of inotify')
+    parser.add_argument('--rate-limit', type=float, help='Maximum tool launches per second across all targets')
+    parser.add_argument('--resume', metavar='RUN_ID',
+                        help='Resume an interrupted run with its original options, skipping completed stages')
+    parser.add_argument('--wordlist', type=parse_wordlist, action='append', default=[], metavar='NAME=PATH',
+                        help=f"Use another wordlist, e.g. passwords=/path/list.txt (names: {', '.join(WORDLISTS)})")
+    parser.add_argument('--no-cache', action='store_true', help='Always rerun scans instead of reusing cached results')
+    parser.add_argument('--cache-ttl', type=float, default=DEFAULT_TTL / 3600,
+                        help=f'Hours a cached scan result stays valid (default: {DEFAULT_TTL // 3600})')
+    parser.add_argument('--cache-size', type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024),
+                        help=f'Size limit of the result cache in MB (default: {DEFAULT_MAX_BYTES // (1024 * 1024)})')
     
     args = parser.parse_args()
+    journal = None
+    if args.resume:
+        journal = RunJournal.open_existing(args.output, args.resume)
+        if journal is None or journal.argv is None:
+            parser.error(f"no run {args.resume} found in {args.output}")
+        args = parser.parse_args(journal.argv)
+        print(f"[+] Resuming run {journal.run_id}")
+    if not args.url and not args.targets_file:
+        parser.error('one of the arguments --url --targets-file is required')
+    if args.diff is not None and len(args.diff) not in (0, 2):
+        parser.error('--diff takes no run ids or exactly two (OLD NEW)')
     
     # Check for root privileges
     if os.geteuid() != 0:
@@ -163,75 +337,84 @@ def main():
         
     if args.report_only:
         if os.path.exists(args.output):
-            analyze_results(args.output)
+            analyze_results(args.output, args.parse_workers, args.timings, args.format, args.diff)
+            if args.timings:
+                record_import_times()
+                timings.print_report()
             sys.exit(0)
         else:
             print(f"[-] Output directory {args.output} not found!")
             sys.exit(1)
     
+    if args.targets_file:
+        targets = load_targets(args.targets_file)
+        if not targets:
+            print(f"[-] No valid targets found in {args.targets_file}")
+            sys.exit(1)
+        print(f"[+] Loaded {len(targets)} unique targets from {args.targets_file}")
+    else:
+        target = parse_target(args.url)
+        if target is None:
+            print(f"[-] Invalid target: {args.url}")
+            sys.exit(1)
+    
     # Check and install required tools
     check_and_install_tools()
     
     # Create output directory structure
-    create_output_structure(args.output)
+    with timings.phase('Output directory setup'):
+        create_output_structure(args.output)
+    
+    if journal is None:
+        journal = RunJournal(args.output)
+    journal.start(sys.argv[1:])
+    print(f"[*] Run id: {journal.run_id} (resume with --resume {journal.run_id})")
+
+    runner = set_runner(ToolRunner(default_timeout=args.timeout,
+                                   tool_timeouts=dict(args.tool_timeout),
+                                   global_timeout=args.global_timeout,
+                                   rate_limit=args.rate_limit))
+    set_cache(ResultCache(ttl=args.cache_ttl * 3600, max_bytes=args.cache_size * 1024 * 1024,
+                          enabled=not args.no_cache))
+    set_wordlists(WordlistManager(lists=dict(args.wordlist)))
+    
+    if args.targets_file:
+        batch = BatchRunner(args.workers)
+        try:
+            print("\n[+] Starting batch security assessment...")
+            asyncio.run(run_batch(args, targets, batch, journal))
+            if args.timings:
+                record_import_times()
+                timings.print_report()
+        except KeyboardInterrupt:
+            print("\n[-] Batch assessment interrupted by user.")
+            print(f"[*] Resume with: --resume {journal.run_id}")
+            batch.print_summary()
+            sys.exit(1)
+        batch.print_summary()
+        print(f"\n[+] Batch complete! Per-target results are in {os.path.join(args.output, 'targets')}")
+        return
+    
+    scheduler = new_scheduler(args, journal)
     
     try:
-        # Initialize scanners
-        web_scanner = WebScanner(args.url, args.output)
-        network_scanner = NetworkScanner(urlparse(args.url).netloc, args.output)
+        add_target_stages(scheduler, args, target, args.output)
+        add_global_stages(scheduler, args, args.output)
+        
+        if args.timings:
+            record_import_times()
+            timings.print_report()
         
         # Start scanning
         print("\n[+] Starting comprehensive security assessment...")
         start_time = time.time()
         
-        # Web Application Testing
-        run_web_scans(web_scanner)
-        
-        # API Testing
-        if args.api:
-            print("\n[+] Starting API security testing...")
-            api_tester = APITester(args.api, args.output)
-            api_tester.run_api_scan()
-        
-        # Network Scanning
-        run_network_scans(network_scanner, args.interface)
-        
-        # Wireless Scanning
-        if args.wireless:
-            print("\n[+] Starting wireless security assessment...")
-            wireless_scanner = WirelessScanner(args.interface, args.output)
-            wireless_scanner.run_aircrack_scan()
-            wireless_scanner.run_wifite()
-        
-        # Password Testing
-        if args.password_file:
-            print("\n[+] Starting password analysis...")
-            password_tools = PasswordTools(args.output)
-            password_tools.run_john(args.password_file)
-            password_tools.run_hashcat(args.password_file, '0')
-        
-        # Forensics Analysis
-        if args.forensics_image or args.memory_dump:
-            print("\n[+] Starting forensics analysis...")
-            forensics_tools = ForensicsTools(args.output)
-            
-            if args.memory_dump:
-                forensics_tools.run_volatility(args.memory_dump)
-            
-            if args.forensics_image:
-                forensics_tools.run_autopsy(args.forensics_image)
-        
-        # Exploitation Testing
-        print("\n[+] Running exploitation checks...")
-        exploitation_tools = ExploitationTools(args.output)
-        exploitation_tools.run_metasploit_scan(urlparse(args.url).netloc)
-        exploitation_tools.run_searchsploit(urlparse(args.url).netloc)
-        
-        # Social Engineering Setup
-        print("\n[+] Setting up social engineering tools...")
-        social_tools = SocialEngineeringTools(args.output)
-        social_tools.run_set_toolkit()
-        social_tools.run_gophish()
+        live = start_live_analysis(args, args.output)
+        try:
+            scheduler.run()
+        finally:
+            if live:
+                live.stop()
         
         # Calculate execution time
         execution_time = time.time() - start_time
@@ -243,13 +426,17 @@ def main():
         print(f"Output Directory: {args.output}")
         print(f"{'='*50}")
         
+        scheduler.print_summary()
+        runner.print_summary()
+        
         # Add this line to analyze results after scanning
-        analyze_results(args.output)
+        analyze_results(args.output, args.parse_workers, args.timings, args.format, args.diff)
         
         print("\n[+] Assessment complete! Check the output directory for detailed results.")
         
     except KeyboardInterrupt:
         print("\n[-] Assessment interrupted by user.")
+        print(f"[*] Resume with: --resume {journal.run_id}")
         print("[*] Generating report for completed scans...")
         analyze_results(args.output)
         sys.exit(1)
@@ -10,17 +10,47 @@ This package contains all the security testing modules including:
 - Forensics Tools
 - Exploitation Tools
 - Social Engineering Tools
+
+Tool classes are imported lazily on first access so that a run only pays
+for the modules whose stages are actually scheduled.
 """
+import importlib
+import time
+
+# Tool class -> submodule that defines it
+_CLASS_MODULES = {
+    'WebScanner': '.web_scanner',
+    'NetworkScanner': '.network_scanner',
+    'APITester': '.api_tester',
+    'PhishingAnalyzer': '.phishing_tools',
+    'WirelessScanner': '.wireless_scanner',
+    'PasswordTools': '.password_tools',
+    'ForensicsTools': '.forensics_tools',
+    'ExploitationTools': '.exploitation',
+    'SocialEngineeringTools': '.social_engineering',
+}
+
+# Submodule -> seconds spent importing it (including its own imports)
+import_times = {}
+
+def load_module(submodule):
+    """Import a submodule of this package, recording how long it took"""
+    name = __name__ + submodule
+    start = time.perf_counter()
+    module = importlib.import_module(submodule, __name__)
+    if name not in import_times:
+        import_times[name] = time.perf_counter() - start
+    return module
+
+def __getattr__(name):
+    if name in _CLASS_MODULES:
+        value = getattr(load_module(_CLASS_MODULES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-from .web_scanner import WebScanner
-from .network_scanner import NetworkScanner
-from .api_tester import APITester
-from .phishing_tools import PhishingAnalyzer
-from .wireless_scanner import WirelessScanner
-from .password_tools import PasswordTools
-from .forensics_tools import ForensicsTools
-from .exploitation import ExploitationTools
-from .social_engineering import SocialEngineeringTools
+def __dir__():
+    return sorted(list(globals()) + list(_CLASS_MODULES))
 
 __all__ = [
     'WebScanner',
@@ -1,27 +1,21 @@
 import os
-import subprocess
+
+from utils.tool_runner import get_runner
 
 class APITester:
-    def __init__(self, api_endpoint, output_dir):
+    def __init__(self, api_endpoint, output_dir, runner=None):
         self.api_endpoint = api_endpoint
         self.output_dir = os.path.join(output_dir, 'api')
         os.makedirs(self.output_dir, exist_ok=True)
-        self.timeout = 300
+        self.runner = runner or get_runner()
 
-    def run_api_scan(self):
+    async def run_api_scan(self):
         output_file = os.path.join(self.output_dir, 'api_scan.txt')
-        try:
-            subprocess.run([
-                'zaproxy',
-                '-cmd',
-                '-quickurl', self.api_endpoint,
-                '-quickout', output_file
-            ], check=True, timeout=self.timeout)
-            return output_file
-        except subprocess.TimeoutExpired:
-            print("[-] API scan timed out after 5 minutes")
-            return None
-        except subprocess.CalledProcessError as e:
-            print(f"[-] Error running API scan: {str(e)}")
-            return None
+        result = await self.runner.run([
+            'zaproxy',
+            '-cmd',
+            '-quickurl', self.api_endpoint,
+            '-quickout', output_file
+        ], check=True, label='API scan')
+        return output_file if result.ok else None
 
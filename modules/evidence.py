@@ -0,0 +1,236 @@
+"""
+Evidence image hashing and triage
+
+Memory-maps a forensics image and makes a single pass over it in large
+chunks. For every chunk the MD5, SHA-1 and SHA-256 updates run in parallel
+threads (hashlib releases the GIL on large buffers), alongside a triage
+scan of the same chunk, while the kernel is asked to read ahead the next
+chunk.
+
+The triage scan classifies every block by an entropy estimate (zero,
+sparse, data, high entropy i.e. compressed or encrypted) and looks for file
+signatures at sector boundaries. Consecutive blocks of the same class are
+merged into the regions of a block map.
+
+Results are cached by image identity (path, size, mtime and inode), so a
+re-run or a later stage gets them without reading the image again.
+"""
+import hashlib
+import json
+import math
+import mmap
+import os
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+CACHE_DIR = os.environ.get(
+    'PENTEST_TOOLKIT_EVIDENCE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'pentest-toolkit', 'evidence')
+)
+CHUNK_SIZE = 16 * 1024 * 1024
+BLOCK_SIZE = 1024 * 1024
+SECTOR_SIZE = 512
+SAMPLE_SLICES = 16       # slices of each block sampled for its entropy
+SAMPLE_SLICE_SIZE = 1024
+HIGH_ENTROPY = 7.5       # bits per byte
+SPARSE_ENTROPY = 2.0
+MAX_SIGNATURE_HITS = 10000
+
+DIGESTS = ['md5', 'sha1', 'sha256']
+
+SIGNATURES = {
+    'JPEG': b'\xff\xd8\xff',
+    'PNG': b'\x89PNG\r\n\x1a\n',
+    'GIF': b'GIF8',
+    'PDF': b'%PDF-',
+    'ZIP': b'PK\x03\x04',
+    'GZIP': b'\x1f\x8b\x08',
+    'BZIP2': b'BZh',
+    '7-Zip': b"7z\xbc\xaf'\x1c",
+    'RAR': b'Rar!\x1a\x07',
+    'ELF': b'\x7fELF',
+    'PE': b'MZ',
+    'OLE': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',
+    'SQLite': b'SQLite format 3\x00',
+    'EVTX': b'ElfFile\x00',
+    'Registry hive': b'regf',
+    'LUKS': b'LUKS\xba\xbe',
+}
+
+# First byte -> signatures starting with it, and a translate table that
+# marks those first bytes, so only candidate sectors are compared
+_by_first_byte = {}
+for _name, _magic in SIGNATURES.items():
+    _by_first_byte.setdefault(_magic[0], []).append((_name, _magic))
+_candidates = bytes(1 if i in _by_first_byte else 0 for i in range(256))
+
+
+def image_identity(path):
+    st = os.stat(path)
+    return hashlib.sha256(json.dumps(
+        [os.path.abspath(path), st.st_size, st.st_mtime_ns, st.st_ino]).encode()).hexdigest()
+
+
+def _entropy(sample):
+    total = len(sample)
+    return -sum(n / total * math.log2(n / total) for n in Counter(sample).values())
+
+
+def _classify(buf, start, end):
+    """Class and entropy estimate of the block buf[start:end]"""
+    size = end - start
+    step = max(SAMPLE_SLICE_SIZE, size // SAMPLE_SLICES)
+    sample = b''.join(buf[offset:min(offset + SAMPLE_SLICE_SIZE, end)] for offset in range(start, end, step))
+    entropy = _entropy(sample) if sample else 0.0
+    if entropy == 0.0 and not buf[start:end].strip(b'\0'):
+        return 'zero', 0.0
+    if entropy >= HIGH_ENTROPY:
+        return 'high', entropy
+    if entropy < SPARSE_ENTROPY:
+        return 'sparse', entropy
+    return 'data', entropy
+
+
+def _signatures(buf, start, end):
+    """(offset, signature) of the file signatures at sector starts in buf[start:end]"""
+    firsts = buf[start:end:SECTOR_SIZE]
+    marked = firsts.translate(_candidates)
+    hits = []
+    i = marked.find(1)
+    while i != -1:
+        offset = start + i * SECTOR_SIZE
+        for name, magic in _by_first_byte[firsts[i]]:
+            if buf[offset:offset + len(magic)] == magic:
+                hits.append((offset, name))
+                break
+        i = marked.find(1, i + 1)
+    return hits
+
+
+def _scan_chunk(buf, start, end):
+    blocks = [(offset, *_classify(buf, offset, min(offset + BLOCK_SIZE, end)))
+              for offset in range(start, end, BLOCK_SIZE)]
+    return blocks, _signatures(buf, start, end)
+
+
+class BlockMap:
+    """Regions of consecutive blocks of the same class, and signature hits"""
+
+    def __init__(self):
+        self.regions = []  # [start, end, class, max entropy]
+        self.classes = Counter()
+        self.signature_counts = Counter()
+        self.signatures = []
+
+    def add(self, blocks, hits, size):
+        for offset, kind, entropy in blocks:
+            end = min(offset + BLOCK_SIZE, size)
+            self.classes[kind] += 1
+            last = self.regions[-1] if self.regions else None
+            if last and last[2] == kind and last[1] == offset:
+                last[1] = end
+                last[3] = max(last[3], entropy)
+            else:
+                self.regions.append([offset, end, kind, entropy])
+        for offset, name in hits:
+            self.signature_counts[name] += 1
+            if len(self.signatures) < MAX_SIGNATURE_HITS:
+                self.signatures.append([offset, name])
+
+    def as_dict(self):
+        return {
+            'block_size': BLOCK_SIZE,
+            'classes': dict(self.classes),
+            'regions': [{'start': start, 'end': end, 'class': kind, 'entropy': round(entropy, 3)}
+                        for start, end, kind, entropy in self.regions],
+            'signature_counts': dict(self.signature_counts),
+            'signatures': self.signatures,
+        }
+
+
+def analyze_image(path, chunk_size=CHUNK_SIZE):
+    """Hash and triage an image in one pass; returns the report dict"""
+    size = os.path.getsize(path)
+    digests = [hashlib.new(name) for name in DIGESTS]
+    block_map = BlockMap()
+    start_time = time.monotonic()
+    with open(path, 'rb') as f, ThreadPoolExecutor(max_workers=len(digests) + 1) as pool:
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        try:
+            if size and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                buf.madvise(mmap.MADV_SEQUENTIAL)
+            view = memoryview(buf)
+            for start in range(0, size, chunk_size):
+                end = min(start + chunk_size, size)
+                chunk = view[start:end]
+                jobs = [pool.submit(digest.update, chunk) for digest in digests]
+                scan = pool.submit(_scan_chunk, buf, start, end)
+                if end < size and hasattr(mmap, 'MADV_WILLNEED'):
+                    buf.madvise(mmap.MADV_WILLNEED, end, min(chunk_size, size - end))
+                for job in jobs:
+                    job.result()
+                block_map.add(*scan.result(), size)
+                chunk.release()
+            view.release()
+        finally:
+            if size:
+                buf.close()
+    elapsed = time.monotonic() - start_time
+    return {
+        'image': os.path.abspath(path),
+        'size': size,
+        'digests': {name: digest.hexdigest() for name, digest in zip(DIGESTS, digests)},
+        'elapsed': round(elapsed, 3),
+        'block_map': block_map.as_dict(),
+    }
+
+
+def cached_analysis(path, cache_dir=CACHE_DIR):
+    """Report of an earlier analysis of this exact image, or None"""
+    try:
+        with open(os.path.join(cache_dir, f"{image_identity(path)}.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def image_sha256(path, cache_dir=CACHE_DIR):
+    """
+    Full SHA-256 of an image, hashed in CHUNK_SIZE reads once per image
+    identity; taken from an earlier triage report when there is one.
+    """
+    report = cached_analysis(path, cache_dir)
+    if report is not None:
+        return report['digests']['sha256']
+    cache_file = os.path.join(cache_dir, f"{image_identity(path)}.sha256")
+    try:
+        with open(cache_file) as f:
+            return f.read().strip()
+    except OSError:
+        pass
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_file = f"{cache_file}.tmp{os.getpid()}"
+    with open(tmp_file, 'w') as f:
+        f.write(digest.hexdigest())
+    os.replace(tmp_file, cache_file)
+    return digest.hexdigest()
+
+
+def analyze_image_cached(path, cache_dir=CACHE_DIR):
+    """analyze_image, reusing the result for an unchanged image; returns (report, cached)"""
+    report = cached_analysis(path, cache_dir)
+    if report is not None:
+        return report, True
+    report = analyze_image(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_file = os.path.join(cache_dir, f"{image_identity(path)}.json")
+    tmp_file = f"{cache_file}.tmp{os.getpid()}"
+    with open(tmp_file, 'w') as f:
+        json.dump(report, f)
+    os.replace(tmp_file, cache_file)
+    return report, False
@@ -1,13 +1,14 @@
 import os
-import subprocess
+
+from utils.tool_runner import get_runner
 
 class ExploitationTools:
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, runner=None):
         self.output_dir = os.path.join(output_dir, 'exploitation')
         os.makedirs(self.output_dir, exist_ok=True)
-        self.timeout = 300
+        self.runner = runner or get_runner()
 
-    def run_metasploit_scan(self, target):
+    async def run_metasploit_scan(self, target):
         rc_file = os.path.join(self.output_dir, 'msf_scan.rc')
         output_file = os.path.join(self.output_dir, 'msf_results.txt')
         
@@ -25,33 +26,19 @@ run
 exit
             """)
         
-        try:
-            subprocess.run([
-                'msfconsole',
-                '-r', rc_file,
-                '-o', output_file
-            ], check=True, timeout=self.timeout)
-            return output_file
-        except subprocess.TimeoutExpired:
-            print("[-] Metasploit scan timed out after 5 minutes")
-            return None
-        except subprocess.CalledProcessError as e:
-            print(f"Error running Metasploit: {str(e)}")
-            return None
+        result = await self.runner.run([
+            'msfconsole',
+            '-r', rc_file,
+            '-o', output_file
+        ], check=True, label='Metasploit')
+        return output_file if result.ok else None
 
-    def run_searchsploit(self, search_term):
+    async def run_searchsploit(self, search_term):
         output_file = os.path.join(self.output_dir, 'searchsploit_results.txt')
-        try:
-            subprocess.run([
-                'searchsploit',
-                '--nmap', search_term,
-                '--output', output_file
-            ], check=True, timeout=self.timeout)
-            return output_file
-        except subprocess.TimeoutExpired:
-            print("[-] SearchSploit search timed out after 5 minutes")
-            return None
-        except subprocess.CalledProcessError as e:
-            print(f"Error running SearchSploit: {str(e)}")
-            return None
+        result = await self.runner.run([
+            'searchsploit',
+            '--nmap', search_term,
+            '--output', output_file
+        ], check=True, label='SearchSploit')
+        return output_file if result.ok else None
 
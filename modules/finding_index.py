@@ -0,0 +1,59 @@
+"""
+Finding deduplication keys
+
+Findings that describe the same issue on the same target share a content
+hash, which the findings store uses as primary key. Values that change from one scan to
+the next (request IDs, cache node names, timers, Nikto's random probe file
+names) are normalised away before hashing, so repeated and appended scan
+runs update first-seen/last-seen/count instead of adding new findings.
+"""
+import hashlib
+import re
+
+_VOLATILE_PATTERNS = [
+    # UUIDs and long hex identifiers (request IDs, ETags, hashes)
+    (re.compile(r'\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b'), '<id>'),
+    (re.compile(r'\b(?=[0-9a-f]*\d)[0-9a-f]{16,}\b'), '<id>'),
+    # Colon separated hex request IDs such as 7267:2BECC3:2CF862:36FFA9:672AFFB7
+    (re.compile(r'\b[0-9a-f]{2,}(?::[0-9a-f]{2,}){2,}\b'), '<id>'),
+    # Long base64 blobs such as signed keys
+    (re.compile(r'[a-z0-9+/]{40,}={0,2}(?:_[a-z0-9+/]{20,}={0,2})?'), '<blob>'),
+    # CDN cache node names such as cache-maa10237-MAA
+    (re.compile(r'\bcache-[a-z]{3}\d+(?:-[a-z]{3})?\b'), '<cache-node>'),
+    # Timer and timestamp values
+    (re.compile(r'\bS\d{10}\.\d+,[\w,.]+'), '<timer>'),
+    (re.compile(r'\b\d{4}-\d{2}-\d{2}[t ]\d{2}:\d{2}:\d{2}(?:\.\d+)?z?\b'), '<timestamp>'),
+]
+# Nikto probes with random 8 character names, e.g. /4ZQEhkH6.mdb
+_RANDOM_PROBE_RE = re.compile(r'/(?=[A-Za-z0-9]*\d)(?=[A-Za-z0-9]*[A-Z])(?=[A-Za-z0-9]*[a-z])[A-Za-z0-9]{8}(\.\w+)$')
+
+
+def normalize_message(message):
+    text = ' '.join((message or '').split()).lower()
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def normalize_path(path):
+    if not path:
+        return ''
+    path = path.split('#', 1)[0]
+    path = _RANDOM_PROBE_RE.sub(lambda m: '/<random>' + m.group(1), path)
+    return path.rstrip('/') or '/'
+
+
+def finding_key(finding):
+    """Stable content hash identifying the issue a finding describes"""
+    target = finding.get('target') or ''
+    if finding.get('port'):
+        target = f"{target}:{finding['port']}"
+    message = finding.get('message') or finding.get('description') or ''
+    parts = [
+        finding.get('tool') or '',
+        target.lower(),
+        normalize_path(finding.get('path')),
+        normalize_message(message),
+    ]
+    return hashlib.sha1('\x1f'.join(parts).encode('utf-8', 'replace')).hexdigest()
+
@@ -0,0 +1,367 @@
+"""
+Persistent SQLite findings store
+
+Every parser writes normalized findings here, deduplicated by the content
+hash from modules.finding_index. Reports, exports and diffs then become
+indexed queries instead of re-parsing raw tool output. The database runs in
+WAL mode so readers (e.g. a live dashboard) do not block ingestion.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+from contextlib import contextmanager
+
+from modules.finding_index import finding_key
+
+BATCH_SIZE = 1000
+HASH_CHUNK_SIZE = 1024 * 1024
+
+SEVERITY_ORDER = ['Critical', 'High', 'Medium', 'Low']
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS findings (
+    key TEXT PRIMARY KEY,
+    tool TEXT NOT NULL,
+    type TEXT,
+    target TEXT,
+    severity TEXT,
+    description TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    occurrences INTEGER NOT NULL DEFAULT 1,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_findings_target ON findings(target);
+CREATE INDEX IF NOT EXISTS idx_findings_tool ON findings(tool);
+CREATE INDEX IF NOT EXISTS idx_findings_severity ON findings(severity);
+CREATE INDEX IF NOT EXISTS idx_findings_first_seen ON findings(first_seen);
+CREATE INDEX IF NOT EXISTS idx_findings_last_seen ON findings(last_seen);
+
+CREATE TABLE IF NOT EXISTS sources (
+    path TEXT PRIMARY KEY,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    state TEXT,
+    ingested_at TEXT
+);
+
+-- Findings each source currently reports; a run is the union over its sources
+CREATE TABLE IF NOT EXISTS source_findings (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at TEXT NOT NULL,
+    findings INTEGER NOT NULL DEFAULT 0
+);
+
+-- Signature of every source when a run was recorded, to tell whether anything changed since
+CREATE TABLE IF NOT EXISTS run_sources (
+    run_id INTEGER NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER,
+    mtime_ns INTEGER,
+    sha256 TEXT,
+    PRIMARY KEY (run_id, path)
+) WITHOUT ROWID;
+
+-- Snapshot of the findings present in each run with their severity at the time
+CREATE TABLE IF NOT EXISTS run_findings (
+    run_id INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    severity TEXT,
+    PRIMARY KEY (run_id, key)
+) WITHOUT ROWID;
+"""
+
+_UPSERT = """
+INSERT INTO findings (key, tool, type, target, severity, description, first_seen, last_seen, occurrences, data)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, 1, ?)
+ON CONFLICT(key) DO UPDATE SET
+    last_seen = excluded.last_seen,
+    occurrences = occurrences + 1,
+    severity = excluded.severity,
+    description = excluded.description,
+    data = excluded.data
+"""
+
+# Findings of one run compared to another, by finding key
+_RUN_DELTA = {
+    'new': (
+        'SELECT f.*, n.severity AS run_severity, NULL AS old_severity FROM run_findings n '
+        'JOIN findings f ON f.key = n.key WHERE n.run_id = :new AND NOT EXISTS '
+        '(SELECT 1 FROM run_findings o WHERE o.run_id = :old AND o.key = n.key)'),
+    'resolved': (
+        'SELECT f.*, o.severity AS run_severity, o.severity AS old_severity FROM run_findings o '
+        'JOIN findings f ON f.key = o.key WHERE o.run_id = :old AND NOT EXISTS '
+        '(SELECT 1 FROM run_findings n WHERE n.run_id = :new AND n.key = o.key)'),
+    'changed': (
+        'SELECT f.*, n.severity AS run_severity, o.severity AS old_severity FROM run_findings n '
+        'JOIN run_findings o ON o.run_id = :old AND o.key = n.key '
+        'JOIN findings f ON f.key = n.key WHERE n.run_id = :new AND o.severity IS NOT n.severity'),
+}
+
+_SEVERITY_RANK = "CASE severity " + " ".join(
+    f"WHEN '{s}' THEN {i}" for i, s in enumerate(SEVERITY_ORDER)) + f" ELSE {len(SEVERITY_ORDER)} END"
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_signature(path, record=None, hash_content=True):
+    """
+    Return (changed, (size, mtime_ns, sha256)) for a source file.
+
+    A file whose size and mtime match its previous record is reported
+    unchanged without reading it; otherwise its SHA-256 decides, so a
+    touched but identical file is unchanged as well. Without hash_content
+    (a file that is still being written) any size or mtime change counts
+    and the hash is left empty, to be computed by a later full pass.
+    """
+    st = os.stat(path)
+    if record and record['size'] == st.st_size and record['mtime_ns'] == st.st_mtime_ns:
+        return False, (st.st_size, st.st_mtime_ns, record['sha256'])
+    if not hash_content:
+        return True, (st.st_size, st.st_mtime_ns, None)
+    sha256 = file_sha256(path)
+    return not (record and record['sha256'] == sha256), (st.st_size, st.st_mtime_ns, sha256)
+
+
+def stat_unchanged(path, record):
+    """True if path still has the size and mtime stored in its record"""
+    if not record:
+        return False
+    st = os.stat(path)
+    return record['size'] == st.st_size and record['mtime_ns'] == st.st_mtime_ns
+
+
+class FindingsStore:
+    """SQLite-backed store of unique findings and ingested sources"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Analysis may run in a worker thread of the event loop
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    @contextmanager
+    def transaction(self):
+        try:
+            yield self.conn
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+    def source(self, key):
+        row = self.conn.execute('SELECT * FROM sources WHERE path = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record['state'] = json.loads(record['state'] or '{}')
+        return record
+
+    def check_source(self, key, path):
+        """Return (changed, signature) for a source file, see source_signature()"""
+        record = self.source(key)
+        changed, signature = source_signature(path, record)
+        if not changed and record and (record['size'], record['mtime_ns']) != signature[:2]:
+            with self.transaction() as conn:
+                conn.execute('UPDATE sources SET size = ?, mtime_ns = ? WHERE path = ?',
+                             (signature[0], signature[1], key))
+        return changed, signature
+
+    def ingest(self, key, signature, state, findings, seen, reset=False):
+        """
+        Upsert findings from one source and save its parser state.
+
+        Everything happens in a single transaction with batched writes, so
+        an interrupted ingest leaves neither findings nor offsets half done.
+        With reset the source was re-read from the start, so the findings it
+        reported before are forgotten first.
+        """
+        count = 0
+        batch = []
+        with self.transaction() as conn:
+            if reset:
+                conn.execute('DELETE FROM source_findings WHERE source = ?', (key,))
+            for finding in findings:
+                batch.append((
+                    finding.get('key') or finding_key(finding),
+                    finding.get('tool'),
+                    finding.get('type'),
+                    finding.get('target'),
+                    finding.get('severity'),
+                    finding.get('description'),
+                    seen,
+                    seen,
+                    json.dumps(finding),
+                ))
+                if len(batch) >= BATCH_SIZE:
+                    self._write_batch(conn, key, batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._write_batch(conn, key, batch)
+                count += len(batch)
+            size, mtime_ns, sha256 = signature
+            conn.execute(
+                'INSERT OR REPLACE INTO sources (path, size, mtime_ns, sha256, state, ingested_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (key, size, mtime_ns, sha256, json.dumps(state), seen))
+        return count
+
+    def _write_batch(self, conn, source, batch):
+        conn.executemany(_UPSERT, batch)
+        conn.executemany('INSERT OR IGNORE INTO source_findings (source, key) VALUES (?, ?)',
+                         [(source, row[0]) for row in batch])
+
+    def record_run(self, sources, started_at, reuse_latest=True):
+        """
+        Snapshot the findings reported by `sources` as a new run.
+
+        Sources that are no longer present are dropped first, so findings
+        only they reported count as resolved. With reuse_latest, the latest
+        run's id is returned instead of recording an identical run when no
+        source was ingested, added or removed since it was recorded, by
+        whichever analyzer or process did the ingesting. Returns the run id.
+        """
+        current = set(sources)
+        with self.transaction() as conn:
+            stale = [(row[0],) for row in conn.execute('SELECT path FROM sources')
+                     if row[0] not in current]
+            latest = conn.execute('SELECT MAX(id) FROM runs').fetchone()[0]
+            if reuse_latest and not stale and latest is not None and self._sources_unchanged(conn, latest):
+                return latest
+            conn.executemany('DELETE FROM sources WHERE path = ?', stale)
+            conn.executemany('DELETE FROM source_findings WHERE source = ?', stale)
+            run_id = conn.execute('INSERT INTO runs (started_at) VALUES (?)', (started_at,)).lastrowid
+            conn.execute(
+                'INSERT INTO run_sources (run_id, path, size, mtime_ns, sha256) '
+                'SELECT ?, path, size, mtime_ns, sha256 FROM sources', (run_id,))
+            conn.execute(
+                'INSERT INTO run_findings (run_id, key, severity) '
+                'SELECT ?, f.key, f.severity FROM findings f '
+                'WHERE f.key IN (SELECT key FROM source_findings)', (run_id,))
+            count = conn.execute('SELECT COUNT(*) FROM run_findings WHERE run_id = ?', (run_id,)).fetchone()[0]
+            conn.execute('UPDATE runs SET findings = ? WHERE id = ?', (count, run_id))
+        return run_id
+
+    def _sources_unchanged(self, conn, run_id):
+        """True if the sources table still matches the signatures recorded with run_id"""
+        recorded = conn.execute('SELECT COUNT(*) FROM run_sources WHERE run_id = ?', (run_id,)).fetchone()[0]
+        current = conn.execute('SELECT COUNT(*) FROM sources').fetchone()[0]
+        if recorded != current:
+            return False
+        differing = conn.execute(
+            'SELECT COUNT(*) FROM sources s LEFT JOIN run_sources r ON r.run_id = ? AND r.path = s.path '
+            'WHERE r.path IS NULL OR r.size IS NOT s.size OR r.mtime_ns IS NOT s.mtime_ns '
+            'OR r.sha256 IS NOT s.sha256', (run_id,)).fetchone()[0]
+        return differing == 0
+
+    def runs(self):
+        """All recorded runs, oldest first"""
+        return [dict(row) for row in self.conn.execute('SELECT * FROM runs ORDER BY id')]
+
+    def run_findings(self, run_id, finding_type=None):
+        """Iterate over the findings of one run, with the severity they had in it"""
+        query = ('SELECT f.*, r.severity AS run_severity FROM run_findings r '
+                 'JOIN findings f ON f.key = r.key WHERE r.run_id = ?')
+        params = [run_id]
+        if finding_type is not None:
+            query += ' AND f.type = ?'
+            params.append(finding_type)
+        for row in self.conn.execute(query, params):
+            finding = self._row_to_finding(row)
+            finding['severity'] = row['run_severity']
+            yield finding
+
+    def run_delta(self, old_run, new_run, change):
+        """
+        Iterate over the 'new', 'resolved' or 'changed' findings of new_run
+        relative to old_run. Each finding carries its severity in the run it
+        is reported from and, except for new ones, old_severity.
+        """
+        for row in self.conn.execute(_RUN_DELTA[change], {'old': old_run, 'new': new_run}):
+            finding = self._row_to_finding(row)
+            finding['severity'] = row['run_severity']
+            finding['old_severity'] = row['old_severity']
+            yield finding
+
+    def count_run_delta(self, old_run, new_run, change):
+        query = f'SELECT COUNT(*) FROM ({_RUN_DELTA[change]})'
+        return self.conn.execute(query, {'old': old_run, 'new': new_run}).fetchone()[0]
+
+    def _row_to_finding(self, row):
+        finding = json.loads(row['data'])
+        finding.update(key=row['key'], severity=row['severity'], first_seen=row['first_seen'],
+                       last_seen=row['last_seen'], occurrences=row['occurrences'])
+        return finding
+
+    def findings(self, tool=None, severity=None, target=None, order_by_severity=False,
+                 order_by_target=False, since=None, run_id=None):
+        """
+        Iterate over stored findings, optionally filtered, without loading them all.
+        With since, only findings last seen at or after that timestamp; with
+        run_id, only the findings present in that run.
+        """
+        clauses, params = [], []
+        for column, value in (('tool', tool), ('severity', severity), ('target', target)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value)
+        if since is not None:
+            clauses.append('last_seen >= ?')
+            params.append(since)
+        if run_id is not None:
+            clauses.append('key IN (SELECT key FROM run_findings WHERE run_id = ?)')
+            params.append(run_id)
+        query = 'SELECT * FROM findings'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        order = []
+        if order_by_severity:
+            order.append(_SEVERITY_RANK)
+        if order_by_target:
+            order.append('target')
+        if order:
+            query += ' ORDER BY ' + ', '.join(order + ['rowid'])
+        for row in self.conn.execute(query, params):
+            yield self._row_to_finding(row)
+
+    def count(self):
+        return self.conn.execute('SELECT COUNT(*) FROM findings').fetchone()[0]
+
+    def severity_counts(self, since=None, run_id=None):
+        counts = {s: 0 for s in SEVERITY_ORDER}
+        clauses, params = [], []
+        if since is not None:
+            clauses.append('last_seen >= ?')
+            params.append(since)
+        if run_id is not None:
+            clauses.append('key IN (SELECT key FROM run_findings WHERE run_id = ?)')
+            params.append(run_id)
+        query = 'SELECT severity, COUNT(*) FROM findings'
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        for row in self.conn.execute(query + ' GROUP BY severity', params):
+            counts[row[0]] = row[1]
+        return counts
@@ -1,49 +1,110 @@
+import asyncio
+import json
 import os
-import subprocess
+import shutil
+
+from modules.evidence import analyze_image_cached, image_sha256
+from utils.result_cache import get_cache, remember_digest
+from utils.tool_runner import get_runner
+
+VOLATILITY_PLUGINS = ['pslist', 'netscan', 'malfind', 'filescan']
+DEFAULT_VOLATILITY_WORKERS = 4
 
 class ForensicsTools:
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, runner=None, cache=None):
         self.output_dir = os.path.join(output_dir, 'forensics')
         os.makedirs(self.output_dir, exist_ok=True)
-        self.timeout = 300
+        self.runner = runner or get_runner()
+        self.cache = cache or get_cache()
 
-    def run_volatility(self, memory_dump):
+    async def run_volatility(self, memory_dump, workers=DEFAULT_VOLATILITY_WORKERS, plugins=VOLATILITY_PLUGINS):
+        """
+        Run the Volatility plugins concurrently, each streaming into its own
+        file. Results are cached by the SHA-256 of the dump, so a re-run
+        on the same image only runs the plugins that did not complete.
+        """
+        plugin_dir = os.path.join(self.output_dir, 'volatility')
+        os.makedirs(plugin_dir, exist_ok=True)
         output_file = os.path.join(self.output_dir, 'volatility_analysis.txt')
-        try:
-            plugins = ['pslist', 'netscan', 'malfind', 'filescan']
-            
-            with open(output_file, 'w') as f:
-                for plugin in plugins:
-                    result = subprocess.run([
-                        'volatility',
-                        '-f', memory_dump,
-                        '--profile=Win10x64', 
-                        plugin
-                    ], capture_output=True, text=True, timeout=self.timeout)
-                    f.write(f"\n=== {plugin} ===\n")
-                    f.write(result.stdout)
-            
-            return output_file
-        except subprocess.TimeoutExpired:
-            print("[-] Volatility analysis timed out after 5 minutes")
+
+        if not os.path.isfile(memory_dump):
+            print(f"[-] Memory dump not found: {memory_dump}")
             return None
-        except subprocess.CalledProcessError as e:
-            print(f"Error running Volatility: {str(e)}")
+        print(f"[*] Hashing memory dump {memory_dump}...")
+        # Hashed once per dump identity and kept in the evidence cache; the
+        # cache key then reuses the digest instead of hashing the dump again
+        digest = await asyncio.to_thread(image_sha256, memory_dump)
+        remember_digest(memory_dump, digest)
+
+        slots = asyncio.Semaphore(max(1, workers or 1))
+
+        async def run_plugin(plugin):
+            plugin_file = os.path.join(plugin_dir, f'{plugin}.txt')
+            async with slots:
+                ok = await self.cache.run(self.runner, [
+                    'volatility',
+                    '-f', memory_dump,
+                    '--profile=Win10x64',
+                    plugin
+                ], plugin_file, 'memory dump', input_files=[memory_dump],
+                    stdout=plugin_file, check=True, label=f'Volatility {plugin}')
+            return plugin, plugin_file, ok
+
+        print(f"[*] Running {len(plugins)} Volatility plugins with {workers} workers...")
+        results = await asyncio.gather(*(run_plugin(plugin) for plugin in plugins))
+        if not any(ok for _, _, ok in results):
             return None
 
-    def run_autopsy(self, evidence_file):
-        case_dir = os.path.join(self.output_dir, 'autopsy_case')
-        try:
-            subprocess.run([
-                'autopsy',
-                '--case=' + case_dir,
-                '--add=' + evidence_file
-            ], check=True, timeout=self.timeout)
-            return case_dir
-        except subprocess.TimeoutExpired:
-            print("[-] Autopsy case creation timed out after 5 minutes")
+        # Combined report in plugin order, copied from the per-plugin files
+        with open(output_file, 'wb') as f:
+            for plugin, plugin_file, ok in results:
+                f.write(f"\n=== {plugin} ===\n".encode())
+                if not ok:
+                    f.write(b"[plugin failed]\n")
+                    continue
+                with open(plugin_file, 'rb') as src:
+                    shutil.copyfileobj(src, f)
+        
+        return output_file
+
+    async def triage_image(self, evidence_file):
+        """Hash an image (MD5/SHA-1/SHA-256) and map its high-entropy regions and file signatures"""
+        if not os.path.isfile(evidence_file):
+            print(f"[-] Forensics image not found: {evidence_file}")
             return None
-        except subprocess.CalledProcessError as e:
-            print(f"Error running Autopsy: {str(e)}")
+        print(f"[*] Hashing and triaging {evidence_file}...")
+        try:
+            report, cached = await asyncio.to_thread(analyze_image_cached, evidence_file)
+        except (OSError, ValueError) as e:
+            print(f"[-] Error triaging image: {str(e)}")
             return None
+        # Later stages that hash the image for a cache key reuse the digest
+        remember_digest(evidence_file, report['digests']['sha256'])
+
+        output_file = os.path.join(self.output_dir, f"{os.path.basename(evidence_file)}.triage.json")
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        block_map = report['block_map']
+        source = 'cached' if cached else f"{report['size'] / max(report['elapsed'], 1e-6) / 1024 / 1024:.0f} MB/s"
+        print(f"[+] Image triaged ({source})")
+        for name, digest in report['digests'].items():
+            print(f"    {name:<8} {digest}")
+        print("    blocks   " + ', '.join(f"{count} {kind}" for kind, count in sorted(block_map['classes'].items())))
+        if block_map['signature_counts']:
+            print("    files    " + ', '.join(f"{count} {name}" for name, count
+                                               in sorted(block_map['signature_counts'].items())))
+        high = [region for region in block_map['regions'] if region['class'] == 'high']
+        if high:
+            print(f"[!] {len(high)} high-entropy regions (compressed or encrypted data)")
+        return output_file
+
+    async def run_autopsy(self, evidence_file):
+        case_dir = os.path.join(self.output_dir, 'autopsy_case')
+        result = await self.runner.run([
+            'autopsy',
+            '--case=' + case_dir,
+            '--add=' + evidence_file
+        ], check=True, label='Autopsy')
+        return case_dir if result.ok else None
 
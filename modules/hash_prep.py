@@ -0,0 +1,319 @@
+"""
+Hash file preprocessing
+
+Streams a hash dump once, classifies every hash by its shape into a
+per-type bucket with the matching John the Ripper format and hashcat mode,
+drops duplicates and drops hashes that a potfile already has a password
+for. The crackers are then run per bucket on the remaining hashes only.
+
+Duplicates are found with a set of 64-bit hashes of the normalized hash
+strings, so memory grows by one int per unique hash rather than per line.
+Usernames are kept: bucket entries are user:hash lines, and every account
+is listed in accounts.txt, so a password cracked once is reported for all
+the accounts sharing that hash.
+"""
+import json
+import os
+import re
+
+POT_DIR = os.environ.get(
+    'PENTEST_TOOLKIT_POT',
+    os.path.join(os.path.expanduser('~'), '.cache', 'pentest-toolkit', 'pot')
+)
+JOHN_POT = os.path.join(POT_DIR, 'john.pot')
+HASHCAT_POT = os.path.join(POT_DIR, 'hashcat.potfile')
+POTFILES = [
+    JOHN_POT,
+    HASHCAT_POT,
+    os.path.join(os.path.expanduser('~'), '.john', 'john.pot'),
+    os.path.join(os.path.expanduser('~'), '.local', 'share', 'hashcat', 'hashcat.potfile'),
+    os.path.join(os.path.expanduser('~'), '.hashcat', 'hashcat.potfile'),
+]
+
+# bucket -> (John the Ripper format, hashcat mode)
+HASH_TYPES = {
+    'raw-md5': ('raw-md5', '0'),
+    'raw-sha1': ('raw-sha1', '100'),
+    'raw-sha256': ('raw-sha256', '1400'),
+    'raw-sha512': ('raw-sha512', '1700'),
+    'nt': ('nt', '1000'),
+    'md5crypt': ('md5crypt', '500'),
+    'sha256crypt': ('sha256crypt', '7400'),
+    'sha512crypt': ('sha512crypt', '1800'),
+    'bcrypt': ('bcrypt', '3200'),
+    'netntlmv2': ('netntlmv2', '5600'),
+}
+# Buckets whose hashes already contain the username; their entries are the bare hash
+EMBEDDED_USER_BUCKETS = {'netntlmv2'}
+
+HEX_LENGTHS = {32: 'raw-md5', 40: 'raw-sha1', 64: 'raw-sha256', 128: 'raw-sha512'}
+CRYPT_PREFIXES = [
+    ('$1$', 'md5crypt'),
+    ('$5$', 'sha256crypt'),
+    ('$6$', 'sha512crypt'),
+    ('$2a$', 'bcrypt'),
+    ('$2b$', 'bcrypt'),
+    ('$2y$', 'bcrypt'),
+]
+READ_BUFFER_SIZE = 1024 * 1024
+
+_hex = re.compile(r'[0-9a-fA-F]+')
+_netntlmv2 = re.compile(r'[^:]*::[^:]*:[0-9a-fA-F]{16}:[0-9a-fA-F]{32}:[0-9a-fA-F]+')
+# Tags John the Ripper puts in front of raw hashes in its potfile
+_john_tag = re.compile(r'\$(dynamic_\d+|NT|LM|SHA1|SHA256|SHA512)\$')
+
+
+def _classify_hash(value):
+    if _hex.fullmatch(value) and len(value) in HEX_LENGTHS:
+        return HEX_LENGTHS[len(value)], value.lower()
+    for prefix, bucket in CRYPT_PREFIXES:
+        if value.startswith(prefix):
+            return bucket, value
+    return None, value
+
+
+def classify(line):
+    """
+    Return (bucket, normalized hash, user) for a line of a hash dump, or
+    (None, line, None) if its type is not recognized. Accepts bare hashes,
+    user:hash lines, pwdump lines and NetNTLMv2 responses; user is None
+    when the line has no separate username.
+    """
+    bucket, value = _classify_hash(line)
+    if bucket or ':' not in line:
+        return bucket, value, None
+    if _netntlmv2.fullmatch(line):
+        return 'netntlmv2', line, None
+    fields = line.split(':')
+    # pwdump: user:rid:lm:nt:::
+    if len(fields) >= 4 and fields[1].isdigit() and len(fields[3]) == 32 and _hex.fullmatch(fields[3]):
+        return 'nt', fields[3].lower(), fields[0]
+    user, rest = line.split(':', 1)
+    bucket, value = _classify_hash(rest)
+    return (bucket, value, user) if bucket else (None, line, None)
+
+
+def _account(user, value):
+    """accounts.txt line of a hash, with an empty user for a bare one"""
+    return f"{user or ''}:{value}"
+
+
+def _entry_hash(bucket, entry):
+    """Normalized hash of a bucket file entry"""
+    return entry if bucket in EMBEDDED_USER_BUCKETS else entry.split(':', 1)[1]
+
+
+def _pot_entries(line):
+    """(normalized hash, password) candidates of a potfile line"""
+    fields = line.split(':')
+    # NetNTLMv2 hashes contain colons themselves
+    for split_at in (1, 6):
+        if len(fields) <= split_at:
+            break
+        value = ':'.join(fields[:split_at])
+        if split_at == 1:
+            value = _john_tag.sub('', value, count=1) if value.startswith('$') else value
+        bucket, normalized, _ = classify(value)
+        if bucket:
+            yield normalized, ':'.join(fields[split_at:])
+
+
+def _file_signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class Potfiles:
+    """Passwords already recovered by earlier John the Ripper or hashcat runs"""
+
+    def __init__(self, paths=None):
+        self.paths = POTFILES if paths is None else paths
+
+    def signature(self):
+        return {path: _file_signature(path) for path in self.paths}
+
+    def _lines(self):
+        for path in self.paths:
+            if not os.path.isfile(path):
+                continue
+            with open(path, encoding='utf-8', errors='replace', buffering=READ_BUFFER_SIZE) as f:
+                for line in f:
+                    yield line.rstrip('\r\n')
+
+    def recovered(self):
+        """Hashes of every normalized hash that has a password"""
+        return {hash(value) for line in self._lines() for value, _ in _pot_entries(line)}
+
+    def passwords(self, wanted):
+        """Yield (hash, password) for the normalized hashes whose hash is in wanted"""
+        seen = set()
+        for line in self._lines():
+            for value, password in _pot_entries(line):
+                key = hash(value)
+                if key in wanted and key not in seen:
+                    seen.add(key)
+                    yield value, password
+
+
+class HashPrep:
+    """Splits a hash dump into deduplicated, not yet cracked per-type buckets"""
+
+    def __init__(self, output_dir, potfiles=None):
+        self.output_dir = os.path.join(output_dir, 'hashes')
+        self.manifest_file = os.path.join(self.output_dir, 'manifest.json')
+        self.accounts_file = os.path.join(self.output_dir, 'accounts.txt')
+        self.recovered_file = os.path.join(self.output_dir, 'recovered.txt')
+        self.potfiles = potfiles or Potfiles()
+
+    def _bucket_file(self, bucket):
+        return os.path.join(self.output_dir, f"{bucket}.txt")
+
+    def load_manifest(self, hash_file=None, check_potfiles=True):
+        """Manifest of an earlier run, or None if the dump or a potfile changed since"""
+        try:
+            with open(self.manifest_file) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if 'accounts' not in manifest:
+            return None  # buckets written before usernames were kept
+        if hash_file and (manifest['source'] != os.path.abspath(hash_file)
+                          or manifest['signature'] != _file_signature(hash_file)):
+            return None
+        if check_potfiles and manifest['potfiles'] != self.potfiles.signature():
+            return None
+        return manifest
+
+    def prepare(self, hash_file):
+        """Stream hash_file into the buckets and write the manifest; returns the manifest"""
+        manifest = self.load_manifest(hash_file)
+        if manifest:
+            return manifest
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        potfile_signature = self.potfiles.signature()
+        recovered = self.potfiles.recovered()
+        seen = set()
+        accounts_seen = set()
+        hits = set()
+        counts = {}
+        writers = {}
+        lines = duplicates = 0
+        try:
+            with open(hash_file, encoding='utf-8', errors='replace', buffering=READ_BUFFER_SIZE) as f, \
+                    open(self.accounts_file, 'w', buffering=READ_BUFFER_SIZE) as accounts:
+                for line in f:
+                    line = line.strip()
+                    if not line or line.startswith('#'):
+                        continue
+                    lines += 1
+                    bucket, value, user = classify(line)
+                    account = _account(user, value)
+                    account_key = hash(account)
+                    if account_key not in accounts_seen:
+                        accounts_seen.add(account_key)
+                        accounts.write(account + '\n')
+                    # Cracked once per hash, reported per account through accounts.txt
+                    key = hash(value)
+                    if key in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(key)
+                    if key in recovered:
+                        hits.add(key)
+                        continue
+                    bucket = bucket or 'unknown'
+                    writer = writers.get(bucket)
+                    if writer is None:
+                        writer = writers[bucket] = open(self._bucket_file(bucket), 'w', buffering=READ_BUFFER_SIZE)
+                    writer.write((value if bucket in EMBEDDED_USER_BUCKETS else account) + '\n')
+                    counts[bucket] = counts.get(bucket, 0) + 1
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        # Only the buckets of this dump are valid; drop those of an earlier one
+        for name in os.listdir(self.output_dir):
+            if name.endswith('.txt') and name[:-4] not in counts and name not in ('recovered.txt', 'accounts.txt'):
+                os.remove(os.path.join(self.output_dir, name))
+
+        self.write_recovered(hits)
+
+        manifest = {
+            'source': os.path.abspath(hash_file),
+            'signature': _file_signature(hash_file),
+            'potfiles': potfile_signature,
+            'lines': lines,
+            'unique': len(seen),
+            'accounts': len(accounts_seen),
+            'accounts_file': self.accounts_file,
+            'duplicates': duplicates,
+            'recovered': len(hits),
+            'recovered_file': self.recovered_file,
+            'unknown': counts.pop('unknown', 0),
+            'buckets': {
+                bucket: {
+                    'file': self._bucket_file(bucket),
+                    'count': count,
+                    'john_format': HASH_TYPES[bucket][0],
+                    'hashcat_mode': HASH_TYPES[bucket][1],
+                    'usernames': bucket not in EMBEDDED_USER_BUCKETS,
+                }
+                for bucket, count in sorted(counts.items())
+            },
+        }
+        tmp_file = f"{self.manifest_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_file, self.manifest_file)
+        return manifest
+
+    def remaining(self, bucket, recovered=None):
+        """
+        Rewrite a bucket without the hashes cracked since it was prepared,
+        e.g. by John the Ripper before hashcat runs. Returns the number of
+        hashes left.
+        """
+        path = self._bucket_file(bucket)
+        if recovered is None:
+            recovered = self.potfiles.recovered()
+        tmp_file = f"{path}.tmp"
+        left = 0
+        with open(path, buffering=READ_BUFFER_SIZE) as src, open(tmp_file, 'w', buffering=READ_BUFFER_SIZE) as dst:
+            for line in src:
+                if hash(_entry_hash(bucket, line.rstrip('\n'))) not in recovered:
+                    dst.write(line)
+                    left += 1
+        os.replace(tmp_file, path)
+        return left
+
+    def write_recovered(self, recovered=None):
+        """
+        Write user:hash:password (hash:password for bare hashes) to
+        recovered.txt for every account whose hash a potfile has cracked.
+        Returns the number of accounts written.
+        """
+        if recovered is None:
+            recovered = self.potfiles.recovered()
+        wanted = set()
+        with open(self.accounts_file, buffering=READ_BUFFER_SIZE) as f:
+            for line in f:
+                key = hash(line.rstrip('\n').split(':', 1)[1])
+                if key in recovered:
+                    wanted.add(key)
+        passwords = {hash(value): password for value, password in self.potfiles.passwords(wanted)}
+        written = 0
+        tmp_file = f"{self.recovered_file}.tmp"
+        with open(self.accounts_file, buffering=READ_BUFFER_SIZE) as src, open(tmp_file, 'w') as dst:
+            for line in src:
+                user, value = line.rstrip('\n').split(':', 1)
+                password = passwords.get(hash(value))
+                if password is None:
+                    continue
+                dst.write(f"{user}:{value}:{password}\n" if user else f"{value}:{password}\n")
+                written += 1
+        os.replace(tmp_file, self.recovered_file)
+        return written
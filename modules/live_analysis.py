@@ -0,0 +1,150 @@
+"""
+Live analysis while the scans are running
+
+Watches the stage output folders and feeds every tool output file to its
+parser as the tool writes it, merging the findings into the store, so High
+and Critical issues surface minutes into a long run instead of at the end.
+Line-oriented outputs are followed as they grow, an unfinished last line
+waiting for the next pass. Whole-file formats (XML, JSON, captures) are
+parsed once their file has been quiet for SETTLE_TIME seconds. The report
+pass after the scans reads whatever is left.
+
+A summary of the findings seen so far is printed as it changes and kept
+in reports/live_summary.json.
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+
+from modules.findings_store import SEVERITY_ORDER
+from modules.parsers.registry import PARSERS
+from modules.results_analyzer import ResultsAnalyzer
+from utils.file_watcher import open_watcher
+
+DEFAULT_LIVE_INTERVAL = 2.0
+SETTLE_TIME = 10.0        # seconds without writes before a whole-file format is parsed
+SUMMARY_INTERVAL = 30.0   # minimum seconds between two printed summaries
+ALERT_SEVERITIES = ['Critical', 'High']
+MAX_SUMMARY_ALERTS = 50
+
+
+class LiveAnalysis:
+    """Background thread that ingests tool output as it is written"""
+
+    def __init__(self, output_dir, interval=DEFAULT_LIVE_INTERVAL, workers=1, polling=False, label=None):
+        self.output_dir = output_dir
+        self.interval = interval
+        # Live passes only see a few appended lines; a process pool per pass costs more than it saves
+        self.workers = workers
+        self.polling = polling
+        self.prefix = f"[{label}] " if label else ''
+        self.summary_file = os.path.join(output_dir, 'reports', 'live_summary.json')
+        self.pending = {}  # path -> monotonic time of the last write seen
+        self.alerted = set()
+        self.alerts = []
+        self.counts = None
+        self.printed_counts = None
+        self.last_print = 0.0
+        self.started_at = None
+        self.watcher = None
+        self.analyzer = None
+        self.thread = None
+        self.stop_event = threading.Event()
+
+    def directories(self):
+        """Top-level stage folders the registered parsers read from"""
+        names = sorted({spec.directory.split(os.sep)[0] for spec in PARSERS.values()})
+        return [os.path.join(self.output_dir, name) for name in names]
+
+    def start(self):
+        directories = self.directories()
+        for directory in directories:
+            os.makedirs(directory, exist_ok=True)
+        self.started_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.watcher = open_watcher(directories, polling=self.polling)
+        self.thread = threading.Thread(target=self._run, name='live-analysis', daemon=True)
+        self.thread.start()
+        print(f"[*] {self.prefix}Live analysis running ({self.watcher.method}), "
+              f"summary in {self.summary_file}")
+        return self
+
+    def stop(self):
+        """Stop watching; returns once the pass in progress has been merged"""
+        if self.thread is None:
+            return
+        self.stop_event.set()
+        self.thread.join()
+        self.thread = None
+        self.watcher.close()
+        if self.counts and self.counts != self.printed_counts:
+            self._print_counts()
+
+    def _run(self):
+        # The store connection is used from this thread only
+        self.analyzer = ResultsAnalyzer(self.output_dir, workers=self.workers)
+        try:
+            while not self.stop_event.is_set():
+                now = time.monotonic()
+                for path in self.watcher.changes(self.interval):
+                    self.pending[path] = now
+                self.poll()
+        except Exception as e:
+            print(f"[-] {self.prefix}Live analysis stopped: {str(e)}")
+        finally:
+            self.analyzer.store.close()
+
+    def _followed(self, path):
+        """True if the source is parsed as it grows: not parsed yet, or its parser keeps a line offset"""
+        record = self.analyzer.store.source(os.path.relpath(path, self.output_dir))
+        return record is None or 'offset' in record['state']
+
+    def poll(self):
+        """Parse the pending sources that are due and refresh the summary"""
+        now = time.monotonic()
+        due = [path for path, changed in self.pending.items()
+               if now - changed >= SETTLE_TIME or self._followed(path)]
+        if due:
+            for path in due:
+                del self.pending[path]
+            if self.analyzer.ingest(paths=due, final=False):
+                self._refresh()
+        if self.counts != self.printed_counts and now - self.last_print >= SUMMARY_INTERVAL:
+            self._print_counts()
+
+    def _refresh(self):
+        store = self.analyzer.store
+        for severity in ALERT_SEVERITIES:
+            for finding in store.findings(severity=severity, since=self.started_at):
+                if finding['key'] in self.alerted:
+                    continue
+                self.alerted.add(finding['key'])
+                self.alerts.append(finding)
+                where = f" on {finding['target']}" if finding.get('target') else ''
+                print(f"[!] {self.prefix}{severity}: {finding['description']} ({finding['tool']}{where})")
+        del self.alerts[:-MAX_SUMMARY_ALERTS]
+        self.counts = store.severity_counts(since=self.started_at)
+        self._write_summary()
+
+    def _print_counts(self):
+        counts = ', '.join(f"{self.counts[s]} {s}" for s in SEVERITY_ORDER if self.counts.get(s))
+        print(f"[*] {self.prefix}Findings so far: {counts or 'none'}")
+        self.printed_counts = self.counts
+        self.last_print = time.monotonic()
+
+    def _write_summary(self):
+        summary = {
+            'started_at': self.started_at,
+            'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'watcher': self.watcher.method,
+            'counts': self.counts,
+            'alerts': [{field: finding.get(field) for field in
+                        ('severity', 'tool', 'type', 'target', 'description', 'first_seen')}
+                       for finding in self.alerts],
+        }
+        os.makedirs(os.path.dirname(self.summary_file), exist_ok=True)
+        tmp_file = f"{self.summary_file}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(summary, f, indent=2)
+        os.replace(tmp_file, self.summary_file)
@@ -1,94 +1,224 @@
 # modules/network_scanner.py
 import os
-import subprocess
+import asyncio
+import json
 import time
-import signal
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from modules.nmap_planner import DEFAULT_NMAP_WORKERS, NmapPlanner
+from modules.parsers.pcap import PcapSummary, analyze_capture, count_packets
+from utils.result_cache import get_cache
+from utils.tool_runner import get_runner
+
+CAPTURE_PACKET_LIMIT = 1000
+CAPTURE_POLL_INTERVAL = 2  # seconds between progress updates
+DEFAULT_CAPTURE_BUDGET_MB = 1024
+
+
+def _format_size(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def ring_segments(base_file):
+    """(mtime_ns, size, path) of the ring segments tcpdump -C wrote, oldest first"""
+    directory, base = os.path.split(base_file)
+    segments = []
+    for entry in os.scandir(directory):
+        if entry.name.startswith(base) and entry.name[len(base):].isdigit():
+            st = entry.stat()
+            segments.append((st.st_mtime_ns, st.st_size, entry.path))
+    return sorted(segments)
+
 class NetworkScanner:
-    def __init__(self, target, output_dir):
+    def __init__(self, target, output_dir, runner=None, cache=None):
         self.target = target
         self.output_dir = os.path.join(output_dir, 'network')
         os.makedirs(self.output_dir, exist_ok=True)
-        self.tcpdump_process = None
+        self.runner = runner or get_runner()
+        self.cache = cache or get_cache()
+        self.capture_task = None
 
-    def run_nmap_scan(self):
-        """Run Nmap scan with progress indicator"""
+    async def run_nmap_scan(self, workers=DEFAULT_NMAP_WORKERS, ports=None):
+        """
+        Staged Nmap scan: host discovery, port scans sharded across workers,
+        then version and script scans of the open ports only
+        """
         output_file = os.path.join(self.output_dir, 'nmap_scan.xml')
-        try:
-            print("[*] Starting Nmap scan...")
-            subprocess.run([
-                'nmap',
-                '-sS', '-sV', '-sC',  # SYN scan, Version detection, Default scripts
-                '-T4',                 # Aggressive timing
-                '--max-retries', '2',  # Limit retries
-                '-A',
-                '-oX', output_file,
-                self.target
-            ], check=True)
-            print("[+] Nmap scan completed")
-            return output_file
-        except subprocess.CalledProcessError as e:
-            print(f"[-] Error running Nmap: {str(e)}")
+        print("[*] Starting Nmap scan...")
+        planner = NmapPlanner(self.target, self.output_dir, self.runner, self.cache, workers, ports)
+        if not await planner.run(output_file):
             return None
+        print("[+] Nmap scan completed")
+        return output_file
 
-    def capture_traffic(self, interface, duration=30):
+    async def capture_traffic(self, interface, duration=30, segment_mb=None, budget_mb=DEFAULT_CAPTURE_BUDGET_MB):
         """
         Capture network traffic with timeout
         duration: capture time in seconds (default 30s)
+        segment_mb: rotate through ring segments of this size instead of
+            capturing at most 1000 packets into a single file; budget_mb
+            bounds the disk used by all segments together
         """
+        if segment_mb:
+            return await self._capture_ring(interface, duration, segment_mb, budget_mb)
+
         output_file = os.path.join(self.output_dir, 'traffic_capture.pcap')
+        print(f"[*] Starting packet capture on {interface} for {duration} seconds...")
+        
+        # Start tcpdump with specific filters; it is stopped when the duration expires
+        self.capture_task = asyncio.ensure_future(self.runner.run([
+            'tcpdump',
+            '-i', interface,
+            '-w', output_file,
+            'not port 22',  # Exclude SSH traffic
+            '-c', str(CAPTURE_PACKET_LIMIT)  # Capture max 1000 packets
+        ], timeout=duration, expect_timeout=True, label='tcpdump'))
+        
+        start = time.monotonic()
         try:
-            print(f"[*] Starting packet capture on {interface} for {duration} seconds...")
-            
-            # Start tcpdump with specific filters
-            self.tcpdump_process = subprocess.Popen([
-                'tcpdump',
-                '-i', interface,
-                '-w', output_file,
-                'not port 22',  # Exclude SSH traffic
-                '-c', '1000'    # Capture max 1000 packets
-            ])
-            
-            # Show progress bar
-            for i in range(duration):
-                progress = (i + 1) / duration * 100
-                print(f"\rProgress: [{('=' * int(progress/2)).ljust(50)}] {progress:.1f}%", end='')
-                time.sleep(1)
-                
-                # Check if capture completed early
-                if self.tcpdump_process.poll() is not None:
+            # Report progress from what tcpdump has actually written
+            while True:
+                done, _ = await asyncio.wait({self.capture_task}, timeout=CAPTURE_POLL_INTERVAL)
+                packets = await asyncio.to_thread(count_packets, output_file)
+                size = os.path.getsize(output_file) if os.path.exists(output_file) else 0
+                progress = min(packets / CAPTURE_PACKET_LIMIT, 1.0) * 100
+                print(f"\rProgress: [{('=' * int(progress/2)).ljust(50)}] {packets} packets, "
+                      f"{_format_size(size)}, {time.monotonic() - start:.0f}s", end='')
+                if done:
                     break
             
-            print("\n[+] Packet capture completed")
-            return output_file
-            
-        except subprocess.CalledProcessError as e:
-            print(f"\n[-] Error capturing traffic: {str(e)}")
+            result = await self.capture_task
+        finally:
+            self.stop_capture()
+        
+        if not result.ok:
+            print("\n[-] Error capturing traffic")
             return None
+        print("\n[+] Packet capture completed")
+        return output_file
+
+    async def _capture_ring(self, interface, duration, segment_mb, budget_mb):
+        """
+        Capture into a ring of segment files and analyze every segment as
+        soon as tcpdump moves on to the next one, while capture continues.
+        """
+        base_file = os.path.join(self.output_dir, 'traffic_capture.pcap')
+        segment_count = max(2, budget_mb // segment_mb)
+        print(f"[*] Starting continuous capture on {interface} for {duration} seconds "
+              f"({segment_count} segments of {segment_mb} MB)...")
+
+        # -C rotates after segment_mb million bytes and -W reuses the oldest
+        # segment once segment_count exist; -Z root keeps tcpdump allowed to
+        # open later segments after it drops privileges
+        self.capture_task = asyncio.ensure_future(self.runner.run([
+            'tcpdump',
+            '-i', interface,
+            '-w', base_file,
+            '-C', str(segment_mb),
+            '-W', str(segment_count),
+            '-Z', 'root',
+            'not port 22'  # Exclude SSH traffic
+        ], timeout=duration, expect_timeout=True, label='tcpdump'))
+
+        loop = asyncio.get_running_loop()
+        summary = PcapSummary()
+        analyzed = {}  # segment path -> (mtime_ns, size) it was analyzed at
+        pending = {}   # segment path -> ((mtime_ns, size), future)
+        start = time.monotonic()
+
+        def collect(wait_all=False):
+            for path, (signature, future) in list(pending.items()):
+                if not future.done() and not wait_all:
+                    continue
+                del pending[path]
+                try:
+                    summary.merge(future.result())
+                except (OSError, ValueError) as e:
+                    print(f"\n[-] Error analyzing segment {path}: {str(e)}")
+                analyzed[path] = signature
+
+        def submit(segments):
+            for mtime_ns, size, path in segments:
+                signature = (mtime_ns, size)
+                if analyzed.get(path) != signature and path not in pending:
+                    pending[path] = (signature, loop.run_in_executor(executor, analyze_capture, path))
+
+        executor = ProcessPoolExecutor(max_workers=1)
+        try:
+            while True:
+                done, _ = await asyncio.wait({self.capture_task}, timeout=CAPTURE_POLL_INTERVAL)
+                collect()
+                if done:
+                    break
+                # Every segment but the newest one has been closed by tcpdump
+                segments = ring_segments(base_file)
+                submit(segments[:-1])
+                on_disk = sum(size for _, size, _ in segments)
+                print(f"\r[*] {time.monotonic() - start:.0f}s: {len(analyzed)} segments, "
+                      f"{summary.packets} packets, {_format_size(summary.bytes)} analyzed, "
+                      f"{_format_size(on_disk)} on disk", end='')
+
+            result = await self.capture_task
+            # The last segment is closed now too
+            submit(ring_segments(base_file))
+            if pending:
+                await asyncio.wait([future for _, future in pending.values()])
+            collect(wait_all=True)
         finally:
             self.stop_capture()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if not result.ok and not analyzed:
+            print("\n[-] Error capturing traffic")
+            return None
+        print(f"\n[+] Packet capture completed: {len(analyzed)} segments analyzed")
+        return self._write_summary(summary)
+
+    async def analyze_capture(self, pcap_file=None, top=10):
+        """Summarize flows, top talkers and cleartext protocols of a capture"""
+        pcap_file = pcap_file or os.path.join(self.output_dir, 'traffic_capture.pcap')
+        if not os.path.exists(pcap_file):
+            print(f"[-] No capture to analyze at {pcap_file}")
+            return None
+        print(f"[*] Analyzing capture {pcap_file}...")
+        try:
+            summary = await asyncio.to_thread(analyze_capture, pcap_file)
+        except (OSError, ValueError) as e:
+            print(f"[-] Error analyzing capture: {str(e)}")
+            return None
+        return self._write_summary(summary, top)
+
+    def _write_summary(self, summary, top=10):
+        output_file = os.path.join(self.output_dir, 'traffic_summary.json')
+        with open(output_file, 'w') as f:
+            json.dump(summary.as_dict(top), f, indent=2)
+
+        print(f"[+] {summary.packets} packets, {len(summary.flows)} flows")
+        for address, total in summary.top_talkers(5):
+            print(f"    {address:<40} {total:>12} bytes")
+        for detection in summary.cleartext.values():
+            kind = 'credentials' if detection['credentials'] else 'traffic'
+            print(f"[!] Cleartext {detection['protocol']} {kind}: "
+                  f"{detection['client']} -> {detection['server']}:{detection['port']}")
+        return output_file
 
     def stop_capture(self):
         """Stop ongoing packet capture"""
-        if self.tcpdump_process:
-            self.tcpdump_process.terminate()
-            try:
-                self.tcpdump_process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self.tcpdump_process.kill()
-            self.tcpdump_process = None
-
-def run_network_scans(network_scanner, interface):
+        if self.capture_task and not self.capture_task.done():
+            self.capture_task.cancel()
+        self.capture_task = None
+
+async def run_network_scans(network_scanner, interface):
     """Run all network-related scans"""
     print("\n[+] Starting network security assessment...")
     
     try:
         print("[*] Running Nmap scan...")
-        network_scanner.run_nmap_scan()
+        await network_scanner.run_nmap_scan()
         
         print(f"\n[*] Capturing network traffic on {interface}...")
-        network_scanner.capture_traffic(interface, duration=30)  # 30 seconds capture
+        await network_scanner.capture_traffic(interface, duration=30)  # 30 seconds capture
         
     except Exception as e:
         print(f"[-] Error during network scanning: {str(e)}")
@@ -0,0 +1,215 @@
+"""
+Staged Nmap scan planner
+
+Instead of one `nmap -sS -sV -sC -A` over the whole target, a scan runs in
+three stages:
+
+1. host discovery (-sn) finds the live hosts of a range,
+2. SYN port scans of the live hosts run in parallel, sharded by host block
+   and, when there are fewer blocks than workers, by port range,
+3. version and default script scans, OS detection and traceroute
+   (-sV -sC -O --traceroute, what -A covered) run only against the hosts
+   and ports found open.
+
+The service scan results are merged into a single Nmap XML document, so
+the results analyzer sees the same nmap_scan.xml as for a single scan.
+"""
+import asyncio
+import ipaddress
+import math
+import os
+import re
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+from modules.parsers.nmap import iter_nmap_hosts
+
+DEFAULT_NMAP_WORKERS = 4
+HOST_BLOCK_SIZE = 64  # hosts per nmap invocation
+TOP_PORTS = 1000      # what nmap scans without -p
+SERVICE_FILES = [
+    '/usr/share/nmap/nmap-services',
+    '/usr/local/share/nmap/nmap-services',
+]
+
+
+def is_range(target):
+    """True if the target names more than one address (CIDR, dash range or list)"""
+    try:
+        return ipaddress.ip_network(target, strict=False).num_addresses > 1
+    except ValueError:
+        # Several targets, hostname/prefix, or octet ranges like 10.0.0.1-50
+        if any(c in target for c in ', /'):
+            return True
+        return bool(re.fullmatch(r'[\d.*-]+', target)) and any(c in target for c in '*-')
+
+
+def top_ports(count=TOP_PORTS, protocol='tcp'):
+    """The count most common ports from nmap-services, or None if it is missing"""
+    for path in SERVICE_FILES:
+        try:
+            with open(path) as f:
+                ranked = []
+                for line in f:
+                    fields = line.split()
+                    if len(fields) < 3 or line.startswith('#'):
+                        continue
+                    port, _, proto = fields[1].partition('/')
+                    if proto == protocol:
+                        ranked.append((-float(fields[2]), int(port)))
+        except (OSError, ValueError):
+            continue
+        return sorted(port for _, port in sorted(ranked)[:count])
+    return None
+
+
+def expand_ports(spec):
+    """Sorted port numbers of an nmap -p style spec such as '22,80,1000-2000'"""
+    ports = set()
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        first, dash, last = part.partition('-')
+        first = int(first) if first else 1
+        last = (int(last) if last else 65535) if dash else first
+        ports.update(range(first, last + 1))
+    return sorted(ports)
+
+
+def port_spec(ports):
+    """Compress sorted port numbers into an nmap -p spec"""
+    ranges = []
+    for port in ports:
+        if ranges and port == ranges[-1][1] + 1:
+            ranges[-1][1] = port
+        else:
+            ranges.append([port, port])
+    return ','.join(str(a) if a == b else f"{a}-{b}" for a, b in ranges)
+
+
+def split(items, count):
+    """Split a list into count contiguous, nearly equal chunks"""
+    size = math.ceil(len(items) / count) if items else 0
+    return [items[i:i + size] for i in range(0, len(items), size)] if size else []
+
+
+def _host_address(host):
+    addresses = host.findall('address')
+    address = next((a for a in addresses if a.get('addrtype') in ('ipv4', 'ipv6')), None)
+    return address.get('addr') if address is not None else None
+
+
+def _host_up(host):
+    status = host.find('status')
+    return status is not None and status.get('state') == 'up'
+
+
+class NmapPlanner:
+    """Runs a discovery, sharded port and service scan of one target"""
+
+    def __init__(self, target, output_dir, runner, cache, workers=DEFAULT_NMAP_WORKERS, ports=None):
+        self.target = target
+        self.output_dir = output_dir
+        self.shard_dir = os.path.join(output_dir, 'nmap_shards')
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self.runner = runner
+        self.cache = cache
+        self.workers = max(1, workers or 1)
+        self.ports = expand_ports(ports) if ports else top_ports()
+        self._slots = asyncio.Semaphore(self.workers)
+
+    async def _nmap(self, args, output_file, label):
+        """Run one nmap invocation in a worker slot; returns output_file or None"""
+        async with self._slots:
+            ok = await self.cache.run(self.runner, ['nmap', *args, '-oX', output_file],
+                                      output_file, self.target, check=True, label=label)
+        return output_file if ok and os.path.exists(output_file) else None
+
+    async def discover(self):
+        """Live hosts of the target; a single host is scanned by its own name"""
+        if not is_range(self.target):
+            return [self.target]
+        output_file = os.path.join(self.shard_dir, 'discovery.xml')
+        print(f"[*] Nmap host discovery on {self.target}...")
+        if not await self._nmap(['-sn', '-n', '-T4', self.target], output_file, 'Nmap discovery'):
+            return []
+        hosts = [_host_address(host) for host in iter_nmap_hosts(output_file) if _host_up(host)]
+        return [host for host in hosts if host]
+
+    def port_shards(self, hosts):
+        """(host block, ports) pairs, so there are at least as many shards as workers"""
+        blocks = split(hosts, math.ceil(len(hosts) / HOST_BLOCK_SIZE))
+        if self.ports is None:
+            # Without nmap-services the top ports cannot be split
+            return [(block, None) for block in blocks]
+        port_chunks = split(self.ports, max(1, min(len(self.ports), math.ceil(self.workers / len(blocks)))))
+        return [(block, ports) for block in blocks for ports in port_chunks]
+
+    async def scan_ports(self, hosts):
+        """SYN scan every shard in parallel; returns host -> open port numbers"""
+        shards = self.port_shards(hosts)
+        print(f"[*] Nmap port scan of {len(hosts)} hosts in {len(shards)} shards "
+              f"across {self.workers} workers...")
+        scans = []
+        for i, (block, ports) in enumerate(shards):
+            port_args = ['-p', port_spec(ports)] if ports else ['--top-ports', str(TOP_PORTS)]
+            output_file = os.path.join(self.shard_dir, f"ports_{i:04d}.xml")
+            scans.append(self._nmap(['-sS', '-Pn', '-n', '-T4', '--max-retries', '2', *port_args, *block],
+                                    output_file, f"Nmap ports {i + 1}/{len(shards)}"))
+
+        open_ports = {}
+        for (block, _), output_file in zip(shards, await asyncio.gather(*scans)):
+            if output_file is None:
+                continue
+            for host in iter_nmap_hosts(output_file):
+                # A single host keeps the name it was given, e.g. a hostname
+                address = block[0] if len(block) == 1 else _host_address(host)
+                for port in host.findall('ports/port'):
+                    state = port.find('state')
+                    if state is not None and state.get('state') == 'open':
+                        open_ports.setdefault(address, set()).add(int(port.get('portid')))
+        return open_ports
+
+    async def scan_services(self, open_ports):
+        """-sV -sC -O --traceroute on the open ports only, blocks of hosts with similar ports together"""
+        hosts = sorted(open_ports, key=lambda host: (sorted(open_ports[host]), host))
+        blocks = split(hosts, math.ceil(len(hosts) / HOST_BLOCK_SIZE))
+        print(f"[*] Nmap service scan of {len(hosts)} hosts in {len(blocks)} shards...")
+        scans = []
+        for i, block in enumerate(blocks):
+            ports = sorted(set().union(*(open_ports[host] for host in block)))
+            output_file = os.path.join(self.shard_dir, f"services_{i:04d}.xml")
+            scans.append(self._nmap(['-sS', '-sV', '-sC', '-O', '--traceroute', '-Pn', '-T4', '--max-retries', '2',
+                                     '-p', port_spec(ports), *block],
+                                    output_file, f"Nmap services {i + 1}/{len(blocks)}"))
+        return [output_file for output_file in await asyncio.gather(*scans) if output_file]
+
+    async def run(self, output_file):
+        """Run all stages and merge the service scans into output_file"""
+        hosts = await self.discover()
+        if not hosts:
+            print(f"[-] Nmap found no live hosts in {self.target}")
+            return None
+        open_ports = await self.scan_ports(hosts)
+        if not open_ports:
+            print(f"[*] Nmap found no open ports on {len(hosts)} hosts")
+        service_files = await self.scan_services(open_ports) if open_ports else []
+        merge_nmap_xml(service_files, output_file, f"staged scan of {self.target}")
+        return output_file
+
+
+def merge_nmap_xml(paths, output_file, args=''):
+    """Stream the <host> elements of several Nmap XML files into one document"""
+    tmp_file = f"{output_file}.tmp"
+    hosts = 0
+    with open(tmp_file, 'w', encoding='utf-8') as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write(f'<nmaprun scanner="nmap" args={quoteattr(args)}>\n')
+        for path in paths:
+            for host in iter_nmap_hosts(path):
+                out.write(ET.tostring(host, encoding='unicode').rstrip() + '\n')
+                hosts += 1
+        out.write(f'<runstats><hosts up="{hosts}" down="0" total="{hosts}"/></runstats>\n</nmaprun>\n')
+    os.replace(tmp_file, output_file)
+    return hosts
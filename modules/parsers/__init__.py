@@ -0,0 +1,47 @@
+"""
+Streaming parsers for raw tool output
+
+Every parser takes the path of an output file and a state dict that the
+caller persists between runs, and yields normalized finding records.
+"""
+from .base import LineReader, make_finding, skip_unchanged
+from .dirb import parse_dirb
+from .metasploit import parse_msf_results
+from .nikto import parse_nikto, parse_nikto_json, parse_nikto_text, parse_nikto_xml
+from .nmap import iter_nmap_hosts, parse_nmap_xml
+from .pcap import PcapSummary, analyze_capture, iter_pcap_records, parse_pcap
+from .searchsploit import parse_searchsploit, parse_searchsploit_json, parse_searchsploit_text
+from .sqlmap import parse_sqlmap_log
+from .xsser import parse_xsser
+from .zap import parse_zap, parse_zap_json, parse_zap_xml
+from .registry import PARSERS, ParserSpec, parse_source, register_parser
+
+__all__ = [
+    'LineReader',
+    'make_finding',
+    'skip_unchanged',
+    'parse_dirb',
+    'parse_msf_results',
+    'parse_nikto',
+    'parse_nikto_json',
+    'parse_nikto_text',
+    'parse_nikto_xml',
+    'iter_nmap_hosts',
+    'parse_nmap_xml',
+    'PcapSummary',
+    'analyze_capture',
+    'iter_pcap_records',
+    'parse_pcap',
+    'parse_searchsploit',
+    'parse_searchsploit_json',
+    'parse_searchsploit_text',
+    'parse_sqlmap_log',
+    'parse_xsser',
+    'parse_zap',
+    'parse_zap_json',
+    'parse_zap_xml',
+    'PARSERS',
+    'ParserSpec',
+    'parse_source',
+    'register_parser'
+]
@@ -0,0 +1,107 @@
+"""
+Shared building blocks for the tool output parsers
+"""
+import os
+
+# Bytes before the saved offset compared to notice a file rewritten in place
+TAIL_CHECK_SIZE = 64
+
+
+def make_finding(tool, finding_type, description, severity=None, **fields):
+    """Build a normalized finding record; the analyzer fills in a missing severity"""
+    finding = {
+        'tool': tool,
+        'type': finding_type,
+        'description': description,
+        'severity': severity,
+    }
+    finding.update(fields)
+    return finding
+
+
+def file_identity(path):
+    """(inode, device) pair used to notice that a file was replaced"""
+    st = os.stat(path)
+    return [st.st_ino, st.st_dev]
+
+
+def skip_unchanged(path, state):
+    """
+    True if path is unchanged since the state was saved.
+
+    Used by parsers of formats that can only be read as a whole (XML, JSON);
+    when the file changed, the state is reset and state['reset'] is set.
+    """
+    st = os.stat(path)
+    signature = [st.st_ino, st.st_size, st.st_mtime_ns]
+    if state.get('signature') == signature:
+        return True
+    state.clear()
+    state['signature'] = signature
+    state['reset'] = True
+    return False
+
+
+class LineReader:
+    """
+    Streams lines of a text file starting at a saved byte offset.
+
+    `state` is a plain dict that the caller persists between runs. The
+    reader keeps state['offset'] pointing just past the last line it
+    yielded, so a later run only sees lines appended since. If the file was
+    truncated, replaced or rewritten in place (the bytes just before the last
+    read position changed), the offset and any parser context are reset and
+    state['reset'] is set so the caller can drop what it derived before.
+    With final=False an unterminated last line is left for the next run,
+    which is what a reader following a file that is still being written
+    wants.
+    """
+
+    def __init__(self, path, state, final=True):
+        self.path = path
+        self.state = state
+        self.final = final
+        self.line_start = None  # byte offset of the line last yielded
+
+    @property
+    def context(self):
+        """Parser context kept in the state (e.g. the block being read); cleared on reset"""
+        return self.state.setdefault('context', {})
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            st = os.fstat(f.fileno())
+            identity = [st.st_ino, st.st_dev]
+            offset = self.state.get('offset', 0)
+            if (self.state.get('identity') != identity or st.st_size < offset
+                    or not self._tail_matches(f)):
+                offset = 0
+                self.state.clear()
+                self.state['identity'] = identity
+                self.state['reset'] = True
+            self.state['offset'] = offset
+            f.seek(offset)
+
+            for raw in f:
+                if not raw.endswith(b'\n') and not self.final:
+                    break
+                self.line_start = offset
+                offset += len(raw)
+                self.state['offset'] = offset
+                yield raw.decode('utf-8', 'replace').rstrip('\r\n')
+
+            self._save_tail(f, offset)
+
+    def _tail_matches(self, f):
+        tail = self.state.get('tail')
+        if not tail:
+            return True
+        end, expected = tail
+        start = max(0, end - TAIL_CHECK_SIZE)
+        f.seek(start)
+        return f.read(end - start).hex() == expected
+
+    def _save_tail(self, f, offset):
+        start = max(0, offset - TAIL_CHECK_SIZE)
+        f.seek(start)
+        self.state['tail'] = [offset, f.read(offset - start).hex()]
@@ -0,0 +1,152 @@
+"""
+DIRB output parser with soft-404 clustering
+
+Servers that answer every request with the same "not found" page make DIRB
+report most of its wordlist as hits (DIRB warns "NOT_FOUND page not
+stable"). Hits of each scan are grouped by (status code, size bucket);
+clusters that dominate the scan are reported once as soft-404 noise and
+their members are dropped, so only real discoveries remain.
+
+Each scan in the file is processed in two linear passes: the first counts
+cluster sizes while streaming, the second re-reads the scan's byte range
+and emits the hits outside noise clusters. Memory is proportional to the
+number of clusters, not to the number of hits.
+"""
+import re
+from urllib.parse import urlparse
+
+from .base import LineReader, make_finding
+
+SIZE_BUCKET = 32          # bytes per size bucket
+SOFT404_MIN_HITS = 10     # smallest cluster that can be noise
+SOFT404_RATIO = 0.3       # share of a scan's hits that makes a cluster dominant
+
+_HIT_RE = re.compile(r'^\+ (\S+) \(CODE:(\d+)\|SIZE:(\d+)\)')
+_DIRECTORY_RE = re.compile(r'^==> DIRECTORY: (\S+)')
+_UNSTABLE_RE = re.compile(r'NOT_FOUND\[\] page not stable.*\{([\d,\s]+)\}')
+_SENSITIVE_RE = re.compile(
+    r'(/\.(git|svn|hg|env|htpasswd|htaccess|bash_history|ssh)\b|backup|\.sql\b|\.bak\b|'
+    r'phpinfo|/admin|/config|/server-status)', re.IGNORECASE)
+
+
+def _new_scan(start):
+    return {'start': start, 'base': None, 'unstable': [], 'clusters': {}, 'hits': 0}
+
+
+def _noise_clusters(scan):
+    """Return {(code, bucket): (count, min size, max size)} for soft-404 clusters"""
+    by_code = {}
+    for key, (count, low, high) in scan['clusters'].items():
+        code, bucket = key.split(':')
+        by_code.setdefault(code, []).append((int(bucket), count, low, high))
+
+    noise = {}
+    for code, buckets in by_code.items():
+        buckets.sort()
+        groups, current = [], [buckets[0]]
+        for item in buckets[1:]:
+            if item[0] - current[-1][0] <= 1:
+                current.append(item)
+            else:
+                groups.append(current)
+                current = [item]
+        groups.append(current)
+
+        for group in groups:
+            count = sum(item[1] for item in group)
+            dominant = count >= SOFT404_MIN_HITS and (
+                int(code) in scan['unstable'] or count >= SOFT404_RATIO * scan['hits'])
+            if dominant:
+                summary = (count, min(item[2] for item in group), max(item[3] for item in group))
+                for item in group:
+                    noise[f"{code}:{item[0]}"] = summary
+    return noise
+
+
+def _emit_scan(path, scan, end):
+    """Second pass over one scan: yield real discoveries and noise summaries"""
+    noise = _noise_clusters(scan)
+    target = urlparse(scan['base']).hostname if scan['base'] else None
+
+    with open(path, 'rb') as f:
+        f.seek(scan['start'])
+        remaining = end - scan['start']
+        while remaining > 0:
+            raw = f.readline()
+            if not raw:
+                break
+            remaining -= len(raw)
+            line = raw.decode('utf-8', 'replace').rstrip('\r\n')
+
+            match = _HIT_RE.match(line)
+            if match:
+                url, code, size = match.group(1), match.group(2), int(match.group(3))
+                if f"{code}:{size // SIZE_BUCKET}" in noise:
+                    continue
+                item_path = urlparse(url).path or '/'
+                severity = 'Medium' if _SENSITIVE_RE.search(item_path) else None
+                yield make_finding(
+                    'DIRB', 'Discovered Content', f"{url} (CODE:{code}|SIZE:{size})", severity,
+                    target=target, path=item_path, url=url, status=int(code), size=size)
+                continue
+
+            match = _DIRECTORY_RE.match(line)
+            if match:
+                url = match.group(1)
+                yield make_finding(
+                    'DIRB', 'Discovered Directory', f"Directory found: {url}",
+                    target=target, path=urlparse(url).path or '/', url=url)
+
+    reported = set()
+    for key, (count, low, high) in noise.items():
+        if (count, low, high) in reported:
+            continue
+        reported.add((count, low, high))
+        code = key.split(':')[0]
+        yield make_finding(
+            'DIRB', 'Soft-404 Noise',
+            f"{count} responses with CODE:{code} and size {low}-{high} bytes were treated as "
+            f"soft-404 noise on {scan['base']}", 'Low',
+            target=target, path=f"<soft-404:{code}>", status=int(code))
+
+
+def parse_dirb(path, state, final=True):
+    """Yield findings from a DIRB output file, resuming at the last unfinished scan"""
+    reader = LineReader(path, state, final=final)
+    scan = state.get('scan')
+
+    for line in reader:
+        if scan is None or 'scan' not in state:
+            # First line, or the reader reset the state because the file was replaced
+            scan = state['scan'] = _new_scan(reader.line_start)
+
+        if line.startswith('DIRB v') and (scan['hits'] or scan['base']):
+            yield from _emit_scan(path, scan, reader.line_start)
+            scan = state['scan'] = _new_scan(reader.line_start)
+        elif line.startswith('URL_BASE:'):
+            scan['base'] = line.split(':', 1)[1].strip()
+        elif line.startswith('END_TIME:'):
+            yield from _emit_scan(path, scan, state['offset'])
+            scan = state['scan'] = _new_scan(state['offset'])
+            continue
+
+        match = _UNSTABLE_RE.search(line)
+        if match:
+            scan['unstable'] = [int(c) for c in re.findall(r'\d+', match.group(1))]
+            continue
+
+        match = _HIT_RE.match(line)
+        if match:
+            code, size = match.group(2), int(match.group(3))
+            key = f"{code}:{size // SIZE_BUCKET}"
+            count, low, high = scan['clusters'].get(key, (0, size, size))
+            scan['clusters'][key] = (count + 1, min(low, size), max(high, size))
+            scan['hits'] += 1
+
+    if scan is not None and final and (scan['hits'] or scan['base']):
+        yield from _emit_scan(path, scan, state['offset'])
+        state['scan'] = _new_scan(state['offset'])
+    elif scan is not None:
+        # Resume at the start of the unfinished scan so its clusters are rebuilt
+        state['offset'] = scan['start']
+        state.pop('scan', None)
@@ -0,0 +1,64 @@
+"""
+Metasploit console output parser
+
+Reads the transcript msfconsole -o writes while it runs a resource script.
+The module producing each line is followed through "use <module>"
+commands and "auxiliary(<module>) >" prompts; module output lines
+("[+] host:port - message") become findings tagged with that module:
+open ports from the port scanners, version banners, vulnerable hosts and
+any other positive result.
+"""
+import re
+
+from .base import LineReader, make_finding
+
+_USE_RE = re.compile(r'\buse\s+((?:auxiliary|exploit|post|payload)/\S+)')
+_PROMPT_RE = re.compile(r'\b(auxiliary|exploit|post)\(([^)]+)\)\s*>')
+_RESULT_RE = re.compile(r'^\[([+*!])\] ([\w.-]+):(\d*)\s+(?:-\s+)?(.*?)\s*$')
+_OPEN_PORT_RE = re.compile(r'(?:^|\s)(?:[\w.-]+:)?(\d+) - TCP OPEN$')
+_DETECTED_RE = re.compile(r'\b(?:Detected|Host is running|Host could not be identified)\b|^[\w-]+/\d')
+_NOISE_RE = re.compile(r'^Scanned \d+ of \d+ hosts|module execution completed', re.IGNORECASE)
+
+
+def parse_msf_results(path, state, final=True):
+    """Yield findings from module output lines, resuming at state['offset']"""
+    reader = LineReader(path, state, final=final)
+    for line in reader:
+        context = reader.context
+        match = _USE_RE.search(line)
+        if match:
+            context['module'] = match.group(1)
+            continue
+        match = _PROMPT_RE.search(line)
+        if match:
+            context['module'] = f"{match.group(1)}/{match.group(2)}"
+            continue
+
+        match = _RESULT_RE.match(line)
+        if not match:
+            continue
+        level, host, port, message = match.groups()
+        if not message or _NOISE_RE.search(message):
+            continue
+        module = context.get('module')
+        port = int(port) if port else None
+
+        open_port = _OPEN_PORT_RE.search(message)
+        if open_port:
+            port = int(open_port.group(1))
+            yield make_finding(
+                'Metasploit', 'Open Port', f"Port {port}/tcp is open", None,
+                target=host, port=port, protocol='tcp', service='', state='open',
+                module=module, message=message)
+        elif 'VULNERABLE' in message.upper() and 'NOT VULNERABLE' not in message.upper():
+            yield make_finding(
+                'Metasploit', 'Vulnerability', message, 'High',
+                target=host, port=port, module=module, exploit_id=module, message=message)
+        elif _DETECTED_RE.search(message):
+            yield make_finding(
+                'Metasploit', 'Service Version', message, 'Low',
+                target=host, port=port, module=module, version=message, message=message)
+        elif level == '+':
+            yield make_finding(
+                'Metasploit', 'Metasploit Result', message, None,
+                target=host, port=port, module=module, message=message)
@@ -0,0 +1,151 @@
+"""
+Nikto output parsers
+
+Handles the plain text format written by `nikto -output file.txt` (both the
+Nikto 2.5 "+ METHOD /path: message" lines and older "+ OSVDB-n: /path:
+message" lines) as well as Nikto's XML and JSON formats. The text parser is
+line-streaming and resumable from a byte offset.
+"""
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+
+from .base import LineReader, make_finding, skip_unchanged
+
+# Header lines that describe the scanned target rather than a finding
+_CONTEXT_RE = re.compile(
+    r'^\+ (Target IP|Target Hostname|Target Host|Target Port|Start Time|End Time|'
+    r'Server|SSL Info|Platform|Root page / redirects to)\s*:\s*(.*)$')
+_OSVDB_RE = re.compile(r'^\+ (OSVDB-\d+): (.*)$')
+_METHOD_RE = re.compile(r'^\+ ([A-Z]{3,10}) (.*)$')
+_BARE_PATH_RE = re.compile(r'^\+ (/.*)$')
+_REFERENCE_RE = re.compile(r'\s*See: (\S+?):?\s*$')
+_NOISE_RE = re.compile(r'^\+ (ERROR|\d+ requests|\d+ host\(s\) tested|No web server found)')
+
+
+def _split_path(rest):
+    """Split '/path: message' into (path, message); messages may have no path"""
+    if rest.startswith('/'):
+        path, sep, message = rest.partition(': ')
+        if sep:
+            return path, message
+    return None, rest
+
+
+def _build(context, method, path, message, reference_id):
+    message = message.strip()
+    if path and message.startswith(path + ': '):
+        message = message[len(path) + 2:]
+    references = []
+    match = _REFERENCE_RE.search(message)
+    if match:
+        references.append(match.group(1))
+        message = message[:match.start()].rstrip()
+    if reference_id:
+        references.insert(0, reference_id)
+
+    description = message
+    if path:
+        description = f"{path}: {message}"
+    if method:
+        description = f"{method} {description}"
+
+    return make_finding(
+        'Nikto', 'Web Vulnerability', description,
+        target=context.get('host'),
+        port=context.get('port'),
+        method=method,
+        path=path,
+        message=message,
+        references=references,
+    )
+
+
+def parse_nikto_text(path, state, final=True):
+    """Yield findings from a Nikto text log, resuming at state['offset']"""
+    reader = LineReader(path, state, final=final)
+    for line in reader:
+        context = reader.context
+        if line.startswith('- Nikto'):
+            context.clear()
+            continue
+        if not line.startswith('+ '):
+            continue
+
+        match = _CONTEXT_RE.match(line)
+        if match:
+            key, value = match.groups()
+            if key in ('Target Host', 'Target Hostname') or (key == 'Target IP' and 'host' not in context):
+                context['host'] = value.strip()
+            elif key == 'Target Port':
+                context['port'] = value.strip()
+            continue
+        if _NOISE_RE.match(line):
+            continue
+
+        match = _OSVDB_RE.match(line)
+        if match:
+            reference_id, rest = match.groups()
+            item_path, message = _split_path(rest)
+            yield _build(context, None, item_path, message, reference_id)
+            continue
+
+        match = _METHOD_RE.match(line)
+        if match:
+            method, rest = match.groups()
+            item_path, message = _split_path(rest)
+            yield _build(context, method, item_path, message, None)
+            continue
+
+        match = _BARE_PATH_RE.match(line)
+        if match:
+            item_path, message = _split_path(match.group(1))
+            yield _build(context, None, item_path, message, None)
+
+
+def parse_nikto_xml(path, state, final=True):
+    """Yield findings from `nikto -Format xml` output, one <item> at a time"""
+    if skip_unchanged(path, state):
+        return
+    context = {}
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start' and elem.tag == 'scandetails':
+            context = {
+                'host': elem.get('targethostname') or elem.get('targetip'),
+                'port': elem.get('targetport'),
+            }
+        elif event == 'end' and elem.tag == 'item':
+            osvdb = elem.get('osvdbid')
+            reference_id = f"OSVDB-{osvdb}" if osvdb and osvdb != '0' else None
+            yield _build(context, elem.get('method'), elem.findtext('uri'),
+                         elem.findtext('description') or '', reference_id)
+            elem.clear()
+        elif event == 'end' and elem.tag == 'scandetails':
+            elem.clear()
+
+
+def parse_nikto_json(path, state, final=True):
+    """Yield findings from `nikto -Format json` output"""
+    if skip_unchanged(path, state):
+        return
+    with open(path) as f:
+        scans = json.load(f)
+    if isinstance(scans, dict):
+        scans = [scans]
+    for scan in scans:
+        context = {'host': scan.get('host') or scan.get('ip'), 'port': scan.get('port')}
+        for vuln in scan.get('vulnerabilities', []):
+            reference_id = vuln.get('OSVDB') or vuln.get('id')
+            yield _build(context, vuln.get('method'), vuln.get('url'), vuln.get('msg', ''),
+                         reference_id)
+
+
+def parse_nikto(path, state, final=True):
+    """Dispatch to the parser matching the output format of path"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.xml':
+        return parse_nikto_xml(path, state, final)
+    if extension == '.json':
+        return parse_nikto_json(path, state, final)
+    return parse_nikto_text(path, state, final)
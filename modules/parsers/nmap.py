@@ -0,0 +1,87 @@
+"""
+Streaming Nmap XML output parser
+
+Uses iterparse and clears every <host> once it has been handled, so peak
+memory stays constant no matter how many hosts a sweep covers.
+"""
+import xml.etree.ElementTree as ET
+
+from .base import make_finding, skip_unchanged
+
+
+def _host_details(host):
+    addresses = [{'addr': a.get('addr'), 'type': a.get('addrtype')} for a in host.findall('address')]
+    hostnames = [h.get('name') for h in host.findall('hostnames/hostname') if h.get('name')]
+    # Prefer an IP address over a MAC address as the host identifier
+    ip = next((a['addr'] for a in addresses if a['type'] in ('ipv4', 'ipv6')), None)
+    if ip is None and addresses:
+        ip = addresses[0]['addr']
+    return ip, addresses, hostnames
+
+
+def _scripts(parent):
+    return {s.get('id'): (s.get('output') or '').strip() for s in parent.findall('script')}
+
+
+def _host_findings(host):
+    ip, addresses, hostnames = _host_details(host)
+    common = {'target': ip, 'addresses': addresses, 'hostnames': hostnames}
+
+    for port in host.findall('ports/port'):
+        service = port.find('service')
+        if service is None:
+            continue
+        state = port.find('state')
+        port_id = port.get('portid')
+        protocol = port.get('protocol')
+        port_state = state.get('state') if state is not None else 'unknown'
+        service_name = service.get('name')
+        product = ' '.join(v for v in (service.get('product'), service.get('version'),
+                                       service.get('extrainfo')) if v)
+        scripts = _scripts(port)
+
+        label = f"{service_name} {product}" if product else service_name
+        description = f'Port {port_id}/{protocol} ({label}) is {port_state}'
+        yield make_finding(
+            'Nmap', 'Open Port', description, **common,
+            port=port_id, protocol=protocol, state=port_state, service=service_name,
+            product=service.get('product'), version=service.get('version'),
+            message=description, scripts=scripts)
+
+        for script_id, output in scripts.items():
+            if 'VULNERABLE' in output:
+                yield make_finding(
+                    'Nmap', 'NSE Vulnerability', f'{script_id} on port {port_id}/{protocol}: '
+                    f'{output.splitlines()[0] if output else ""}', 'High', **common,
+                    port=port_id, protocol=protocol, script=script_id, output=output,
+                    message=f'{script_id} vulnerable')
+
+    hostscript = host.find('hostscript')
+    if hostscript is not None:
+        for script_id, output in _scripts(hostscript).items():
+            severity = 'High' if 'VULNERABLE' in output else 'Low'
+            yield make_finding(
+                'Nmap', 'Host Script Output', f'{script_id}: {output.splitlines()[0] if output else ""}',
+                severity, **common, script=script_id, output=output, message=script_id)
+
+
+def iter_nmap_hosts(path):
+    """Yield each completed <host> element of an Nmap XML file, then free it"""
+    context = ET.iterparse(path, events=('start', 'end'))
+    root = None
+    for event, elem in context:
+        if root is None:
+            root = elem
+        if event == 'end' and elem.tag == 'host':
+            yield elem
+            elem.clear()
+            # Drop the cleared host from the root as well
+            root.clear()
+
+
+def parse_nmap_xml(path, state, final=True):
+    """Yield port, NSE and host script findings for every host, streaming"""
+    if skip_unchanged(path, state):
+        return
+    for host in iter_nmap_hosts(path):
+        yield from _host_findings(host)
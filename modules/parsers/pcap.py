@@ -0,0 +1,397 @@
+"""
+Streaming pcap/pcapng analysis
+
+Memory-maps the capture and decodes link, IP and TCP/UDP headers with
+struct.unpack_from straight from the mapping, so no per-packet objects are
+built beyond the flow key. Produces flow summaries, top talkers, protocol
+counts and detections of cleartext protocols and credentials.
+"""
+import base64
+import mmap
+import os
+import socket
+import struct
+from collections import Counter
+
+from .base import make_finding, skip_unchanged
+
+PCAP_MAGICS = {
+    b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+    b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+    b'\x4d\x3c\xb2\xa1': ('<', 1e-9),
+    b'\xa1\xb2\x3c\x4d': ('>', 1e-9),
+}
+PCAPNG_SHB = 0x0A0D0D0A
+
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_LINUX_SLL2 = 276
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_ARP = 0x0806
+ETHERTYPE_IPV6 = 0x86DD
+ETHERTYPE_VLAN = (0x8100, 0x88A8)
+
+IP_PROTOCOLS = {1: 'ICMP', 2: 'IGMP', 6: 'TCP', 17: 'UDP', 47: 'GRE', 50: 'ESP', 58: 'ICMPv6', 132: 'SCTP'}
+# IPv6 extension headers skipped to reach the transport header
+IPV6_EXTENSION_HEADERS = (0, 43, 44, 60)
+
+# Well-known ports of protocols that carry data, and often credentials, in the clear
+CLEARTEXT_PORTS = {
+    21: 'FTP',
+    23: 'Telnet',
+    25: 'SMTP',
+    80: 'HTTP',
+    110: 'POP3',
+    143: 'IMAP',
+    8080: 'HTTP',
+}
+# Payload prefixes that mean a client is sending credentials
+CREDENTIAL_MARKERS = {
+    'FTP': (b'USER ', b'PASS '),
+    'POP3': (b'USER ', b'PASS '),
+    'IMAP': (b'LOGIN ',),
+    'SMTP': (b'AUTH ',),
+}
+BASIC_AUTH = b'Authorization: Basic '
+
+_ipv4 = struct.Struct('!B8xB2xII')
+_ports = struct.Struct('!HH')
+
+
+def _protocol_name(proto):
+    return IP_PROTOCOLS.get(proto, str(proto))
+
+
+def _format_ip(address):
+    if isinstance(address, int):
+        return socket.inet_ntoa(address.to_bytes(4, 'big'))
+    return socket.inet_ntop(socket.AF_INET6, address)
+
+
+def iter_pcap_records(buf):
+    """
+    Yield (offset, caplen, linktype, timestamp) for every packet in a
+    pcap or pcapng buffer. The packet bytes are buf[offset:offset + caplen].
+    """
+    magic = bytes(buf[:4])
+    if magic in PCAP_MAGICS:
+        yield from _iter_pcap(buf, *PCAP_MAGICS[magic])
+    elif len(buf) >= 12 and struct.unpack_from('<I', buf, 0)[0] == PCAPNG_SHB:
+        yield from _iter_pcapng(buf)
+    else:
+        raise ValueError('not a pcap or pcapng capture')
+
+
+def _iter_pcap(buf, endian, resolution):
+    linktype = struct.unpack_from(endian + 'I', buf, 20)[0] & 0x0FFFFFFF
+    record = struct.Struct(endian + 'IIII')
+    offset, size = 24, len(buf)
+    while offset + 16 <= size:
+        seconds, fraction, caplen, _ = record.unpack_from(buf, offset)
+        offset += 16
+        if offset + caplen > size:
+            break  # truncated last packet of a capture still being written
+        yield offset, caplen, linktype, seconds + fraction * resolution
+        offset += caplen
+
+
+def _iter_pcapng(buf):
+    size = len(buf)
+    offset = 0
+    endian = '<'
+    interfaces = []  # (linktype, timestamp resolution) per interface id
+    while offset + 12 <= size:
+        block_type = struct.unpack_from(endian + 'I', buf, offset)[0]
+        if block_type == PCAPNG_SHB:
+            endian = '<' if bytes(buf[offset + 8:offset + 12]) == b'\x4d\x3c\x2b\x1a' else '>'
+            interfaces = []
+        block_len = struct.unpack_from(endian + 'I', buf, offset + 4)[0]
+        if block_len < 12 or offset + block_len > size:
+            break
+
+        if block_type == 1:  # Interface Description Block
+            linktype = struct.unpack_from(endian + 'H', buf, offset + 8)[0]
+            interfaces.append((linktype, _if_tsresol(buf, endian, offset + 16, offset + block_len - 4)))
+        elif block_type in (6, 2):  # Enhanced / obsolete Packet Block
+            if block_type == 6:
+                iface, ts_high, ts_low, caplen = struct.unpack_from(endian + 'IIII', buf, offset + 8)
+            else:
+                iface, _, ts_high, ts_low, caplen = struct.unpack_from(endian + 'HHIII', buf, offset + 8)
+            if iface < len(interfaces):
+                linktype, resolution = interfaces[iface]
+                yield offset + 28, caplen, linktype, ((ts_high << 32) | ts_low) * resolution
+        elif block_type == 3 and interfaces:  # Simple Packet Block
+            orig_len = struct.unpack_from(endian + 'I', buf, offset + 8)[0]
+            yield offset + 12, min(orig_len, block_len - 16), interfaces[0][0], 0.0
+        offset += block_len
+
+
+def _if_tsresol(buf, endian, offset, end):
+    while offset + 4 <= end:
+        code, length = struct.unpack_from(endian + 'HH', buf, offset)
+        if code == 0:
+            break
+        if code == 9 and length >= 1:
+            value = buf[offset + 4]
+            return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+        offset += 4 + (length + 3) // 4 * 4
+    return 1e-6
+
+
+def _network_offset(buf, offset, caplen, linktype):
+    """Return (ethertype, offset of the network header) or (None, None)"""
+    if linktype == LINKTYPE_ETHERNET:
+        if caplen < 14:
+            return None, None
+        ethertype = struct.unpack_from('!H', buf, offset + 12)[0]
+        start = offset + 14
+        while ethertype in ETHERTYPE_VLAN and start + 4 <= offset + caplen:
+            ethertype = struct.unpack_from('!H', buf, start + 2)[0]
+            start += 4
+        return ethertype, start
+    if linktype == LINKTYPE_LINUX_SLL:
+        if caplen < 16:
+            return None, None
+        return struct.unpack_from('!H', buf, offset + 14)[0], offset + 16
+    if linktype == LINKTYPE_LINUX_SLL2:
+        if caplen < 20:
+            return None, None
+        return struct.unpack_from('!H', buf, offset)[0], offset + 20
+    if linktype == LINKTYPE_RAW:
+        version = buf[offset] >> 4 if caplen else 0
+        return (ETHERTYPE_IPV4 if version == 4 else ETHERTYPE_IPV6 if version == 6 else None), offset
+    if linktype == LINKTYPE_NULL:
+        if caplen < 4:
+            return None, None
+        version = buf[offset + 4] >> 4 if caplen > 4 else 0
+        return (ETHERTYPE_IPV4 if version == 4 else ETHERTYPE_IPV6 if version == 6 else None), offset + 4
+    return None, None
+
+
+class PcapSummary:
+    """Flow, talker, protocol and cleartext statistics of one capture"""
+
+    def __init__(self):
+        self.packets = 0
+        self.bytes = 0
+        self.undecoded = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.protocols = Counter()  # IP protocol number (or 'ARP') -> packets
+        self.talkers = Counter()  # address -> bytes sent and received
+        self.flows = {}  # (IP protocol, addr, port, addr, port) -> [packets, bytes, first, last]
+        self.cleartext = {}  # (protocol, client, server, port) -> detection dict
+
+    def merge(self, other):
+        """Add the statistics of another capture, e.g. the next ring segment"""
+        self.packets += other.packets
+        self.bytes += other.bytes
+        self.undecoded += other.undecoded
+        if other.first_ts is not None and (self.first_ts is None or other.first_ts < self.first_ts):
+            self.first_ts = other.first_ts
+        if other.last_ts is not None and (self.last_ts is None or other.last_ts > self.last_ts):
+            self.last_ts = other.last_ts
+        self.protocols.update(other.protocols)
+        self.talkers.update(other.talkers)
+        for key, (packets, total, first, last) in other.flows.items():
+            flow = self.flows.get(key)
+            if flow is None:
+                self.flows[key] = [packets, total, first, last]
+            else:
+                flow[0] += packets
+                flow[1] += total
+                flow[2] = min(flow[2], first)
+                flow[3] = max(flow[3], last)
+        for key, detection in other.cleartext.items():
+            known = self.cleartext.get(key)
+            if known is None or (detection['credentials'] and not known['credentials']):
+                self.cleartext[key] = detection
+        return self
+
+    def top_talkers(self, count=10):
+        return [(_format_ip(addr), total) for addr, total in self.talkers.most_common(count)]
+
+    def top_flows(self, count=10):
+        ranked = sorted(self.flows.items(), key=lambda item: item[1][1], reverse=True)[:count]
+        return [{
+            'protocol': _protocol_name(key[0]),
+            'src': _format_ip(key[1]), 'sport': key[2],
+            'dst': _format_ip(key[3]), 'dport': key[4],
+            'packets': value[0], 'bytes': value[1],
+            'first_seen': value[2], 'last_seen': value[3],
+        } for key, value in ranked]
+
+    def as_dict(self, top=10):
+        return {
+            'packets': self.packets,
+            'bytes': self.bytes,
+            'undecoded': self.undecoded,
+            'first_seen': self.first_ts,
+            'last_seen': self.last_ts,
+            'flows': len(self.flows),
+            'protocols': {_protocol_name(p): n for p, n in self.protocols.most_common()},
+            'top_talkers': [{'address': a, 'bytes': b} for a, b in self.top_talkers(top)],
+            'top_flows': self.top_flows(top),
+            'cleartext': list(self.cleartext.values()),
+        }
+
+
+def count_packets(path):
+    """Number of complete packets in a capture, which may still be written"""
+    try:
+        if os.path.getsize(path) < 24:
+            return 0
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            return sum(1 for _ in iter_pcap_records(buf))
+    except (OSError, ValueError):
+        return 0
+
+
+def analyze_capture(path, summary=None):
+    """Stream a capture file into a PcapSummary and return it"""
+    summary = summary or PcapSummary()
+    if os.path.getsize(path) == 0:
+        return summary
+    # The loop runs once per packet: keep lookups in locals and counters in
+    # plain ints, and only write them back to the summary at the end
+    flows = summary.flows
+    talkers = summary.talkers
+    protocols = summary.protocols
+    unpack_ipv4 = _ipv4.unpack_from
+    unpack_ports = _ports.unpack_from
+    packets = total = undecoded = 0
+    first_ts = last_ts = None
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        try:
+            for offset, caplen, linktype, ts in iter_pcap_records(buf):
+                packets += 1
+                total += caplen
+                if first_ts is None:
+                    first_ts = ts
+                last_ts = ts
+                end = offset + caplen
+
+                if linktype == LINKTYPE_ETHERNET and caplen >= 14:
+                    ethertype = (buf[offset + 12] << 8) | buf[offset + 13]
+                    net = offset + 14
+                    if ethertype in ETHERTYPE_VLAN:
+                        ethertype, net = _network_offset(buf, offset, caplen, linktype)
+                else:
+                    ethertype, net = _network_offset(buf, offset, caplen, linktype)
+
+                if ethertype == ETHERTYPE_IPV4 and net + 20 <= end:
+                    version_ihl, proto, src, dst = unpack_ipv4(buf, net)
+                    transport = net + (version_ihl & 0x0F) * 4
+                elif ethertype == ETHERTYPE_IPV6 and net + 40 <= end:
+                    proto = buf[net + 6]
+                    src, dst = buf[net + 8:net + 24], buf[net + 24:net + 40]
+                    transport = net + 40
+                    while proto in IPV6_EXTENSION_HEADERS and transport + 8 <= end:
+                        header, proto = proto, buf[transport]
+                        transport += 8 if header == 44 else (buf[transport + 1] + 1) * 8
+                else:
+                    if ethertype == ETHERTYPE_ARP:
+                        protocols['ARP'] += 1
+                    else:
+                        undecoded += 1
+                    continue
+
+                protocols[proto] += 1
+                talkers[src] += caplen
+                talkers[dst] += caplen
+                sport = dport = 0
+                if (proto == 6 or proto == 17) and transport + 4 <= end:
+                    sport, dport = unpack_ports(buf, transport)
+
+                key = (proto, src, sport, dst, dport)
+                flow = flows.get(key)
+                if flow is None:
+                    flows[key] = [1, caplen, ts, ts]
+                else:
+                    flow[0] += 1
+                    flow[1] += caplen
+                    flow[3] = ts
+
+                if proto == 6 and (dport in CLEARTEXT_PORTS or sport in CLEARTEXT_PORTS) and transport + 13 <= end:
+                    payload = transport + (buf[transport + 12] >> 4) * 4
+                    if payload < end:
+                        _detect_cleartext(summary, buf, payload, end, src, sport, dst, dport, ts)
+        finally:
+            summary.packets += packets
+            summary.bytes += total
+            summary.undecoded += undecoded
+            if summary.first_ts is None:
+                summary.first_ts = first_ts
+            if last_ts is not None:
+                summary.last_ts = last_ts
+    return summary
+
+
+def _detect_cleartext(summary, buf, payload, end, src, sport, dst, dport, ts):
+    if dport in CLEARTEXT_PORTS:
+        protocol, client, server, port = CLEARTEXT_PORTS[dport], src, dst, dport
+    else:
+        protocol, client, server, port = CLEARTEXT_PORTS[sport], dst, src, sport
+    key = (protocol, client, server, port)
+    detection = summary.cleartext.get(key)
+    if detection is None:
+        detection = summary.cleartext[key] = {
+            'protocol': protocol,
+            'client': _format_ip(client),
+            'server': _format_ip(server),
+            'port': port,
+            'first_seen': ts,
+            'credentials': False,
+            'user': None,
+        }
+    if detection['credentials'] or client != src:
+        return
+
+    if protocol == 'HTTP':
+        start = buf.find(BASIC_AUTH, payload, end)
+        if start != -1:
+            start += len(BASIC_AUTH)
+            line_end = buf.find(b'\r\n', start, end)
+            token = buf[start:line_end if line_end != -1 else end]
+            try:
+                user = base64.b64decode(token, validate=False).split(b':', 1)[0]
+                detection['user'] = user.decode('utf-8', 'replace')
+            except ValueError:
+                pass
+            detection['credentials'] = True
+    elif protocol == 'Telnet':
+        # Anything a client types into telnet, including the login, is cleartext
+        detection['credentials'] = True
+    else:
+        head = buf[payload:min(end, payload + 64)]
+        for marker in CREDENTIAL_MARKERS.get(protocol, ()):
+            if head.upper().startswith(marker):
+                if marker == b'USER ':
+                    detection['user'] = head[len(marker):].split(b'\r', 1)[0].decode('utf-8', 'replace')
+                detection['credentials'] = True
+                break
+
+
+def parse_pcap(path, state, final=True):
+    """Yield cleartext protocol findings for a capture"""
+    if skip_unchanged(path, state):
+        return
+    summary = analyze_capture(path)
+    for detection in summary.cleartext.values():
+        where = f"{detection['client']} -> {detection['server']}:{detection['port']}"
+        if detection['credentials']:
+            user = f" (user {detection['user']})" if detection['user'] else ''
+            yield make_finding(
+                'PCAP', 'Cleartext Credentials',
+                f"{detection['protocol']} credentials sent in cleartext {where}{user}", 'High',
+                target=detection['server'], port=detection['port'], protocol=detection['protocol'],
+                client=detection['client'], message=f"{detection['protocol']} cleartext credentials")
+        else:
+            yield make_finding(
+                'PCAP', 'Cleartext Protocol',
+                f"{detection['protocol']} traffic in cleartext {where}", 'Medium',
+                target=detection['server'], port=detection['port'], protocol=detection['protocol'],
+                client=detection['client'], message=f"{detection['protocol']} cleartext traffic")
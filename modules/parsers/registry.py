@@ -0,0 +1,109 @@
+"""
+Parser registry
+
+Maps each tool output parser to the files it reads below an assessment
+output directory. parse_source() is the unit of work handed to the
+analyzer's process pool: it parses one source into a JSONL spool file that
+the single merge stage then writes to the findings store.
+"""
+import fnmatch
+import json
+import os
+import time
+
+from modules.finding_index import finding_key
+from modules.findings_store import source_signature
+from .dirb import parse_dirb
+from .metasploit import parse_msf_results
+from .nikto import parse_nikto
+from .nmap import parse_nmap_xml
+from .pcap import parse_pcap
+from .searchsploit import parse_searchsploit
+from .sqlmap import parse_sqlmap_log
+from .xsser import parse_xsser
+from .zap import parse_zap
+
+
+class ParserSpec:
+    def __init__(self, name, tool, directory, patterns, parser, recursive=False):
+        self.name = name
+        self.tool = tool  # tool name recorded on the findings
+        self.directory = directory  # relative to the output directory
+        self.patterns = tuple(patterns)
+        self.parser = parser
+        self.recursive = recursive
+
+    def sources(self, output_dir):
+        """Paths of existing output files this parser reads, in a stable order"""
+        base = os.path.join(output_dir, self.directory)
+        if not os.path.isdir(base):
+            return []
+        if self.recursive:
+            names = []
+            for root, dirs, files in os.walk(base):
+                dirs.sort()
+                names.extend(os.path.join(root, f) for f in sorted(files))
+        else:
+            names = [os.path.join(base, f) for f in sorted(os.listdir(base))]
+        return [p for p in names
+                if os.path.isfile(p) and any(fnmatch.fnmatch(os.path.basename(p), pat) for pat in self.patterns)]
+
+
+PARSERS = {}
+
+
+def register_parser(spec):
+    """Add a parser to the registry, replacing one with the same name"""
+    PARSERS[spec.name] = spec
+    return spec
+
+
+register_parser(ParserSpec('nikto', 'Nikto', 'web', ('nikto_scan.txt', 'nikto_scan.xml', 'nikto_scan.json'), parse_nikto))
+register_parser(ParserSpec('dirb', 'DIRB', 'web', ('dirb_scan.txt',), parse_dirb))
+register_parser(ParserSpec('sqlmap', 'SQLMap', os.path.join('web', 'sqlmap'), ('log', '*.log'), parse_sqlmap_log, recursive=True))
+register_parser(ParserSpec('xsser', 'XSSer', 'web', ('xsser_scan.txt',), parse_xsser))
+register_parser(ParserSpec('zap', 'ZAP', 'api', ('api_scan.txt', 'api_scan.xml', 'api_scan.json'), parse_zap))
+register_parser(ParserSpec('nmap', 'Nmap', 'network', ('nmap_scan.xml',), parse_nmap_xml))
+register_parser(ParserSpec('pcap', 'PCAP', 'network', ('*.pcap', '*.pcapng', '*.pcap[0-9]*'), parse_pcap))
+register_parser(ParserSpec('searchsploit', 'SearchSploit', 'exploitation',
+                           ('searchsploit_results.txt', 'searchsploit_results.json'), parse_searchsploit))
+register_parser(ParserSpec('metasploit', 'Metasploit', 'exploitation', ('msf_results.txt',), parse_msf_results))
+
+
+def parse_source(parser, path, record, spool_path, final=True):
+    """
+    Parse one source file into spool_path, one JSON finding per line.
+
+    Runs in a worker process, so it only touches the source and the spool
+    file. record is the source's previous store record (or None); a file
+    whose content hash is unchanged is not parsed. With final=False the
+    file is still being written: it is not hashed, and an unterminated last
+    line is left for a later pass. Returns a dict with the new signature
+    and parser state, whether the parser started over, the finding count
+    and the parse time.
+    """
+    start = time.perf_counter()
+    changed, signature = source_signature(path, record, hash_content=final)
+    state = record['state'] if record else {}
+    count = 0
+    reset = False
+    if changed:
+        with open(spool_path, 'w') as spool:
+            for finding in parser(path, state, final):
+                # Hashing is the costly part of deduplication, keep it in the worker
+                finding['key'] = finding_key(finding)
+                spool.write(json.dumps(finding) + '\n')
+                count += 1
+        reset = state.pop('reset', False)
+        if state.get('offset', signature[0]) < signature[0]:
+            # Bytes are left unread; record no mtime so the final pass sees the file as changed
+            signature = (signature[0], None, signature[2])
+    return {
+        'changed': changed,
+        'reset': reset,
+        'signature': signature,
+        'state': state,
+        'count': count,
+        'bytes': signature[0],
+        'elapsed': time.perf_counter() - start,
+    }
@@ -0,0 +1,94 @@
+"""
+SearchSploit output parser
+
+Reads searchsploit's result tables ("Title | platform/type/ID.ext") line by
+line, following the "[i] ... searchsploit -t <term>" headers --nmap mode
+prints before each search, or its JSON output (-j), which is one object per
+search. Every exploit becomes one finding carrying its Exploit-DB ID,
+platform and type.
+"""
+import json
+import os
+import re
+
+from .base import LineReader, make_finding, skip_unchanged
+
+_SEARCH_RE = re.compile(r'^\[i\] .*searchsploit\s+(?:-\S+\s+)*(.+?)\s*$')
+_ROW_RE = re.compile(r'^\s*(.+?)\s+\|\s+((?:[\w.-]+/)+?(\d+)\.\w+)\s*$')
+_HIGH_RE = re.compile(
+    r'remote code execution|\brce\b|command (?:injection|execution)|code execution|'
+    r'buffer overflow|remote.*overflow|authentication bypass|unauthenticated|sql injection',
+    re.IGNORECASE)
+_LOW_RE = re.compile(r'denial of service|\bdos\b|information disclosure', re.IGNORECASE)
+
+
+def _severity(title):
+    if _HIGH_RE.search(title):
+        return 'High'
+    if _LOW_RE.search(title):
+        return 'Low'
+    return 'Medium'
+
+
+def _exploit_finding(title, exploit_id, platform, exploit_type, exploit_path, search, kind='Exploit'):
+    return make_finding(
+        'SearchSploit', 'Public Exploit' if kind == 'Exploit' else 'Public Shellcode',
+        f"EDB-{exploit_id}: {title}", _severity(title),
+        exploit_id=f"EDB-{exploit_id}", title=title, platform=platform, exploit_type=exploit_type,
+        exploit_path=exploit_path, search=search, message=f"EDB-{exploit_id}")
+
+
+def parse_searchsploit_text(path, state, final=True):
+    """Yield a finding per result table row, resuming at state['offset']"""
+    reader = LineReader(path, state, final=final)
+    for line in reader:
+        context = reader.context
+        match = _SEARCH_RE.match(line)
+        if match:
+            context['search'] = match.group(1)
+            continue
+        if '|' in line and line.split('|')[0].strip() in ('Exploit Title', 'Shellcode Title'):
+            context['kind'] = line.split()[0]
+            continue
+        match = _ROW_RE.match(line)
+        if not match:
+            continue
+        title, exploit_path, exploit_id = match.groups()
+        parts = exploit_path.split('/')
+        yield _exploit_finding(
+            title, exploit_id, parts[0], parts[1] if len(parts) > 2 else None, exploit_path,
+            context.get('search'), context.get('kind', 'Exploit'))
+
+
+def parse_searchsploit_json(path, state, final=True):
+    """Yield a finding per exploit and shellcode in searchsploit -j output"""
+    if skip_unchanged(path, state):
+        return
+    with open(path, errors='replace') as f:
+        content = f.read()
+    decoder = json.JSONDecoder()
+    position = 0
+    while True:
+        # --nmap -j prints one object per search, back to back
+        start = content.find('{', position)
+        if start == -1:
+            return
+        try:
+            result, position = decoder.raw_decode(content, start)
+        except ValueError:
+            return
+        for key, kind in (('RESULTS_EXPLOIT', 'Exploit'), ('RESULTS_SHELLCODE', 'Shellcode')):
+            for row in result.get(key) or []:
+                exploit_id = row.get('EDB-ID') or os.path.splitext(os.path.basename(row.get('Path', '')))[0]
+                yield _exploit_finding(
+                    row.get('Title', ''), exploit_id, row.get('Platform'), row.get('Type'),
+                    row.get('Path'), result.get('SEARCH'), kind)
+
+
+def parse_searchsploit(path, state, final=True):
+    """Dispatch on the output format; --output does not depend on -j, so sniff the content"""
+    with open(path, 'rb') as f:
+        head = f.read(512).lstrip()
+    if head.startswith(b'{'):
+        return parse_searchsploit_json(path, state, final)
+    return parse_searchsploit_text(path, state, final)
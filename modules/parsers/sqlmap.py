@@ -0,0 +1,73 @@
+"""
+sqlmap output parser
+
+Reads the session `log` sqlmap writes per target below its output
+directory. Every injection point block names the vulnerable parameter and
+lists each working technique with its type, title and payload; one finding
+is emitted per parameter and technique. The tested URL comes from the
+target.txt sqlmap writes next to the log.
+"""
+import os
+import re
+from urllib.parse import urlparse
+
+from .base import LineReader, make_finding
+
+_PARAMETER_RE = re.compile(r'^Parameter: (.+?) \(([^)]+)\)\s*$')
+_FIELD_RE = re.compile(r'^\s+(Type|Title|Payload): (.*)$')
+_DBMS_RE = re.compile(r'^back-end DBMS: (.+)$')
+
+
+def _target_url(log_path):
+    """URL sqlmap tested, from target.txt next to the log, or None"""
+    try:
+        with open(os.path.join(os.path.dirname(log_path), 'target.txt'), errors='replace') as f:
+            line = f.readline().strip()
+    except OSError:
+        return None
+    return line.split()[0] if line else None
+
+
+def parse_sqlmap_log(path, state, final=True):
+    """Yield one finding per injectable parameter and technique, resuming at state['offset']"""
+    target = os.path.basename(os.path.dirname(path))
+    url = _target_url(path)
+    endpoint = urlparse(url).path or '/' if url else None
+
+    reader = LineReader(path, state, final=final)
+    for line in reader:
+        context = reader.context
+        if line.startswith('---'):
+            context.clear()
+            continue
+
+        match = _PARAMETER_RE.match(line)
+        if match:
+            context.clear()
+            context['parameter'], context['place'] = match.groups()
+            continue
+
+        match = _FIELD_RE.match(line)
+        if match and 'parameter' in context:
+            field, value = match.group(1).lower(), match.group(2).strip()
+            if field == 'type':
+                context.pop('title', None)
+            context[field] = value
+            if field != 'payload':
+                continue
+            # The payload is the last line of a technique
+            parameter, place, technique = context['parameter'], context['place'], context.get('type')
+            yield make_finding(
+                'SQLMap', 'SQL Injection',
+                f"{place} parameter '{parameter}' is injectable ({technique})", 'High',
+                target=target, url=url, path=endpoint, endpoint=url, parameter=parameter, place=place,
+                payload_type=technique, title=context.get('title'), payload=value,
+                message=f"{place} {parameter} {technique}")
+            continue
+
+        match = _DBMS_RE.match(line)
+        if match:
+            dbms = match.group(1).strip()
+            yield make_finding(
+                'SQLMap', 'DBMS Fingerprint', f"Back-end DBMS: {dbms}", 'Low',
+                target=target, url=url, path=endpoint, endpoint=url, dbms=dbms, message=f"dbms {dbms}")
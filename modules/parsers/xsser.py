@@ -0,0 +1,63 @@
+"""
+XSSer output parser
+
+XSSer reports each vector it confirmed as a block of "[+] Target:",
+"[+] Payload:", "[!] Method:" ... lines ending in "[!] Status: XSS
+FOUND!". The parser follows those blocks line by line, so it can run while
+XSSer is still writing, and extracts the injected parameter by comparing
+the injected URL with the target URL.
+"""
+import re
+from urllib.parse import parse_qsl, urlparse
+
+from .base import LineReader, make_finding
+
+_TARGET_RE = re.compile(r'^\[[+I*]\] Target:\s*(\S+)')
+_FIELD_RE = re.compile(r'^\[[+!*-]\] (Payload|Injection|Vector|Method|Vulnerable|Browsers|Status):\s*(.*)$')
+
+
+def _injected_parameter(target, injected):
+    """Name of the query parameter whose value the payload replaced, or None"""
+    original = dict(parse_qsl(urlparse(target).query, keep_blank_values=True))
+    for name, value in parse_qsl(urlparse(injected).query, keep_blank_values=True):
+        if original.get(name) != value:
+            return name
+    return next(iter(original), None)
+
+
+def parse_xsser(path, state, final=True):
+    """Yield a finding for every XSS vector XSSer confirmed, resuming at state['offset']"""
+    reader = LineReader(path, state, final=final)
+    for line in reader:
+        context = reader.context
+        match = _TARGET_RE.match(line)
+        if match:
+            context.clear()
+            context['target'] = match.group(1)
+            continue
+
+        match = _FIELD_RE.match(line)
+        if not match or 'target' not in context:
+            continue
+        field, value = match.group(1).lower(), match.group(2).strip()
+        if field != 'status':
+            # Older versions call the injected URL "Injection"
+            context['payload' if field == 'injection' else field] = value
+            continue
+        if 'FOUND' not in value.upper():
+            continue
+
+        url = context['target']
+        parsed = urlparse(url)
+        payload = context.get('payload') or context.get('vector') or ''
+        parameter = _injected_parameter(url, payload)
+        method = context.get('method') or 'URL'
+        location = f"parameter '{parameter}'" if parameter else parsed.path or '/'
+        yield make_finding(
+            'XSSer', 'Cross-Site Scripting', f"XSS in {location} of {url} ({method})", 'High',
+            target=parsed.hostname, url=url, path=parsed.path or '/',
+            endpoint=f"{parsed.scheme}://{parsed.netloc}{parsed.path}", parameter=parameter,
+            payload_type=method, payload=payload, browsers=context.get('vulnerable') or context.get('browsers'),
+            status=value, message=f"xss {parameter or ''} {method}")
+        for field in ('payload', 'vector', 'method', 'vulnerable', 'browsers'):
+            context.pop(field, None)
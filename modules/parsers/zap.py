@@ -0,0 +1,90 @@
+"""
+OWASP ZAP report parser
+
+Reads the report `zaproxy -cmd -quickout` writes, in ZAP's XML format
+(streamed with iterparse, one <alertitem> at a time) or its JSON format.
+Every instance of an alert becomes one finding with its URI, method,
+parameter, attack and evidence; ZAP's risk code gives the severity.
+"""
+import json
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+
+from .base import make_finding, skip_unchanged
+
+RISK_SEVERITIES = {'3': 'High', '2': 'Medium', '1': 'Low', '0': 'Low'}
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+
+def _text(value):
+    return _TAG_RE.sub('', value or '').strip()
+
+
+def _alert_findings(site, alert, instances):
+    name = alert.get('alert') or alert.get('name') or 'ZAP alert'
+    plugin = alert.get('pluginid')
+    severity = RISK_SEVERITIES.get(str(alert.get('riskcode')), 'Low')
+    for instance in instances or [{}]:
+        uri = instance.get('uri') or site.get('name')
+        parameter = instance.get('param') or None
+        parsed = urlparse(uri or '')
+        port = parsed.port or site.get('port')
+        location = f"{instance.get('method') or 'GET'} {uri}"
+        if parameter:
+            location += f" (parameter '{parameter}')"
+        yield make_finding(
+            'ZAP', 'Web Vulnerability', f"{name}: {location}", severity,
+            target=parsed.hostname or site.get('host'), port=int(port) if port else None,
+            url=uri, path=parsed.path or '/', endpoint=uri, method=instance.get('method'),
+            parameter=parameter, payload=instance.get('attack') or None,
+            evidence=instance.get('evidence') or None, plugin_id=plugin,
+            cwe=alert.get('cweid'), confidence=alert.get('confidence'),
+            details=_text(alert.get('desc')), solution=_text(alert.get('solution')),
+            message=f"{plugin} {name} {parameter or ''}")
+
+
+def parse_zap_xml(path, state, final=True):
+    """Yield findings from a ZAP XML report, one <alertitem> at a time"""
+    if skip_unchanged(path, state):
+        return
+    site = {}
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start' and elem.tag == 'site':
+            site = {'name': elem.get('name'), 'host': elem.get('host'), 'port': elem.get('port')}
+        elif event == 'end' and elem.tag == 'alertitem':
+            alert = {child.tag: child.text for child in elem if len(child) == 0}
+            instances = [{child.tag: child.text for child in instance}
+                         for instance in elem.findall('instances/instance')]
+            if not instances and alert.get('uri'):
+                # Reports before ZAP 2.6 put a single instance on the alert itself
+                instances = [alert]
+            yield from _alert_findings(site, alert, instances)
+            elem.clear()
+
+
+def parse_zap_json(path, state, final=True):
+    """Yield findings from a ZAP JSON report"""
+    if skip_unchanged(path, state):
+        return
+    with open(path) as f:
+        report = json.load(f)
+    sites = report.get('site', [])
+    if isinstance(sites, dict):
+        sites = [sites]
+    for site in sites:
+        site_info = {'name': site.get('@name'), 'host': site.get('@host'), 'port': site.get('@port')}
+        for alert in site.get('alerts', []):
+            yield from _alert_findings(site_info, alert, alert.get('instances'))
+
+
+def parse_zap(path, state, final=True):
+    """Dispatch on the report format; -quickout picks it by extension, so sniff the content"""
+    with open(path, 'rb') as f:
+        head = f.read(512).lstrip()
+    if head.startswith(b'{'):
+        return parse_zap_json(path, state, final)
+    if head.startswith(b'<'):
+        return parse_zap_xml(path, state, final)
+    return iter(())
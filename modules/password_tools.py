@@ -1,46 +1,92 @@
+import asyncio
 import os
-import subprocess
+
+from modules.hash_prep import HASHCAT_POT, JOHN_POT, POT_DIR, HashPrep
+from utils.tool_runner import get_runner
+from utils.wordlists import get_wordlists
 
 class PasswordTools:
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, runner=None, potfiles=None, wordlists=None):
         self.output_dir = os.path.join(output_dir, 'passwords')
         os.makedirs(self.output_dir, exist_ok=True)
-        self.timeout = 300
+        os.makedirs(POT_DIR, exist_ok=True)
+        self.runner = runner or get_runner()
+        self.prep = HashPrep(self.output_dir, potfiles)
+        self.wordlists = wordlists or get_wordlists()
+
+    async def prepare_hashes(self, hash_file):
+        """Deduplicate and classify a hash dump, dropping already cracked hashes"""
+        print(f"[*] Preparing hashes from {hash_file}...")
+        manifest = await asyncio.to_thread(self.prep.prepare, hash_file)
+        print(f"[+] {manifest['lines']} hashes: {manifest['duplicates']} duplicates, "
+              f"{manifest['recovered']} already cracked, {manifest['unknown']} of unknown type")
+        for bucket, info in manifest['buckets'].items():
+            print(f"    {bucket:<12} {info['count']:>10} to crack")
+        return self.prep.manifest_file
+
+    async def _buckets(self, hash_file, label):
+        """Buckets that still have uncracked hashes, preparing the dump if needed"""
+        manifest = self.prep.load_manifest(hash_file, check_potfiles=False)
+        if manifest is None:
+            await self.prepare_hashes(hash_file)
+            manifest = self.prep.load_manifest(hash_file, check_potfiles=False)
+        # Hashes an earlier engine cracked since the dump was prepared
+        recovered = await asyncio.to_thread(self.prep.potfiles.recovered)
+        buckets = {}
+        for bucket, info in manifest['buckets'].items():
+            left = await asyncio.to_thread(self.prep.remaining, bucket, recovered)
+            if left:
+                buckets[bucket] = info
+            else:
+                print(f"[*] No {bucket} hashes left for {label}")
+        return buckets
 
-    def run_john(self, hash_file):
-        output_file = os.path.join(self.output_dir, 'john_results.txt')
-        try:
-            subprocess.run([
+    async def run_john(self, hash_file):
+        outputs = []
+        wordlist = await self.wordlists.path('passwords')
+        for bucket, info in (await self._buckets(hash_file, 'John the Ripper')).items():
+            output_file = os.path.join(self.output_dir, f'john_results_{bucket}.txt')
+            result = await self.runner.run([
                 'john',
-                '--wordlist=/usr/share/wordlists/rockyou.txt',
-                '--format=raw-md5',
+                '--wordlist=' + wordlist,
+                '--format=' + info['john_format'],
+                '--pot=' + JOHN_POT,
                 '--output=' + output_file,
-                hash_file
-            ], check=True, timeout=self.timeout)
-            return output_file
-        except subprocess.TimeoutExpired:
-            print("[-] John the Ripper timed out after 5 minutes")
-            return None
-        except subprocess.CalledProcessError as e:
-            print(f"Error running John: {str(e)}")
-            return None
+                info['file']
+            ], check=True, label=f'John the Ripper ({bucket})')
+            if result.ok:
+                outputs.append(output_file)
+        await self._report_recovered()
+        return outputs or None
 
-    def run_hashcat(self, hash_file, hash_type):
-        output_file = os.path.join(self.output_dir, 'hashcat_results.txt')
-        try:
-            subprocess.run([
+    async def _report_recovered(self):
+        """Refresh recovered.txt with every account whose hash is cracked by now"""
+        if os.path.isfile(self.prep.accounts_file):
+            count = await asyncio.to_thread(self.prep.write_recovered)
+            print(f"[+] {count} accounts recovered so far, see {self.prep.recovered_file}")
+
+    async def run_hashcat(self, hash_file, hash_type=None):
+        """Crack every bucket in its own mode, or only the bucket of mode hash_type"""
+        outputs = []
+        wordlist = await self.wordlists.path('passwords')
+        for bucket, info in (await self._buckets(hash_file, 'Hashcat')).items():
+            if hash_type is not None and info['hashcat_mode'] != str(hash_type):
+                continue
+            output_file = os.path.join(self.output_dir, f'hashcat_results_{bucket}.txt')
+            cmd = [
                 'hashcat',
-                '-m', hash_type,
+                '-m', info['hashcat_mode'],
                 '-a', '0',
-                hash_file,
-                '/usr/share/wordlists/rockyou.txt',
+                info['file'],
+                wordlist,
+                '--potfile-path', HASHCAT_POT,
                 '--output', output_file
-            ], check=True, timeout=self.timeout)
-            return output_file
-        except subprocess.TimeoutExpired:
-            print("[-] Hashcat timed out after 5 minutes")
-            return None
-        except subprocess.CalledProcessError as e:
-            print(f"Error running Hashcat: {str(e)}")
-            return None
-
+            ]
+            if info.get('usernames'):
+                # Bucket entries are user:hash; John reads that format by default
+                cmd.append('--username')
+            result = await self.runner.run(cmd, check=True, label=f'Hashcat ({bucket})')
+            if result.ok:
+                outputs.append(output_file)
+        await self._report_recovered()
+        return outputs or None
@@ -1,34 +1,32 @@
 import os
-import subprocess
+
+from utils.tool_runner import get_runner
 
 class PhishingAnalyzer:
-    def __init__(self, domain, output_dir):
+    def __init__(self, domain, output_dir, runner=None):
         self.domain = domain
         self.output_dir = os.path.join(output_dir, 'phishing')
         os.makedirs(self.output_dir, exist_ok=True)
-        self.timeout = 300
+        self.runner = runner or get_runner()
 
-    def analyze_domain(self):
+    async def analyze_domain(self):
         output_file = os.path.join(self.output_dir, 'domain_analysis.txt')
-        try:
-            subprocess.run([
-                'sslyze',
-                self.domain,
-                '--json_out', output_file
-            ], check=True, timeout=self.timeout)
-            
-            subprocess.run([
-                'dnstwist',
-                self.domain,
-                '--format', 'json',
-                '--output', os.path.join(self.output_dir, 'similar_domains.json')
-            ], check=True, timeout=self.timeout)
-            
-            return output_file
-        except subprocess.TimeoutExpired:
-            print("[-] Domain analysis timed out after 5 minutes")
+        result = await self.runner.run([
+            'sslyze',
+            self.domain,
+            '--json_out', output_file
+        ], check=True, label='sslyze')
+        if not result.ok:
             return None
-        except subprocess.CalledProcessError as e:
-            print(f"Error analyzing domain: {str(e)}")
+        
+        result = await self.runner.run([
+            'dnstwist',
+            self.domain,
+            '--format', 'json',
+            '--output', os.path.join(self.output_dir, 'similar_domains.json')
+        ], check=True, label='dnstwist')
+        if not result.ok:
             return None
+        
+        return output_file
 
@@ -0,0 +1,62 @@
+"""
+Lazy stage registry
+
+Maps every assessment stage name to the tool class and method that
+implement it. A tool module is imported only when one of its stages is
+added to a plan.
+"""
+import modules
+from utils.scheduler import Stage
+
+
+class StageSpec:
+    def __init__(self, stage_class, tool_class, method):
+        self.stage_class = stage_class
+        self.tool_class = tool_class
+        self.method = method
+
+
+STAGES = {
+    'web.nikto': StageSpec('web', 'WebScanner', 'run_nikto_scan'),
+    'web.sqlmap': StageSpec('web', 'WebScanner', 'run_sqlmap'),
+    'web.dirb': StageSpec('web', 'WebScanner', 'run_dirb'),
+    'web.xsser': StageSpec('web', 'WebScanner', 'run_xsser'),
+    'api.zap': StageSpec('api', 'APITester', 'run_api_scan'),
+    'network.nmap': StageSpec('network', 'NetworkScanner', 'run_nmap_scan'),
+    'network.capture': StageSpec('network', 'NetworkScanner', 'capture_traffic'),
+    'network.pcap': StageSpec('network', 'NetworkScanner', 'analyze_capture'),
+    'wireless.aircrack': StageSpec('wireless', 'WirelessScanner', 'run_aircrack_scan'),
+    'wireless.wifite': StageSpec('wireless', 'WirelessScanner', 'run_wifite'),
+    'password.prep': StageSpec('password', 'PasswordTools', 'prepare_hashes'),
+    'password.john': StageSpec('password', 'PasswordTools', 'run_john'),
+    'password.hashcat': StageSpec('password', 'PasswordTools', 'run_hashcat'),
+    'forensics.volatility': StageSpec('forensics', 'ForensicsTools', 'run_volatility'),
+    'forensics.triage': StageSpec('forensics', 'ForensicsTools', 'triage_image'),
+    'forensics.autopsy': StageSpec('forensics', 'ForensicsTools', 'run_autopsy'),
+    'exploitation.metasploit': StageSpec('exploitation', 'ExploitationTools', 'run_metasploit_scan'),
+    'exploitation.searchsploit': StageSpec('exploitation', 'ExploitationTools', 'run_searchsploit'),
+    'phishing.domain': StageSpec('phishing', 'PhishingAnalyzer', 'analyze_domain'),
+    'social_engineering.set': StageSpec('social_engineering', 'SocialEngineeringTools', 'run_set_toolkit'),
+    'social_engineering.gophish': StageSpec('social_engineering', 'SocialEngineeringTools', 'run_gophish'),
+}
+
+
+class StagePlan:
+    """Adds registered stages to a scheduler, creating each tool instance once"""
+
+    def __init__(self, scheduler, tool_args):
+        # tool_args: tool class name -> constructor arguments
+        self.scheduler = scheduler
+        self.tool_args = tool_args
+        self._tools = {}
+
+    def tool(self, class_name):
+        if class_name not in self._tools:
+            tool_class = getattr(modules, class_name)
+            self._tools[class_name] = tool_class(*self.tool_args[class_name])
+        return self._tools[class_name]
+
+    def add(self, name, *args, **options):
+        spec = STAGES[name]
+        method = getattr(self.tool(spec.tool_class), spec.method)
+        return self.scheduler.add(Stage(name, method, *args, stage_class=spec.stage_class, **options))
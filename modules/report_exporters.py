@@ -0,0 +1,113 @@
+"""
+Machine-readable report exports
+
+Streaming JSON Lines, CSV and SARIF writers for the findings store. Each
+exporter reads findings from the store one at a time and writes them
+straight to the file, so downstream jobs can consume large reports
+incrementally. Given a run id, only the findings of that run are exported.
+"""
+import csv
+import json
+import re
+
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+CSV_COLUMNS = [
+    'key', 'tool', 'type', 'severity', 'target', 'port', 'path', 'description',
+    'occurrences', 'first_seen', 'last_seen',
+]
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = {'Critical': 'error', 'High': 'error', 'Medium': 'warning', 'Low': 'note'}
+
+
+def _open(path, **kwargs):
+    return open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE, **kwargs)
+
+
+def export_jsonl(store, path, run_id=None):
+    """One JSON object per finding and line; returns the number written"""
+    count = 0
+    with _open(path) as f:
+        for finding in store.findings(order_by_severity=True, run_id=run_id):
+            f.write(json.dumps(finding, sort_keys=True) + '\n')
+            count += 1
+    return count
+
+
+def export_csv(store, path, run_id=None):
+    """Flat CSV with the common finding fields; tool specific extras are dropped"""
+    count = 0
+    with _open(path, newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        for finding in store.findings(order_by_severity=True, run_id=run_id):
+            writer.writerow(finding)
+            count += 1
+    return count
+
+
+def _rule_id(finding):
+    slug = re.sub(r'[^a-z0-9]+', '-', (finding.get('type') or 'finding').lower()).strip('-')
+    return f"{(finding.get('tool') or 'tool').lower()}/{slug}"
+
+
+def _artifact_uri(finding):
+    target = finding.get('target')
+    if not target:
+        return None
+    if finding.get('url'):
+        return finding['url']
+    if '://' in target:
+        return target.rstrip('/') + (finding.get('path') or '')
+    host = f"{target}:{finding['port']}" if finding.get('port') else target
+    return host + (finding.get('path') or '')
+
+
+def sarif_result(finding):
+    result = {
+        'ruleId': _rule_id(finding),
+        'level': SARIF_LEVELS.get(finding.get('severity'), 'note'),
+        'message': {'text': finding.get('description') or finding.get('type') or ''},
+        'partialFingerprints': {'findingKey/v1': finding.get('key')},
+        'properties': {
+            'tool': finding.get('tool'),
+            'severity': finding.get('severity'),
+            'occurrences': finding.get('occurrences'),
+            'firstSeen': finding.get('first_seen'),
+            'lastSeen': finding.get('last_seen'),
+        },
+    }
+    uri = _artifact_uri(finding)
+    if uri:
+        result['locations'] = [{'physicalLocation': {'artifactLocation': {'uri': uri}}}]
+    return result
+
+
+def export_sarif(store, path, run_id=None):
+    """
+    SARIF 2.1.0 log with a single run.
+
+    The document envelope is written by hand around the results array so
+    that results can be streamed without holding the whole log in memory.
+    """
+    count = 0
+    driver = {'name': 'Kali Linux Security Testing Framework'}
+    with _open(path) as f:
+        f.write('{"$schema": %s, "version": "2.1.0", "runs": [{"tool": {"driver": %s}, "results": [\n'
+                % (json.dumps(SARIF_SCHEMA), json.dumps(driver)))
+        for finding in store.findings(order_by_severity=True, run_id=run_id):
+            if count:
+                f.write(',\n')
+            f.write(json.dumps(sarif_result(finding)))
+            count += 1
+        f.write('\n]}]}\n')
+    return count
+
+
+# format name -> exporter writing the findings store to a path
+EXPORTERS = {
+    'jsonl': export_jsonl,
+    'csv': export_csv,
+    'sarif': export_sarif,
+}
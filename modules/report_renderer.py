@@ -0,0 +1,169 @@
+"""
+Streaming HTML report renderer
+
+Writes the report section by section through a buffered file instead of
+building it in memory. Findings are read from the findings store in
+severity order, so memory stays bounded however many findings there are.
+Above PAGE_THRESHOLD findings the report is split into an index page and
+numbered per-severity pages, each holding at most PAGE_SIZE findings.
+"""
+import os
+from html import escape
+
+from modules.findings_store import SEVERITY_ORDER
+
+PAGE_THRESHOLD = 5000
+PAGE_SIZE = 2000
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+SEVERITY_COLORS = {
+    'Critical': '#ffeeee',
+    'High': '#fff6ee',
+    'Medium': '#fffbee',
+    'Low': '#f6ffee',
+}
+
+_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        .container {{ max-width: 1200px; margin: 0 auto; }}
+        .header {{ background: #f5f5f5; padding: 20px; margin-bottom: 20px; }}
+        .summary {{ margin-bottom: 30px; }}
+        .finding {{ border: 1px solid #ddd; padding: 10px; margin-bottom: 10px; }}
+        .Critical {{ border-left: 5px solid #ff0000; }}
+        .High {{ border-left: 5px solid #ff9900; }}
+        .Medium {{ border-left: 5px solid #ffcc00; }}
+        .Low {{ border-left: 5px solid #99cc00; }}
+        .severity-distribution {{ display: flex; margin: 20px 0; }}
+        .severity-count {{ margin-right: 20px; padding: 10px; border-radius: 5px; }}
+        .pages a {{ margin-right: 10px; }}
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>{title}</h1>
+            <p>Scan Date: {scan_date}</p>
+        </div>
+"""
+
+_TAIL = """    </div>
+</body>
+</html>
+"""
+
+_FINDING = """        <div class="finding {css}">
+            <h3>{type}</h3>
+            <p><strong>Tool:</strong> {tool}</p>
+            <p><strong>Target:</strong> {target}</p>
+            <p><strong>Severity:</strong> {severity}</p>
+            <p><strong>Description:</strong> {description}</p>
+            <p><strong>Occurrences:</strong> {occurrences} (first seen {first_seen}, last seen {last_seen})</p>
+        </div>
+"""
+
+
+def _text(value):
+    return escape(str(value if value is not None else '-'))
+
+
+def render_finding(finding):
+    severity = finding.get('severity') or 'Low'
+    target = finding.get('target') or ''
+    if target and finding.get('port'):
+        target = f"{target}:{finding['port']}"
+    return _FINDING.format(
+        css=escape(severity if severity in SEVERITY_ORDER else 'Low'),
+        type=_text(finding.get('type')),
+        tool=_text(finding.get('tool')),
+        target=_text(target or None),
+        severity=_text(severity),
+        description=_text(finding.get('description')),
+        occurrences=_text(finding.get('occurrences', 1)),
+        first_seen=_text(finding.get('first_seen')),
+        last_seen=_text(finding.get('last_seen')),
+    )
+
+
+class HTMLReportRenderer:
+    """Renders the findings store to one HTML file or a paginated set"""
+
+    def __init__(self, store, run_id=None, page_threshold=PAGE_THRESHOLD, page_size=PAGE_SIZE):
+        self.store = store
+        self.run_id = run_id  # render only this run's findings; None renders the whole store
+        self.page_threshold = page_threshold
+        self.page_size = max(1, page_size)
+
+    def _open(self, path):
+        return open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE)
+
+    def _write_summary(self, f, total, counts, links=None):
+        f.write('        <div class="summary">\n            <h2>Executive Summary</h2>\n')
+        f.write(f'            <p>Total Findings: {total}</p>\n')
+        f.write('            <div class="severity-distribution">\n')
+        for severity in SEVERITY_ORDER:
+            f.write(f'                <div class="severity-count" style="background: {SEVERITY_COLORS[severity]};">'
+                    f'{severity}: {counts.get(severity, 0)}</div>\n')
+        f.write('            </div>\n')
+        if links:
+            for severity in SEVERITY_ORDER:
+                if links.get(severity):
+                    anchors = ' '.join(
+                        f'<a href="{escape(href)}">{i}</a>' for i, href in enumerate(links[severity], 1))
+                    f.write(f'            <p class="pages"><strong>{severity}:</strong> {anchors}</p>\n')
+        f.write('        </div>\n')
+
+    def render(self, report_file, scan_date):
+        """Write the report and return the path of its entry page"""
+        counts = self.store.severity_counts(run_id=self.run_id)
+        total = sum(counts.values())
+        if total > self.page_threshold:
+            return self._render_paginated(report_file, scan_date, total, counts)
+
+        with self._open(report_file) as f:
+            f.write(_HEAD.format(title='Security Assessment Report', scan_date=escape(scan_date)))
+            self._write_summary(f, total, counts)
+            f.write('        <h2>Detailed Findings</h2>\n')
+            for finding in self.store.findings(order_by_severity=True, run_id=self.run_id):
+                f.write(render_finding(finding))
+            f.write(_TAIL)
+        return report_file
+
+    def _render_paginated(self, report_file, scan_date, total, counts):
+        pages_dir = os.path.splitext(report_file)[0] + '_pages'
+        os.makedirs(pages_dir, exist_ok=True)
+        links = {}
+        index_name = os.path.basename(report_file)
+
+        for severity in SEVERITY_ORDER:
+            page, written = None, 0
+            try:
+                for finding in self.store.findings(severity=severity, order_by_target=True, run_id=self.run_id):
+                    if page is None or written >= self.page_size:
+                        if page is not None:
+                            page.write(_TAIL)
+                            page.close()
+                        number = len(links.setdefault(severity, [])) + 1
+                        name = f"{severity.lower()}_{number:03d}.html"
+                        links[severity].append(f"{os.path.basename(pages_dir)}/{name}")
+                        page = self._open(os.path.join(pages_dir, name))
+                        page.write(_HEAD.format(
+                            title=f"{severity} Findings - Page {number}", scan_date=escape(scan_date)))
+                        page.write(f'        <p><a href="../{escape(index_name)}">Back to summary</a></p>\n')
+                        written = 0
+                    page.write(render_finding(finding))
+                    written += 1
+            finally:
+                if page is not None:
+                    page.write(_TAIL)
+                    page.close()
+
+        with self._open(report_file) as f:
+            f.write(_HEAD.format(title='Security Assessment Report', scan_date=escape(scan_date)))
+            self._write_summary(f, total, counts, links)
+            f.write(_TAIL)
+        return report_file
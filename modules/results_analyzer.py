@@ -1,87 +1,209 @@
 import os
 import json
 import re
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from datetime import datetime
 import subprocess
 
+from modules.findings_store import FindingsStore, stat_unchanged
+from modules.report_exporters import EXPORTERS
+from modules.report_renderer import HTMLReportRenderer
+from modules.run_diff import RunDiff
+from modules.parsers.registry import PARSERS, parse_source
+
+REPORT_FORMATS = ['html'] + list(EXPORTERS)
+
 class ResultsAnalyzer:
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, workers=None):
         self.output_dir = output_dir
         self.web_dir = os.path.join(output_dir, 'web')
         self.network_dir = os.path.join(output_dir, 'network')
         self.report_dir = os.path.join(output_dir, 'reports')
+        self.analysis_dir = os.path.join(self.report_dir, '.analysis')
+        self.spool_dir = os.path.join(self.analysis_dir, 'spool')
         self.timeout = 300
+        self.workers = workers
+        self.parser_timings = {}
+        self.sources = set()
+        self.run_id = None
+        os.makedirs(self.analysis_dir, exist_ok=True)
+        self.store = FindingsStore(os.path.join(self.analysis_dir, 'findings.db'))
+
+    def _classify(self, finding):
+        if finding.get('severity'):
+            return finding['severity']
+        if finding.get('type') == 'Open Port':
+            return self._determine_port_severity(finding.get('service') or '')
+        return self._determine_severity(finding.get('description', ''))
+
+    def ingest(self, parsers=None, workers=None, paths=None, final=True):
+        """
+        Parse whatever was added to the tool outputs since the last run.
+
+        Each changed source is parsed by its registered parser in a process
+        pool; the results are merged into the store one source at a time as
+        the workers finish. Sources whose size/mtime or content hash are
+        unchanged are skipped. With paths, only those sources are looked at;
+        final=False is for tools that are still writing (see parse_source),
+        where a source that does not parse yet is quietly left for later.
+        Returns the number of findings parsed.
+        """
+        keys = None if paths is None else {os.path.relpath(p, self.output_dir) for p in paths}
+        jobs = []
+        for name in parsers or PARSERS:
+            spec = PARSERS[name]
+            for path in spec.sources(self.output_dir):
+                key = os.path.relpath(path, self.output_dir)
+                if keys is not None and key not in keys:
+                    continue
+                self.sources.add(key)
+                record = self.store.source(key)
+                if stat_unchanged(path, record):
+                    continue
+                jobs.append((spec, key, path, record))
+        if not jobs:
+            return 0
+
+        os.makedirs(self.spool_dir, exist_ok=True)
+        total = 0
+        workers = workers or self.workers or os.cpu_count() or 1
+        if workers == 1 or len(jobs) == 1:
+            # Not worth starting a pool for a single source
+            for spec, key, path, record in jobs:
+                spool = self._spool_path(key)
+                try:
+                    result = parse_source(spec.parser, path, record, spool, final)
+                except Exception as e:
+                    if final:
+                        print(f"[-] Error reading {spec.tool} results from {key}: {str(e)}")
+                    continue
+                total += self._merge(spec, key, spool, result)
+            return total
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            futures = {}
+            for spec, key, path, record in jobs:
+                spool = self._spool_path(key)
+                future = pool.submit(parse_source, spec.parser, path, record, spool, final)
+                futures[future] = (spec, key, spool)
+            for future in as_completed(futures):
+                spec, key, spool = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    if final:
+                        print(f"[-] Error reading {spec.tool} results from {key}: {str(e)}")
+                    continue
+                total += self._merge(spec, key, spool, result)
+        return total
+
+    def _spool_path(self, key):
+        return os.path.join(self.spool_dir, hashlib.sha1(key.encode()).hexdigest() + '.jsonl')
+
+    def _merge(self, spec, key, spool, result):
+        """Classify one parsed source and write it to the store in a single transaction"""
+        start = time.perf_counter()
+        seen = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        def classified():
+            if not result['changed']:
+                return
+            with open(spool) as f:
+                for line in f:
+                    finding = json.loads(line)
+                    finding['severity'] = self._classify(finding)
+                    yield finding
+
+        try:
+            count = self.store.ingest(key, result['signature'], result['state'], classified(), seen,
+                                      reset=result['reset'])
+        finally:
+            if os.path.exists(spool):
+                os.remove(spool)
+
+        timing = self.parser_timings.setdefault(
+            spec.name, {'sources': 0, 'bytes': 0, 'findings': 0, 'parse': 0.0, 'merge': 0.0})
+        timing['sources'] += 1
+        timing['bytes'] += result['bytes']
+        timing['findings'] += count
+        timing['parse'] += result['elapsed']
+        timing['merge'] += time.perf_counter() - start
+        return count
+
+    def print_parser_timings(self):
+        if not self.parser_timings:
+            print("[*] No changed tool output to parse")
+            return
+        print("\n[+] Parser Timings:")
+        print(f"{'='*70}")
+        print(f"{'Parser':<10} {'Sources':>8} {'Input':>12} {'Findings':>9} {'Parse':>10} {'Merge':>10}")
+        for name, t in self.parser_timings.items():
+            print(f"{name:<10} {t['sources']:>8} {t['bytes'] / 1024 / 1024:>9.1f} MB {t['findings']:>9} "
+                  f"{t['parse']:>9.2f}s {t['merge']:>9.2f}s")
+        print(f"{'='*70}")
 
     def analyze_nikto_results(self):
-        nikto_file = os.path.join(self.web_dir, 'nikto_scan.txt')
-        findings = []
-        
-        if os.path.exists(nikto_file):
-            try:
-                with open(nikto_file, 'r') as f:
-                    content = f.read()
-                    vulns = re.findall(r'\+ (OSVDB-\d+:.+)', content)
-                    for vuln in vulns:
-                        findings.append({
-                            'tool': 'Nikto',
-                            'type': 'Web Vulnerability',
-                            'description': vuln,
-                            'severity': self._determine_severity(vuln)
-                        })
-            except Exception as e:
-                print(f"Error reading Nikto results: {str(e)}")
-        return findings
-    
+        self.ingest(['nikto'])
+        return list(self.store.findings(tool='Nikto'))
+
+    def analyze_dirb_results(self):
+        self.ingest(['dirb'])
+        return list(self.store.findings(tool='DIRB'))
+
     def analyze_sqlmap_results(self):
-        sqlmap_dir = os.path.join(self.web_dir, 'sqlmap')
-        findings = []
-        
-        if os.path.exists(sqlmap_dir):
-            for root, dirs, files in os.walk(sqlmap_dir):
-                for file in files:
-                    if file.endswith('.log'):
-                        try:
-                            with open(os.path.join(root, file), 'r') as f:
-                                content = f.read()
-                                if 'SQL injection point' in content:
-                                    findings.append({
-                                        'tool': 'SQLMap',
-                                        'type': 'SQL Injection',
-                                        'description': 'SQL injection vulnerability found',
-                                        'severity': 'High'
-                                    })
-                        except Exception as e:
-                            print(f"Error reading SQLMap results: {str(e)}")
-        return findings
-    
+        self.ingest(['sqlmap'])
+        return list(self.store.findings(tool='SQLMap'))
+
+    def analyze_xsser_results(self):
+        self.ingest(['xsser'])
+        return list(self.store.findings(tool='XSSer'))
+
+    def analyze_zap_results(self):
+        self.ingest(['zap'])
+        return list(self.store.findings(tool='ZAP'))
+
+    def analyze_searchsploit_results(self):
+        self.ingest(['searchsploit'])
+        return list(self.store.findings(tool='SearchSploit'))
+
+    def analyze_metasploit_results(self):
+        self.ingest(['metasploit'])
+        return list(self.store.findings(tool='Metasploit'))
+
     def analyze_nmap_results(self):
-        nmap_file = os.path.join(self.network_dir, 'nmap_scan.xml')
-        findings = []
-        
-        if os.path.exists(nmap_file):
-            try:
-                import xml.etree.ElementTree as ET
-                tree = ET.parse(nmap_file)
-                root = tree.getroot()
-                
-                for host in root.findall('.//host'):
-                    ip = host.find('.//address').get('addr')
-                    for port in host.findall('.//port'):
-                        port_id = port.get('portid')
-                        state = port.find('state').get('state')
-                        service = port.find('service')
-                        if service is not None:
-                            service_name = service.get('name')
-                            findings.append({
-                                'tool': 'Nmap',
-                                'type': 'Open Port',
-                                'description': f'Port {port_id} ({service_name}) is {state}',
-                                'severity': self._determine_port_severity(service_name)
-                            })
-            except Exception as e:
-                print(f"Error parsing Nmap results: {str(e)}")
-        return findings
+        self.ingest(['nmap'])
+        return list(self.store.findings(tool='Nmap'))
     
+    def diff_runs(self, old_run=None, new_run=None):
+        """
+        Write a diff report between two runs, by default the latest run and
+        the one before it. Returns the report path, or None without two runs.
+        """
+        run_ids = [run['id'] for run in self.store.runs()]
+        if new_run is None:
+            new_run = run_ids[-1] if run_ids else None
+        if old_run is None:
+            older = [r for r in run_ids if new_run is not None and r < new_run]
+            old_run = older[-1] if older else None
+        if old_run is None or new_run is None:
+            print("[-] Need at least two analysis runs to compare")
+            return None
+        for run_id in (old_run, new_run):
+            if run_id not in run_ids:
+                print(f"[-] Unknown analysis run: {run_id}")
+                return None
+
+        diff_file = os.path.join(self.report_dir, f'diff_report_{old_run}_{new_run}.html')
+        try:
+            RunDiff(self.store, old_run, new_run).write_report(diff_file)
+        except Exception as e:
+            print(f"Error generating diff report: {str(e)}")
+            return None
+        print(f"[+] Diff report generated: {diff_file}")
+        return diff_file
+
     def _determine_severity(self, finding):
         high_indicators = ['sql injection', 'remote code execution', 'rce', 'xss', 'csrf']
         medium_indicators = ['information disclosure', 'directory listing', 'deprecated']
@@ -106,109 +228,36 @@ class ResultsAnalyzer:
             return 'High'
         return 'Medium'
     
-    def generate_report(self):
-        findings = []
-        findings.extend(self.analyze_nikto_results())
-        findings.extend(self.analyze_sqlmap_results())
-        findings.extend(self.analyze_nmap_results())
-        
-        severity_count = {'Critical': 0, 'High': 0, 'Medium': 0, 'Low': 0}
-        for finding in findings:
-            severity_count[finding['severity']] = severity_count.get(finding['severity'], 0) + 1
-        
-        report = {
-            'scan_date': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'summary': {
-                'total_findings': len(findings),
-                'severity_distribution': severity_count
-            },
-            'findings': findings
-        }
-        
-        html_report = self._generate_html_report(report)
-        report_file = os.path.join(self.report_dir, f'security_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}.html')
-        
-        try:
-            with open(report_file, 'w') as f:
-                f.write(html_report)
-        except Exception as e:
-            print(f"Error generating report: {str(e)}")
-            return None
-        
-        print(f"\n[+] Report generated: {report_file}")
-        return report_file
-    
-    def _generate_html_report(self, report):
-        html = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>Security Assessment Report</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 20px; }}
-                .container {{ max-width: 1200px; margin: 0 auto; }}
-                .header {{ background: #f5f5f5; padding: 20px; margin-bottom: 20px; }}
-                .summary {{ margin-bottom: 30px; }}
-                .finding {{ border: 1px solid #ddd; padding: 10px; margin-bottom: 10px; }}
-                .Critical {{ border-left: 5px solid #ff0000; }}
-                .High {{ border-left: 5px solid #ff9900; }}
-                .Medium {{ border-left: 5px solid #ffcc00; }}
-                .Low {{ border-left: 5px solid #99cc00; }}
-                .severity-distribution {{ display: flex; margin: 20px 0; }}
-                .severity-count {{ margin-right: 20px; padding: 10px; border-radius: 5px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>Security Assessment Report</h1>
-                    <p>Scan Date: {report['scan_date']}</p>
-                </div>
-                
-                <div class="summary">
-                    <h2>Executive Summary</h2>
-                    <p>Total Findings: {report['summary']['total_findings']}</p>
-                    
-                    <div class="severity-distribution">
-                        <div class="severity-count" style="background: #ffeeee;">
-                            Critical: {report['summary']['severity_distribution'].get('Critical', 0)}
-                        </div>
-                        <div class="severity-count" style="background: #fff6ee;">
-                            High: {report['summary']['severity_distribution'].get('High', 0)}
-                        </div>
-                        <div class="severity-count" style="background: #fffbee;">
-                            Medium: {report['summary']['severity_distribution'].get('Medium', 0)}
-                        </div>
-                        <div class="severity-count" style="background: #f6ffee;">
-                            Low: {report['summary']['severity_distribution'].get('Low', 0)}
-                        </div>
-                    </div>
-                </div>
-                
-                <h2>Detailed Findings</h2>
+    def generate_report(self, formats=('html',)):
         """
-        
-        severity_order = {'Critical': 0, 'High': 1, 'Medium': 2, 'Low': 3}
-        sorted_findings = sorted(report['findings'], 
-                               key=lambda x: severity_order.get(x['severity'], 999))
-        
-        for finding in sorted_findings:
-            html += f"""
-                <div class="finding {finding['severity']}">
-                    <h3>{finding['type']}</h3>
-                    <p><strong>Tool:</strong> {finding['tool']}</p>
-                    <p><strong>Severity:</strong> {finding['severity']}</p>
-                    <p><strong>Description:</strong> {finding['description']}</p>
-                </div>
-            """
-        
-        html += """
-            </div>
-        </body>
-        </html>
+        Write the report in each of the given formats.
+
+        Returns the path of the HTML report, or of the first export when no
+        HTML report was requested.
         """
-        
-        return html
+        # Only ingest here; the renderers stream findings back out of the store
+        self.ingest()
+
+        scan_date = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.run_id = self.store.record_run(self.sources, scan_date)
+        base_name = os.path.join(self.report_dir, f'security_report_{datetime.now().strftime("%Y%m%d_%H%M%S")}')
+
+        written = []
+        for fmt in formats:
+            try:
+                if fmt == 'html':
+                    report_file = HTMLReportRenderer(self.store, self.run_id).render(base_name + '.html', scan_date)
+                else:
+                    report_file = f"{base_name}.{fmt}"
+                    EXPORTERS[fmt](self.store, report_file, self.run_id)
+            except Exception as e:
+                print(f"Error generating {fmt} report: {str(e)}")
+                continue
+            print(f"\n[+] Report generated: {report_file}")
+            written.append(report_file)
+
+        html_reports = [p for p in written if p.endswith('.html')]
+        return (html_reports or written or [None])[0]
 
 def analyze_results(output_dir):
     print("\n[+] Analyzing scan results...")
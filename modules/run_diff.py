@@ -0,0 +1,136 @@
+"""
+Scan-to-scan diff
+
+Compares the findings of two analysis runs recorded in the findings store.
+Findings are matched by their content hash key, so the comparison is a set
+of indexed joins rather than a pairwise scan. Open ports are compared by
+(target, port, protocol), so a service version change is not reported as a
+port that closed and reopened.
+"""
+from html import escape
+
+from modules.report_renderer import WRITE_BUFFER_SIZE
+
+CHANGES = [
+    ('new', 'New Findings'),
+    ('resolved', 'Resolved Findings'),
+    ('changed', 'Severity Changes'),
+]
+
+_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; }}
+        table {{ border-collapse: collapse; width: 100%; margin-bottom: 30px; }}
+        th, td {{ border: 1px solid #ddd; padding: 4px 8px; text-align: left; font-size: 13px; }}
+        th {{ background: #f5f5f5; }}
+        .Critical {{ color: #cc0000; }}
+        .High {{ color: #cc6600; }}
+        .Medium {{ color: #997700; }}
+        .Low {{ color: #558800; }}
+    </style>
+</head>
+<body>
+    <h1>{title}</h1>
+"""
+
+_TAIL = """</body>
+</html>
+"""
+
+
+def _cell(value):
+    return f"<td>{escape(str(value if value is not None else '-'))}</td>"
+
+
+def _severity_cell(severity):
+    return f'<td class="{escape(severity or "")}">{escape(severity or "-")}</td>'
+
+
+def _port_id(finding):
+    return (finding.get('target') or '', str(finding.get('port') or ''), finding.get('protocol') or 'tcp')
+
+
+class RunDiff:
+    """Differences between an older and a newer analysis run"""
+
+    def __init__(self, store, old_run, new_run):
+        self.store = store
+        self.old_run = old_run
+        self.new_run = new_run
+
+    def counts(self):
+        return {change: self.store.count_run_delta(self.old_run, self.new_run, change)
+                for change, _ in CHANGES}
+
+    def findings(self, change):
+        return self.store.run_delta(self.old_run, self.new_run, change)
+
+    def _ports(self, run_id):
+        ports = {}
+        for finding in self.store.run_findings(run_id, finding_type='Open Port'):
+            # A port that went from open to filtered or closed must count as closed
+            if finding.get('state', 'open') == 'open':
+                ports[_port_id(finding)] = finding
+        return ports
+
+    def port_changes(self):
+        """Return (opened, closed) lists of Open Port findings"""
+        old_ports = self._ports(self.old_run)
+        new_ports = self._ports(self.new_run)
+        opened = [f for port, f in sorted(new_ports.items()) if port not in old_ports]
+        closed = [f for port, f in sorted(old_ports.items()) if port not in new_ports]
+        return opened, closed
+
+    def print_summary(self, counts=None, ports=None):
+        counts = counts or self.counts()
+        opened, closed = ports or self.port_changes()
+        print(f"\n[+] Changes from run {self.old_run} to run {self.new_run}:")
+        print(f"{'='*50}")
+        for change, title in CHANGES:
+            print(f"{title + ':':<20} {counts[change]}")
+        print(f"{'New Ports:':<20} {len(opened)}")
+        print(f"{'Closed Ports:':<20} {len(closed)}")
+        print(f"{'='*50}")
+
+    def write_report(self, path):
+        """Write a compact HTML diff report, streaming the changed findings"""
+        counts = self.counts()
+        opened, closed = self.port_changes()
+        with open(path, 'w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as f:
+            f.write(_HEAD.format(title=f"Changes from Run {self.old_run} to Run {self.new_run}"))
+            f.write('    <table>\n        <tr><th>Change</th><th>Count</th></tr>\n')
+            for change, title in CHANGES:
+                f.write(f'        <tr><td>{title}</td><td>{counts[change]}</td></tr>\n')
+            f.write(f'        <tr><td>New Ports</td><td>{len(opened)}</td></tr>\n')
+            f.write(f'        <tr><td>Closed Ports</td><td>{len(closed)}</td></tr>\n    </table>\n')
+
+            for title, ports in (('New Ports', opened), ('Closed Ports', closed)):
+                if not ports:
+                    continue
+                f.write(f'    <h2>{title}</h2>\n    <table>\n'
+                        '        <tr><th>Target</th><th>Port</th><th>Protocol</th><th>Service</th></tr>\n')
+                for finding in ports:
+                    target, port, protocol = _port_id(finding)
+                    f.write(f'        <tr>{_cell(target)}{_cell(port)}{_cell(protocol)}'
+                            f'{_cell(finding.get("service"))}</tr>\n')
+                f.write('    </table>\n')
+
+            for change, title in CHANGES:
+                if not counts[change]:
+                    continue
+                f.write(f'    <h2>{title}</h2>\n    <table>\n        <tr>'
+                        + ('<th>Old Severity</th>' if change == 'changed' else '')
+                        + '<th>Severity</th><th>Tool</th><th>Target</th><th>Description</th></tr>\n')
+                for finding in self.findings(change):
+                    old = _severity_cell(finding['old_severity']) if change == 'changed' else ''
+                    f.write(f'        <tr>{old}{_severity_cell(finding.get("severity"))}'
+                            f'{_cell(finding.get("tool"))}{_cell(finding.get("target"))}'
+                            f'{_cell(finding.get("description"))}</tr>\n')
+                f.write('    </table>\n')
+            f.write(_TAIL)
+        self.print_summary(counts, (opened, closed))
+        return path
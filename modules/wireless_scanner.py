@@ -1,59 +1,55 @@
 import os
-import subprocess
-import time
+
+from utils.tool_runner import get_runner
+from utils.wordlists import get_wordlists
 
 class WirelessScanner:
-    def __init__(self, interface, output_dir):
+    def __init__(self, interface, output_dir, runner=None, wordlists=None):
         self.interface = interface
         self.output_dir = os.path.join(output_dir, 'wireless')
         os.makedirs(self.output_dir, exist_ok=True)
+        self.runner = runner or get_runner()
+        self.wordlists = wordlists or get_wordlists()
 
-    def run_aircrack_scan(self):
+    async def run_aircrack_scan(self, duration=60):
         """Run Aircrack-ng suite for wireless scanning"""
-        try:
-            # Kill interfering processes
-            subprocess.run(['airmon-ng', 'check', 'kill'], check=True)
-            
-            # Start monitor mode
-            subprocess.run(['airmon-ng', 'start', self.interface], check=True)
-            
-            monitor_interface = f"{self.interface}mon"
-            output_file = os.path.join(self.output_dir, 'airodump')
-            
-            # Start scanning
-            subprocess.Popen([
-                'airodump-ng',
-                '--write', output_file,
-                '--output-format', 'csv',
-                monitor_interface
-            ])
-            
-            # Scan for 60 seconds
-            time.sleep(60)
-            
-            # Kill airodump-ng
-            subprocess.run(['pkill', 'airodump-ng'], check=True)
-            
-            # Stop monitor mode
-            subprocess.run(['airmon-ng', 'stop', monitor_interface], check=True)
-            
-            return output_file + '-01.csv'
-        except subprocess.CalledProcessError as e:
-            print(f"Error in wireless scanning: {str(e)}")
+        # Kill interfering processes
+        result = await self.runner.run(['airmon-ng', 'check', 'kill'], check=True)
+        if not result.ok:
+            return None
+        
+        # Start monitor mode
+        result = await self.runner.run(['airmon-ng', 'start', self.interface], check=True)
+        if not result.ok:
             return None
+        
+        monitor_interface = f"{self.interface}mon"
+        output_file = os.path.join(self.output_dir, 'airodump')
+        
+        # Scan for the given duration; airodump-ng is stopped at the deadline
+        await self.runner.run([
+            'airodump-ng',
+            '--write', output_file,
+            '--output-format', 'csv',
+            monitor_interface
+        ], timeout=duration, expect_timeout=True)
+        
+        # Stop monitor mode
+        result = await self.runner.run(['airmon-ng', 'stop', monitor_interface], check=True)
+        if not result.ok:
+            return None
+        
+        return output_file + '-01.csv'
 
-    def run_wifite(self):
+    async def run_wifite(self):
         """Run Wifite for automated wireless auditing"""
         output_file = os.path.join(self.output_dir, 'wifite_results.txt')
-        try:
-            subprocess.run([
-                'wifite',
-                '--interface', self.interface,
-                '--kill',
-                '--dict', '/usr/share/wordlists/rockyou.txt',
-                '--output', output_file
-            ], check=True)
-            return output_file
-        except subprocess.CalledProcessError as e:
-            print(f"Error running Wifite: {str(e)}")
-            return None
+        wordlist = await self.wordlists.path('passwords')
+        result = await self.runner.run([
+            'wifite',
+            '--interface', self.interface,
+            '--kill',
+            '--dict', wordlist,
+            '--output', output_file
+        ], check=True, label='Wifite')
+        return output_file if result.ok else None
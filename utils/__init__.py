@@ -4,19 +4,60 @@ Kali Linux Security Testing Framework - Utilities Package
 This package contains utility functions and helpers including:
 - Tool checking and installation
 - Environment setup
+- Concurrent stage scheduling
+- Shared asynchronous tool runner
+- Content-addressed cache of scan results
+- Shared, deduplicated wordlist index
+- Multi-target batch execution
+- Resumable run journal
+- File change watcher (inotify with a polling fallback)
 - Common helper functions
 """
 
 from .tool_checker import (
     check_required_tools,
     install_missing_tools,
-    setup_environment
+    setup_environment,
+    resolve_tools,
+    get_tool_info
 )
+from .scheduler import Stage, StageScheduler
+from .tool_runner import RateLimiter, ToolResult, ToolRunner, get_runner, set_runner
+from .result_cache import ResultCache, get_cache, set_cache
+from .wordlists import WordlistManager, get_wordlists, set_wordlists
+from .batch import BatchRunner, Target, load_targets, parse_target
+from .journal import RunJournal
+from .timings import Timings
+from .file_watcher import InotifyWatcher, PollingWatcher, open_watcher
 
 __all__ = [
     'check_required_tools',
     'install_missing_tools',
-    'setup_environment'
+    'setup_environment',
+    'resolve_tools',
+    'get_tool_info',
+    'Stage',
+    'StageScheduler',
+    'RateLimiter',
+    'ToolResult',
+    'ToolRunner',
+    'get_runner',
+    'set_runner',
+    'ResultCache',
+    'get_cache',
+    'set_cache',
+    'WordlistManager',
+    'get_wordlists',
+    'set_wordlists',
+    'BatchRunner',
+    'Target',
+    'load_targets',
+    'parse_target',
+    'RunJournal',
+    'Timings',
+    'InotifyWatcher',
+    'PollingWatcher',
+    'open_watcher'
 ]
 
 __version__ = '1.0.0'
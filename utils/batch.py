@@ -0,0 +1,163 @@
+"""
+Multi-target batch support
+
+Reads a scope file of URLs, hosts and CIDR ranges, normalises and
+deduplicates it, and drives every target through a bounded worker pool
+with per-target failure isolation and throughput reporting.
+"""
+import asyncio
+import ipaddress
+import re
+import time
+from urllib.parse import urlparse
+
+DEFAULT_WORKERS = 4
+
+
+class Target:
+    """A single entry of the assessment scope"""
+
+    def __init__(self, raw, kind, host, url=None):
+        self.raw = raw
+        self.kind = kind  # 'url', 'host' or 'cidr'
+        self.host = host
+        self.url = url
+        self.slug = re.sub(r'[^A-Za-z0-9._-]+', '_', url or host).strip('_')
+
+    @property
+    def key(self):
+        return self.url or self.host
+
+    @property
+    def is_web(self):
+        return self.url is not None
+
+    def __repr__(self):
+        return f"Target({self.key!r})"
+
+
+def parse_target(value):
+    """Normalise one scope entry into a Target, or return None if invalid"""
+    value = value.strip()
+    if not value or value.startswith('#'):
+        return None
+
+    if '://' in value:
+        parsed = urlparse(value)
+        if not parsed.hostname:
+            return None
+        scheme = parsed.scheme.lower()
+        host = parsed.hostname.lower()
+        netloc = host
+        default_port = {'http': 80, 'https': 443}.get(scheme)
+        if parsed.port and parsed.port != default_port:
+            netloc = f"{host}:{parsed.port}"
+        path = parsed.path or '/'
+        query = f"?{parsed.query}" if parsed.query else ''
+        return Target(value, 'url', host, f"{scheme}://{netloc}{path}{query}")
+
+    if '/' in value:
+        try:
+            network = ipaddress.ip_network(value, strict=False)
+        except ValueError:
+            return None
+        if network.num_addresses == 1:
+            host = str(network.network_address)
+            return Target(value, 'host', host, f"http://{host}/")
+        return Target(value, 'cidr', str(network))
+
+    host = value.lower().rstrip('.')
+    return Target(value, 'host', host, f"http://{host}/")
+
+
+def load_targets(path):
+    """Read a scope file and return its targets in order, without duplicates"""
+    targets, seen = [], set()
+    with open(path) as f:
+        for line_no, line in enumerate(f, 1):
+            target = parse_target(line)
+            if target is None:
+                if line.strip() and not line.strip().startswith('#'):
+                    print(f"[-] Ignoring invalid target on line {line_no}: {line.strip()}")
+                continue
+            if target.key in seen:
+                continue
+            seen.add(target.key)
+            targets.append(target)
+    return targets
+
+
+class TargetOutcome:
+    """Status and latency of one target in a batch"""
+
+    def __init__(self, target):
+        self.target = target
+        self.status = 'pending'
+        self.error = None
+        self.latency = 0.0
+        self.result = None
+
+
+class BatchRunner:
+    """Feeds targets through a bounded pool of concurrent workers"""
+
+    def __init__(self, workers=DEFAULT_WORKERS):
+        self.workers = max(1, workers)
+        self.outcomes = []
+        self.elapsed = 0.0
+
+    async def run(self, targets, worker):
+        """Await worker(target) for every target, at most `workers` at a time"""
+        slots = asyncio.Semaphore(self.workers)
+        self.outcomes = [TargetOutcome(t) for t in targets]
+
+        async def process(outcome):
+            async with slots:
+                print(f"\n[+] Starting target {outcome.target.key}")
+                outcome.status = 'running'
+                start = time.monotonic()
+                try:
+                    outcome.result = await worker(outcome.target)
+                    outcome.status = 'done'
+                except asyncio.CancelledError:
+                    outcome.status = 'cancelled'
+                    raise
+                except Exception as e:
+                    # A failing target must never take the rest of the batch down
+                    outcome.status = 'failed'
+                    outcome.error = e
+                    print(f"[-] Target {outcome.target.key} failed: {str(e)}")
+                finally:
+                    outcome.latency = time.monotonic() - start
+
+        start = time.monotonic()
+        try:
+            await asyncio.gather(*(process(o) for o in self.outcomes))
+        finally:
+            self.elapsed = time.monotonic() - start
+        return self.outcomes
+
+    def print_summary(self):
+        finished = [o for o in self.outcomes if o.status in ('done', 'failed')]
+        failed = [o for o in self.outcomes if o.status == 'failed']
+        latencies = sorted(o.latency for o in finished)
+
+        print("\n[+] Batch Summary:")
+        print(f"{'='*50}")
+        print(f"Targets: {len(self.outcomes)} ({len(finished) - len(failed)} completed, {len(failed)} failed)")
+        print(f"Workers: {self.workers}")
+        print(f"Wall-clock: {self.elapsed:.2f} seconds")
+        if self.elapsed > 0:
+            print(f"Throughput: {len(finished) / self.elapsed * 3600:.1f} targets/hour")
+        if latencies:
+            print(f"Latency min/median/p95/max: {latencies[0]:.2f}s / "
+                  f"{_percentile(latencies, 50):.2f}s / {_percentile(latencies, 95):.2f}s / "
+                  f"{latencies[-1]:.2f}s")
+        for outcome in failed:
+            print(f"  [-] {outcome.target.key}: {str(outcome.error)}")
+        print(f"{'='*50}")
+
+
+def _percentile(sorted_values, percent):
+    index = min(len(sorted_values) - 1, int(round(percent / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
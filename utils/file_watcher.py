@@ -0,0 +1,172 @@
+"""
+File change watcher
+
+Reports files created or written below a set of directories. On Linux it
+uses inotify through ctypes, so writes are seen as they happen without an
+extra dependency; elsewhere, or when inotify is unavailable (e.g. the
+per-user watch limit is reached), it falls back to comparing the size and
+mtime of every file at each call.
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+_EVENT = struct.Struct('iIII')  # wd, mask, cookie, name length
+READ_SIZE = 64 * 1024
+
+
+def _walk_files(directories):
+    for directory in directories:
+        for root, _, names in os.walk(directory):
+            for name in names:
+                yield os.path.join(root, name)
+
+
+def _load_libc():
+    libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+    libc.inotify_init1.argtypes = [ctypes.c_int]
+    libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    return libc
+
+
+class InotifyWatcher:
+    """Recursive inotify watch; new subdirectories are watched as they appear"""
+
+    method = 'inotify'
+
+    def __init__(self, directories):
+        self.directories = list(directories)
+        try:
+            self.libc = _load_libc()
+            fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        except (OSError, AttributeError) as e:
+            raise OSError(f"inotify not available: {e}")
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.fd = fd
+        self.watches = {}
+        try:
+            for directory in self.directories:
+                self._watch_tree(directory)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, directory):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), directory)
+        self.watches[wd] = directory
+
+    def _watch_tree(self, directory):
+        """Watch directory and everything below it; returns the files already there"""
+        found = []
+        for root, _, names in os.walk(directory):
+            self._add_watch(root)
+            found.extend(os.path.join(root, name) for name in names)
+        return found
+
+    def _read_events(self):
+        data = b''
+        while True:
+            try:
+                chunk = os.read(self.fd, READ_SIZE)
+            except BlockingIOError:
+                return data
+            if not chunk:
+                return data
+            data += chunk
+
+    def changes(self, timeout):
+        """Paths written or created within the next `timeout` seconds (empty set if none)"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = self._read_events()
+        changed = set()
+        position = 0
+        while position + _EVENT.size <= len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, position)
+            name = data[position + _EVENT.size:position + _EVENT.size + length].rstrip(b'\0')
+            position += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: report everything and let the caller sort it out
+                changed.update(_walk_files(self.directories))
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            directory = self.watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+            if not mask & IN_ISDIR:
+                changed.add(path)
+            elif mask & (IN_CREATE | IN_MOVED_TO):
+                try:
+                    # Files may have been written before the watch was in place
+                    changed.update(self._watch_tree(path))
+                except OSError:
+                    pass  # removed again, or out of watches
+        return changed
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class PollingWatcher:
+    """Fallback that compares size and mtime of every file at each call"""
+
+    method = 'polling'
+
+    def __init__(self, directories):
+        self.directories = list(directories)
+        self.files = self._scan()
+
+    def _scan(self):
+        files = {}
+        for path in _walk_files(self.directories):
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files[path] = (st.st_size, st.st_mtime_ns)
+        return files
+
+    def changes(self, timeout):
+        """Paths written or created since the previous call, checked after `timeout` seconds"""
+        time.sleep(timeout)
+        files = self._scan()
+        changed = {path for path, signature in files.items() if self.files.get(path) != signature}
+        self.files = files
+        return changed
+
+    def close(self):
+        pass
+
+
+def open_watcher(directories, polling=False):
+    """inotify watcher on Linux unless polling is requested or inotify fails, else a polling one"""
+    if not polling and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directories)
+        except OSError as e:
+            print(f"[!] inotify unavailable ({e}), polling for changes instead")
+    return PollingWatcher(directories)
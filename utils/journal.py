@@ -0,0 +1,102 @@
+"""
+Per-run assessment journal
+
+Records the command line of a run and the status, result and timing of
+every stage in an append-only JSON Lines file below the output directory.
+Each event is flushed and fsynced as it happens, so after an interruption,
+a crash or a reboot the run can be resumed with --resume <run-id> and only
+the stages that had not completed are run again.
+"""
+import json
+import os
+import time
+from datetime import datetime
+
+JOURNAL_DIR = '.runs'
+
+
+def new_run_id():
+    return datetime.now().strftime('%Y%m%d-%H%M%S')
+
+
+def _serializable(value):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_serializable(v) for v in value]
+    return repr(value)
+
+
+class RunJournal:
+    """Append-only record of one assessment run"""
+
+    def __init__(self, output_dir, run_id=None):
+        self.run_id = run_id or new_run_id()
+        self.path = os.path.join(output_dir, JOURNAL_DIR, f"{self.run_id}.jsonl")
+        self.argv = None
+        self.stages = {}  # stage key -> latest event
+        if os.path.exists(self.path):
+            self._load()
+
+    @classmethod
+    def open_existing(cls, output_dir, run_id):
+        """Journal of an earlier run, or None if there is no such run"""
+        if not os.path.exists(os.path.join(output_dir, JOURNAL_DIR, f"{run_id}.jsonl")):
+            return None
+        return cls(output_dir, run_id)
+
+    def _load(self):
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # A torn last line from a crash mid-write
+                    continue
+                if event.get('event') == 'start':
+                    self.argv = event['argv']
+                elif event.get('event') == 'stage':
+                    self.stages[event['stage']] = event
+
+    def _append(self, event):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        event['time'] = time.time()
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(event) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def start(self, argv):
+        """Record the command line the first time a run starts, or a resume"""
+        if self.argv is None:
+            self.argv = list(argv)
+            self._append({'event': 'start', 'argv': self.argv})
+        else:
+            self._append({'event': 'resume'})
+
+    def record(self, key, stage):
+        event = {
+            'event': 'stage',
+            'stage': key,
+            'status': stage.status,
+            'duration': stage.duration,
+            'result': _serializable(stage.result),
+            'error': str(stage.error) if stage.error else None,
+        }
+        self.stages[key] = event
+        self._append(event)
+
+    def completed(self, key):
+        """
+        Latest event of a stage that completed, or None.
+
+        A stage whose recorded output path has since disappeared is not
+        considered complete.
+        """
+        event = self.stages.get(key)
+        if not event or event['status'] != 'done':
+            return None
+        result = event.get('result')
+        if isinstance(result, str) and os.sep in result and not os.path.exists(result):
+            return None
+        return event
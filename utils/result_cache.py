@@ -0,0 +1,235 @@
+"""
+Content-addressed cache of tool results
+
+A scan whose tool, tool version, arguments, target and input files (e.g.
+the wordlist) are all unchanged produces the same result, so its output is
+stored under a hash of those inputs. A later identical scan restores the
+stored output instead of running the tool again. Entries expire after a TTL
+and the least recently used ones are evicted once the cache grows past its
+size limit.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+from .tool_checker import get_tool_info
+
+DEFAULT_TTL = 24 * 3600  # 1 day
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024  # 1 GB
+HASH_CHUNK_SIZE = 1024 * 1024
+STALE_TMP_AGE = 3600  # seconds before a staging dir counts as left behind by an interrupted store
+OUTPUT_PLACEHOLDER = '<output>'
+
+CACHE_DIR = os.environ.get(
+    'PENTEST_TOOLKIT_RESULT_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'pentest-toolkit', 'results')
+)
+
+# (path, size, mtime_ns) -> sha256, so a wordlist is hashed once per process
+_file_digests = {}
+
+
+def file_digest(path):
+    """SHA-256 of an input file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    identity = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    if identity not in _file_digests:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                digest.update(chunk)
+        _file_digests[identity] = digest.hexdigest()
+    return _file_digests[identity]
+
+
+def remember_digest(path, digest):
+    """Register the known SHA-256 of a file, e.g. one written by the toolkit"""
+    st = os.stat(path)
+    _file_digests[(os.path.abspath(path), st.st_size, st.st_mtime_ns)] = digest
+
+
+def tool_version(tool):
+    """Version string of a tool; falls back to the binary's path and mtime"""
+    info = get_tool_info(tool)
+    return info.get('version') or f"{info.get('path')}@{info.get('mtime')}"
+
+
+class ResultCache:
+    """Stores tool output files under a hash of everything that determines them"""
+
+    def __init__(self, root=CACHE_DIR, ttl=DEFAULT_TTL, max_bytes=DEFAULT_MAX_BYTES, enabled=True):
+        self.root = root
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, tool, cmd, output_file, target, input_files=()):
+        """
+        Hash of the tool, its version, its arguments, the target and the
+        contents of input files. The output path is replaced by a
+        placeholder so the same scan into another directory still matches,
+        and input paths likewise, so a moved or copied input still matches.
+        """
+        inputs = {path: f"<input{i}>" for i, path in enumerate(input_files)}
+        args = [OUTPUT_PLACEHOLDER if arg == output_file else inputs.get(arg, arg) for arg in cmd[1:]]
+        material = {
+            'tool': tool,
+            'version': tool_version(tool),
+            'args': args,
+            'target': target,
+            'inputs': [file_digest(path) for path in input_files],
+        }
+        return hashlib.sha256(json.dumps(material, sort_keys=True).encode()).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def _read_meta(self, entry_dir):
+        try:
+            with open(os.path.join(entry_dir, 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, entry_dir, meta):
+        tmp_file = os.path.join(entry_dir, f"meta.json.tmp{os.getpid()}.{threading.get_ident()}")
+        with open(tmp_file, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_file, os.path.join(entry_dir, 'meta.json'))
+
+    def restore(self, key, output_file):
+        """Copy a fresh cached output to output_file; returns the entry's metadata or None"""
+        if not self.enabled:
+            return None
+        entry_dir = self._entry_dir(key)
+        meta = self._read_meta(entry_dir)
+        if meta is None or time.time() - meta['created'] > self.ttl:
+            if meta is not None:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+            self.misses += 1
+            return None
+        try:
+            shutil.copyfile(os.path.join(entry_dir, 'output'), output_file)
+        except OSError:
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            self.misses += 1
+            return None
+        meta['last_used'] = time.time()
+        self._write_meta(entry_dir, meta)
+        self.hits += 1
+        return meta
+
+    def store(self, key, output_file, tool, target):
+        """Add output_file to the cache under key, then enforce the size limit"""
+        if not self.enabled or not os.path.isfile(output_file):
+            return
+        entry_dir = self._entry_dir(key)
+        # Unique per thread: stores run in worker threads, possibly for the same key
+        tmp_dir = f"{entry_dir}.tmp{os.getpid()}.{threading.get_ident()}"
+        try:
+            os.makedirs(tmp_dir, exist_ok=True)
+            shutil.copyfile(output_file, os.path.join(tmp_dir, 'output'))
+            now = time.time()
+            self._write_meta(tmp_dir, {
+                'tool': tool,
+                'target': target,
+                'created': now,
+                'last_used': now,
+                'size': os.path.getsize(output_file),
+            })
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(tmp_dir, entry_dir)
+        except OSError as e:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            print(f"[-] Could not cache {tool} result: {str(e)}")
+            return
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then least recently used ones until under max_bytes"""
+        if not os.path.isdir(self.root):
+            return
+        now = time.time()
+        entries = []
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                entry_dir = os.path.join(shard_dir, name)
+                if '.tmp' in name:
+                    # Staging dir of a store in progress, here or in another
+                    # process; only one that has been sitting around is dropped
+                    try:
+                        if now - os.path.getmtime(entry_dir) > STALE_TMP_AGE:
+                            shutil.rmtree(entry_dir, ignore_errors=True)
+                    except OSError:
+                        pass
+                    continue
+                meta = self._read_meta(entry_dir)
+                if meta is None or now - meta['created'] > self.ttl:
+                    if meta is not None:
+                        shutil.rmtree(entry_dir, ignore_errors=True)
+                    continue
+                entries.append((meta['last_used'], meta['size'], entry_dir))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+
+    async def run(self, runner, cmd, output_file, target, input_files=(), label=None, **run_options):
+        """
+        Run cmd through runner unless an identical scan is cached.
+
+        On a hit the cached output is restored to output_file and the tool
+        is not started. Returns True if output_file holds a usable result.
+        Hashing inputs and copying cache entries run in a worker thread so
+        they do not stall the tools already running on the event loop.
+        """
+        tool = os.path.basename(cmd[0])
+        label = label or tool
+        key = None
+        if self.enabled:
+            key = await asyncio.to_thread(self.key, tool, cmd, output_file, target, input_files)
+        if key and await asyncio.to_thread(self.restore, key, output_file):
+            print(f"[+] Reusing cached {label} result for {target}")
+            return True
+
+        result = await runner.run(cmd, label=label, **run_options)
+        # ok ignores the exit code of tools run without check; only a clean,
+        # complete run is worth replaying
+        complete = (result.error is None and result.exit_code == 0
+                    and not result.timed_out and not result.stopped_at_deadline)
+        if complete and key:
+            await asyncio.to_thread(self.store, key, output_file, tool, target)
+        return result.ok
+
+
+_default_cache = None
+
+
+def get_cache():
+    """Process-wide result cache shared by all modules"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResultCache()
+    return _default_cache
+
+
+def set_cache(cache):
+    """Replace the process-wide result cache (e.g. with a configured TTL)"""
+    global _default_cache
+    _default_cache = cache
+    return cache
@@ -0,0 +1,250 @@
+"""
+Dependency-aware stage scheduler
+
+Runs independent assessment stages concurrently while honouring stage
+dependencies, per-class concurrency limits, named resources that only one
+stage may hold at a time, and exclusive stages that must run alone. With a
+run journal, every status change is recorded and stages that completed in
+an earlier attempt of the run are skipped.
+"""
+import asyncio
+import inspect
+import time
+
+# Maximum number of stages of each class that may run at the same time
+DEFAULT_CLASS_LIMITS = {
+    'web': 2,
+    'api': 1,
+    'network': 2,
+    'wireless': 1,
+    'password': 1,
+    'forensics': 1,
+    'exploitation': 2,
+    'social_engineering': 1,
+}
+
+
+class Stage:
+    """A single schedulable step of an assessment"""
+
+    def __init__(self, name, func, *args, stage_class='default', depends_on=(),
+                 resources=(), exclusive=False):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.stage_class = stage_class
+        self.depends_on = list(depends_on)
+        self.resources = sorted(set(resources))
+        self.exclusive = exclusive
+
+        self.status = 'pending'
+        self.resumed = False
+        self.result = None
+        self.error = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self):
+        if self.started is None or self.finished is None:
+            return 0.0
+        return self.finished - self.started
+
+    async def invoke(self):
+        """Run the stage callable, off the event loop if it is blocking"""
+        if inspect.iscoroutinefunction(self.func):
+            return await self.func(*self.args)
+        return await asyncio.to_thread(self.func, *self.args)
+
+
+class _ExclusiveGate:
+    """Admits any number of shared holders or a single exclusive holder"""
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._exclusive_waiting = 0
+
+    async def acquire(self, exclusive):
+        async with self._cond:
+            if exclusive:
+                self._exclusive_waiting += 1
+                await self._cond.wait_for(lambda: not self._exclusive and self._shared == 0)
+                self._exclusive_waiting -= 1
+                self._exclusive = True
+            else:
+                # Queued exclusive stages go first so they are not starved
+                await self._cond.wait_for(
+                    lambda: not self._exclusive and self._exclusive_waiting == 0)
+                self._shared += 1
+
+    async def release(self, exclusive):
+        async with self._cond:
+            if exclusive:
+                self._exclusive = False
+            else:
+                self._shared -= 1
+            self._cond.notify_all()
+
+
+class StageScheduler:
+    """Schedules stages concurrently and reports the time saved over a serial run"""
+
+    def __init__(self, class_limits=None, max_parallel=None, journal=None, journal_scope=''):
+        self.class_limits = dict(DEFAULT_CLASS_LIMITS)
+        if class_limits:
+            self.class_limits.update(class_limits)
+        self.max_parallel = max_parallel
+        # Stages recorded as completed in the journal are not run again
+        self.journal = journal
+        self.journal_scope = journal_scope
+        self.stages = []
+        self.elapsed = 0.0
+
+    def add(self, stage):
+        if any(s.name == stage.name for s in self.stages):
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        self.stages.append(stage)
+        return stage
+
+    def _validate(self):
+        names = {s.name: s for s in self.stages}
+        for stage in self.stages:
+            for dep in stage.depends_on:
+                if dep not in names:
+                    raise ValueError(f"Stage {stage.name} depends on unknown stage {dep}")
+
+        visiting, visited = set(), set()
+
+        def visit(stage):
+            if stage.name in visited:
+                return
+            if stage.name in visiting:
+                raise ValueError(f"Dependency cycle detected at stage {stage.name}")
+            visiting.add(stage.name)
+            for dep in stage.depends_on:
+                visit(names[dep])
+            visiting.discard(stage.name)
+            visited.add(stage.name)
+
+        for stage in self.stages:
+            visit(stage)
+
+    async def execute(self):
+        """Run every stage on the current event loop"""
+        self._validate()
+
+        self._done = {s.name: asyncio.Event() for s in self.stages}
+        self._by_name = {s.name: s for s in self.stages}
+        self._gate = _ExclusiveGate()
+        self._class_slots = {}
+        self._resource_locks = {}
+        self._global_slots = asyncio.Semaphore(self.max_parallel) if self.max_parallel else None
+
+        start = time.monotonic()
+        try:
+            await asyncio.gather(*(self._run_stage(s) for s in self.stages))
+        finally:
+            self.elapsed = time.monotonic() - start
+        return self.stages
+
+    def run(self):
+        """Run every stage to completion and return them"""
+        return asyncio.run(self.execute())
+
+    def _class_slot(self, stage_class):
+        if stage_class not in self._class_slots:
+            limit = max(1, self.class_limits.get(stage_class, 1))
+            self._class_slots[stage_class] = asyncio.Semaphore(limit)
+        return self._class_slots[stage_class]
+
+    def _resource_lock(self, resource):
+        if resource not in self._resource_locks:
+            self._resource_locks[resource] = asyncio.Lock()
+        return self._resource_locks[resource]
+
+    def _journal_key(self, stage):
+        return self.journal_scope + stage.name
+
+    def _record(self, stage):
+        if self.journal:
+            self.journal.record(self._journal_key(stage), stage)
+
+    async def _run_stage(self, stage):
+        try:
+            completed = self.journal and self.journal.completed(self._journal_key(stage))
+            if completed:
+                stage.status = 'done'
+                stage.resumed = True
+                stage.result = completed.get('result')
+                print(f"[*] Skipping stage {stage.name}: completed in an earlier attempt")
+                return
+
+            for dep in stage.depends_on:
+                await self._done[dep].wait()
+
+            failed = [d for d in stage.depends_on if self._by_name[d].status != 'done']
+            if failed:
+                stage.status = 'skipped'
+                print(f"[-] Skipping {stage.name}: dependency {', '.join(failed)} did not complete")
+                self._record(stage)
+                return
+
+            await self._gate.acquire(stage.exclusive)
+            try:
+                async with self._class_slot(stage.stage_class):
+                    if self._global_slots:
+                        await self._global_slots.acquire()
+                    try:
+                        locks = [self._resource_lock(r) for r in stage.resources]
+                        for lock in locks:
+                            await lock.acquire()
+                        try:
+                            await self._execute_stage(stage)
+                        finally:
+                            for lock in reversed(locks):
+                                lock.release()
+                    finally:
+                        if self._global_slots:
+                            self._global_slots.release()
+            finally:
+                await self._gate.release(stage.exclusive)
+        finally:
+            self._done[stage.name].set()
+
+    async def _execute_stage(self, stage):
+        print(f"[*] Starting stage {stage.name}")
+        stage.status = 'running'
+        stage.started = time.monotonic()
+        self._record(stage)
+        try:
+            stage.result = await stage.invoke()
+            stage.status = 'done'
+            print(f"[+] Stage {stage.name} completed")
+        except asyncio.CancelledError:
+            stage.status = 'cancelled'
+            raise
+        except Exception as e:
+            stage.status = 'failed'
+            stage.error = e
+            print(f"[-] Stage {stage.name} failed: {str(e)}")
+        finally:
+            stage.finished = time.monotonic()
+            self._record(stage)
+
+    def print_summary(self):
+        serial = sum(s.duration for s in self.stages)
+        saved = serial - self.elapsed
+
+        print("\n[+] Stage Timings:")
+        print(f"{'='*50}")
+        for stage in self.stages:
+            status = 'resumed' if stage.resumed else stage.status
+            print(f"{stage.name:<28} {status:<10} {stage.duration:>9.2f}s")
+        print(f"{'-'*50}")
+        print(f"Serial estimate: {serial:.2f} seconds")
+        print(f"Parallel wall-clock: {self.elapsed:.2f} seconds")
+        if serial > 0:
+            print(f"Time saved: {saved:.2f} seconds ({saved / serial * 100:.1f}%)")
+        print(f"{'='*50}")
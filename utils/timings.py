@@ -0,0 +1,33 @@
+"""
+Startup and phase timings reported by --timings
+"""
+import time
+from contextlib import contextmanager
+
+
+class Timings:
+    """Records how long each named phase of a run took"""
+
+    def __init__(self, start=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.phases = []
+
+    def record(self, name, seconds):
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def print_report(self, title='Startup Timings'):
+        print(f"\n[+] {title}:")
+        print(f"{'='*50}")
+        for name, seconds in self.phases:
+            print(f"{name:<36} {seconds * 1000:>10.1f} ms")
+        print(f"{'-'*50}")
+        print(f"{'Total since start':<36} {(time.perf_counter() - self.start) * 1000:>10.1f} ms")
+        print(f"{'='*50}")
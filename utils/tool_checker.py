@@ -1,34 +1,148 @@
 import subprocess
 import sys
 import os
+import re
+import json
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Required Kali Linux tools and the package that provides each of them
+TOOL_PACKAGES = {
+    'nmap': 'nmap',
+    'nikto': 'nikto',
+    'sqlmap': 'sqlmap',
+    'dirb': 'dirb',
+    'xsser': 'xsser',
+    'zaproxy': 'zaproxy',
+    'sslyze': 'sslyze',
+    'dnstwist': 'dnstwist',
+    'tcpdump': 'tcpdump',
+    'aircrack-ng': 'aircrack-ng',
+    'wifite': 'wifite2',
+    'john': 'john',
+    'hashcat': 'hashcat',
+    'volatility3': 'python3-volatility3',  # Updated package name
+    'autopsy': 'autopsy',
+    'metasploit-framework': 'metasploit-framework',
+    'searchsploit': 'exploitdb',  # Correct package name
+    'set': 'set',
+    'gophish': None  # Will be handled separately
+}
+
+# Arguments that make a tool print its version; tools not listed are not probed
+VERSION_PROBES = {
+    'nmap': ['--version'],
+    'nikto': ['-Version'],
+    'sqlmap': ['--version'],
+    'dirb': [],
+    'xsser': ['--version'],
+    'tcpdump': ['--version'],
+    'aircrack-ng': ['--help'],
+    'john': [],
+    'hashcat': ['--version'],
+}
+VERSION_PROBE_TIMEOUT = 10
+
+STATE_FILE = os.environ.get(
+    'PENTEST_TOOLKIT_STATE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'pentest-toolkit', 'tool_state.json')
+)
+
+# Tools resolved by this process; cache keys are computed from several worker threads
+_resolved_tools = None
+_resolve_lock = threading.Lock()
+
+def _load_state():
+    try:
+        with open(STATE_FILE) as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def _save_state(state):
+    try:
+        os.makedirs(os.path.dirname(STATE_FILE), exist_ok=True)
+        tmp_file = f"{STATE_FILE}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(tmp_file, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_file, STATE_FILE)
+    except OSError as e:
+        print(f"[-] Could not save tool state: {str(e)}")
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+def probe_version(path, args):
+    """Run a tool's version command and extract the version string"""
+    try:
+        result = subprocess.run([path] + args, capture_output=True, text=True,
+                                timeout=VERSION_PROBE_TIMEOUT, stdin=subprocess.DEVNULL)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    output = (result.stdout or '') + (result.stderr or '')
+    match = re.search(r'\d+(?:\.\d+)+[\w.+-]*', output)
+    if match:
+        return match.group(0)
+    lines = [line.strip() for line in output.splitlines() if line.strip()]
+    return lines[0][:80] if lines else None
+
+def resolve_tools(probe_versions=True):
+    """
+    Resolve every required tool to its path and version.
+
+    Binaries are looked up in-process on PATH. Versions come from the state
+    file and are only re-probed, in parallel, when PATH or the binary's
+    mtime changed since the last run.
+    """
+    path_env = os.environ.get('PATH', '')
+    state = _load_state()
+    cached = state.get('tools', {}) if state.get('path_env') == path_env else {}
+
+    tools, to_probe = {}, []
+    for tool in TOOL_PACKAGES:
+        entry = cached.get(tool)
+        if entry and entry.get('path') and _mtime(entry['path']) == entry.get('mtime'):
+            tools[tool] = entry
+            continue
+        path = shutil.which(tool)
+        tools[tool] = {'path': path, 'mtime': _mtime(path) if path else None, 'version': None}
+        if path and probe_versions and tool in VERSION_PROBES:
+            to_probe.append(tool)
+
+    if to_probe:
+        with ThreadPoolExecutor(max_workers=len(to_probe)) as executor:
+            versions = executor.map(lambda t: probe_version(tools[t]['path'], VERSION_PROBES[t]), to_probe)
+            for tool, version in zip(to_probe, versions):
+                tools[tool]['version'] = version
+
+    if tools != cached:
+        state['path_env'] = path_env
+        state['tools'] = tools
+        _save_state(state)
+    if probe_versions:
+        global _resolved_tools
+        _resolved_tools = tools
+    return tools
+
+def get_tool_info(tool):
+    """Path/version information for a single tool, resolved once per process"""
+    if _resolved_tools is None:
+        with _resolve_lock:
+            if _resolved_tools is None:
+                resolve_tools()
+    return _resolved_tools.get(tool) or {'path': shutil.which(tool), 'mtime': None, 'version': None}
 
 def check_required_tools():
     """Check if required Kali Linux tools are installed"""
-    tool_mapping = {
-        'nmap': 'nmap',
-        'nikto': 'nikto',
-        'sqlmap': 'sqlmap',
-        'dirb': 'dirb',
-        'xsser': 'xsser',
-        'zaproxy': 'zaproxy',
-        'sslyze': 'sslyze',
-        'dnstwist': 'dnstwist',
-        'tcpdump': 'tcpdump',
-        'aircrack-ng': 'aircrack-ng',
-        'wifite': 'wifite2',
-        'john': 'john',
-        'hashcat': 'hashcat',
-        'volatility3': 'python3-volatility3',  # Updated package name
-        'autopsy': 'autopsy',
-        'metasploit-framework': 'metasploit-framework',
-        'searchsploit': 'exploitdb',  # Correct package name
-        'set': 'set',
-        'gophish': None  # Will be handled separately
-    }
-    
+    tools = resolve_tools()
     missing_tools = []
-    for tool, package in tool_mapping.items():
-        if package and subprocess.run(['which', tool], capture_output=True).returncode != 0:
+    for tool, package in TOOL_PACKAGES.items():
+        if package and not tools[tool]['path']:
             missing_tools.append(package)
     
     return missing_tools
@@ -67,7 +181,7 @@ def install_special_tools():
 
     # Install Go if needed (for certain tools)
     try:
-        if subprocess.run(['which', 'go'], capture_output=True).returncode != 0:
+        if not shutil.which('go'):
             subprocess.run(['apt-get', 'install', '-y', 'golang'], check=True)
     except subprocess.CalledProcessError:
         print("Error installing Go")
@@ -87,8 +201,12 @@ def setup_environment():
                 '/usr/share/wordlists/rockyou.txt'
             ], check=True)
         
-        # Set up Metasploit database if needed
-        subprocess.run(['msfdb', 'init'], check=True)
+        # Set up Metasploit database once; msfdb init takes seconds on every run
+        state = _load_state()
+        if not state.get('msfdb_initialized') and shutil.which('msfdb'):
+            subprocess.run(['msfdb', 'init'], check=True)
+            state['msfdb_initialized'] = True
+            _save_state(state)
         
         return True
     except subprocess.CalledProcessError as e:
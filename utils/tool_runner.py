@@ -0,0 +1,309 @@
+"""
+Shared asynchronous tool runner
+
+Every module launches its external tools through a ToolRunner so that many
+tools can run at once from a single event loop. The runner streams output
+incrementally, enforces per-tool and global deadlines, kills the whole
+process group on timeout and records statistics for every invocation.
+"""
+import asyncio
+import os
+import signal
+import sys
+import time
+
+DEFAULT_TIMEOUT = 300  # 5 minutes
+KILL_GRACE_PERIOD = 5
+RSS_SAMPLE_INTERVAL = 0.5
+READ_CHUNK_SIZE = 64 * 1024
+
+
+class ToolResult:
+    """Outcome and resource usage of a single tool invocation"""
+
+    def __init__(self, tool, cmd):
+        self.tool = tool
+        self.cmd = list(cmd)
+        self.exit_code = None
+        self.duration = 0.0
+        self.peak_rss_kb = None
+        self.stdout_bytes = 0
+        self.stderr_bytes = 0
+        self.timed_out = False
+        self.stopped_at_deadline = False
+        self.error = None
+        self.check = False
+
+    @property
+    def output_bytes(self):
+        return self.stdout_bytes + self.stderr_bytes
+
+    @property
+    def ok(self):
+        if self.error is not None or self.timed_out:
+            return False
+        if self.stopped_at_deadline:
+            return True
+        return not self.check or self.exit_code == 0
+
+
+def _read_proc_status(pid):
+    values = {}
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                key, _, rest = line.partition(':')
+                if key in ('VmRSS', 'VmHWM'):
+                    values[key] = int(rest.split()[0])
+    except (OSError, ValueError, IndexError):
+        pass
+    return values
+
+
+def _proc_children(pid):
+    try:
+        with open(f'/proc/{pid}/task/{pid}/children') as f:
+            return [int(p) for p in f.read().split()]
+    except (OSError, ValueError):
+        return []
+
+
+def _sample_tree_rss(pid):
+    """Return (sum of VmRSS over the process tree, VmHWM of the leader) in kB"""
+    total, leader_hwm = 0, 0
+    stack, seen = [pid], set()
+    while stack:
+        current = stack.pop()
+        if current in seen:
+            continue
+        seen.add(current)
+        status = _read_proc_status(current)
+        total += status.get('VmRSS', 0)
+        if current == pid:
+            leader_hwm = status.get('VmHWM', 0)
+        stack.extend(_proc_children(current))
+    return total, leader_hwm
+
+
+def _kill_group(pid, sig):
+    try:
+        os.killpg(pid, sig)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+class RateLimiter:
+    """Token bucket limiting how many tools may be launched per second"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class ToolRunner:
+    """Runs external tools as asyncio subprocesses with deadlines and accounting"""
+
+    def __init__(self, default_timeout=DEFAULT_TIMEOUT, tool_timeouts=None, global_timeout=None,
+                 rate_limit=None):
+        self.default_timeout = default_timeout
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.limiter = RateLimiter(rate_limit) if rate_limit else None
+        self.deadline = None
+        if global_timeout:
+            self.set_global_timeout(global_timeout)
+        self.history = []
+
+    def set_global_timeout(self, seconds):
+        """Stop every tool once `seconds` have passed from now"""
+        self.deadline = time.monotonic() + seconds
+
+    def timeout_for(self, tool, timeout=None):
+        """Effective timeout for a tool, capped by the global deadline"""
+        if timeout is None:
+            timeout = self.tool_timeouts.get(tool, self.default_timeout)
+        if self.deadline is not None:
+            remaining = max(0.0, self.deadline - time.monotonic())
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        return timeout
+
+    async def run(self, cmd, timeout=None, stdout=None, stderr=None, check=False,
+                  expect_timeout=False, label=None, cwd=None, env=None):
+        """
+        Run cmd and stream its output.
+
+        stdout/stderr may be a path, a binary file object or a callable that
+        receives each chunk of bytes; by default output is echoed to the
+        terminal. With expect_timeout the tool is meant to be stopped by the
+        deadline (e.g. a timed capture), so reaching it is not an error.
+        """
+        tool = os.path.basename(cmd[0])
+        label = label or tool
+        result = ToolResult(tool, cmd)
+        result.check = check
+        self.history.append(result)
+
+        timeout = self.timeout_for(tool, timeout)
+        if timeout is not None and timeout <= 0:
+            result.error = 'global deadline reached before start'
+            print(f"[-] Skipping {label}: global deadline reached")
+            return result
+
+        if self.limiter:
+            await self.limiter.acquire()
+
+        start = time.monotonic()
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                env=env,
+                start_new_session=True  # own process group so it can be killed as a whole
+            )
+        except OSError as e:
+            result.error = str(e)
+            result.duration = time.monotonic() - start
+            print(f"[-] Error running {label}: {str(e)}")
+            return result
+
+        out_sink, out_close = _open_sink(stdout, sys.stdout)
+        err_sink, err_close = _open_sink(stderr, sys.stderr)
+        sampler = asyncio.create_task(self._sample_rss(process, result))
+        pumps = asyncio.gather(
+            _pump(process.stdout, out_sink, result, 'stdout_bytes'),
+            _pump(process.stderr, err_sink, result, 'stderr_bytes'),
+        )
+
+        try:
+            await asyncio.wait_for(_communicate(process, pumps), timeout)
+            result.exit_code = process.returncode
+        except asyncio.TimeoutError:
+            await self._terminate(process)
+            result.exit_code = process.returncode
+            if expect_timeout:
+                result.stopped_at_deadline = True
+            else:
+                result.timed_out = True
+                print(f"[-] {label} timed out after {timeout:.0f} seconds")
+        except asyncio.CancelledError:
+            await self._terminate(process)
+            raise
+        finally:
+            try:
+                await asyncio.wait_for(pumps, KILL_GRACE_PERIOD)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                pumps.cancel()
+            sampler.cancel()
+            result.duration = time.monotonic() - start
+            if out_close:
+                out_close()
+            if err_close:
+                err_close()
+
+        if check and not result.ok and not result.timed_out:
+            print(f"[-] Error running {label}: exit status {result.exit_code}")
+        return result
+
+    async def _terminate(self, process):
+        if process.returncode is not None:
+            return
+        _kill_group(process.pid, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(process.wait(), KILL_GRACE_PERIOD)
+        except asyncio.TimeoutError:
+            _kill_group(process.pid, signal.SIGKILL)
+            await process.wait()
+
+    async def _sample_rss(self, process, result):
+        if not os.path.isdir('/proc'):
+            return
+        peak = 0
+        while process.returncode is None:
+            total, leader_hwm = _sample_tree_rss(process.pid)
+            peak = max(peak, total, leader_hwm)
+            if peak:
+                result.peak_rss_kb = peak
+            await asyncio.sleep(RSS_SAMPLE_INTERVAL)
+
+    def print_summary(self):
+        if not self.history:
+            return
+        print("\n[+] Tool Invocations:")
+        print(f"{'='*70}")
+        print(f"{'Tool':<16} {'Exit':>5} {'Duration':>10} {'Peak RSS':>12} {'Output':>12}  Status")
+        for result in self.history:
+            rss = f"{result.peak_rss_kb / 1024:.1f} MB" if result.peak_rss_kb else '-'
+            if result.error:
+                status = 'error'
+            elif result.timed_out:
+                status = 'timeout'
+            else:
+                status = 'ok' if result.ok else 'failed'
+            exit_code = '-' if result.exit_code is None else result.exit_code
+            print(f"{result.tool:<16} {exit_code:>5} {result.duration:>9.2f}s {rss:>12} "
+                  f"{result.output_bytes:>10} B  {status}")
+        print(f"{'='*70}")
+
+
+def _open_sink(target, default_stream):
+    """Return (write callable, close callable or None) for an output target"""
+    if target is None:
+        stream = getattr(default_stream, 'buffer', default_stream)
+
+        def write(chunk):
+            stream.write(chunk)
+            stream.flush()
+        return write, None
+    if callable(target):
+        return target, None
+    if isinstance(target, (str, os.PathLike)):
+        f = open(target, 'wb')
+        return f.write, f.close
+    return target.write, target.flush
+
+
+async def _communicate(process, pumps):
+    await asyncio.shield(pumps)
+    await process.wait()
+
+
+async def _pump(stream, sink, result, counter):
+    while True:
+        chunk = await stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+        setattr(result, counter, getattr(result, counter) + len(chunk))
+        sink(chunk)
+
+
+_default_runner = None
+
+
+def get_runner():
+    """Process-wide runner shared by all modules"""
+    global _default_runner
+    if _default_runner is None:
+        _default_runner = ToolRunner()
+    return _default_runner
+
+
+def set_runner(runner):
+    """Replace the process-wide runner (e.g. with configured timeouts)"""
+    global _default_runner
+    _default_runner = runner
+    return runner
@@ -0,0 +1,331 @@
+"""
+Shared wordlist index
+
+Builds, once per wordlist version, a deduplicated copy of a wordlist with
+the most frequent words first and an offsets file for the start of every
+word. Tools are pointed at the deduplicated copy, workers can take
+non-overlapping shards of it, and several lists can be merged into one.
+
+A build never loads a list into Python memory: lines are streamed and
+spread over partition files by hash, each partition is deduplicated on its
+own and the sorted partitions are merged back with a k-way merge. The
+SHA-256 of the deduplicated copy is registered with the result cache, so
+cache keys do not have to hash the list again.
+"""
+import asyncio
+import hashlib
+import heapq
+import json
+import mmap
+import os
+import shutil
+import threading
+from array import array
+from bisect import bisect_right
+
+from .result_cache import remember_digest
+
+WORDLISTS = {
+    'passwords': '/usr/share/wordlists/rockyou.txt',
+    'web': '/usr/share/dirb/wordlists/common.txt',
+}
+
+CACHE_DIR = os.environ.get(
+    'PENTEST_TOOLKIT_WORDLISTS',
+    os.path.join(os.path.expanduser('~'), '.cache', 'pentest-toolkit', 'wordlists')
+)
+PARTITION_BYTES = 4 * 1024 * 1024  # source bytes per partition, bounds build memory
+MAX_PARTITIONS = 512
+MAX_WORD_LENGTH = 0xFFFF
+READ_BUFFER_SIZE = 1024 * 1024
+
+# Partition and run files hold int64 pairs: (line hash, offset << 16 |
+# length) while partitioning, (-count, offset << 16 | length) once sorted
+FLUSH_PAIRS = 65536
+BUFFER_PAIRS = 1024 * 1024  # pairs buffered over all partitions before writing
+
+
+def _identity(paths):
+    identity = []
+    for path in paths:
+        st = os.stat(path)
+        identity.append([os.path.abspath(path), st.st_size, st.st_mtime_ns])
+    return identity
+
+
+def index_id(paths):
+    """Identity of the index of a list of wordlists in their current version"""
+    return hashlib.sha256(json.dumps(_identity(paths)).encode()).hexdigest()[:32]
+
+
+def _iter_pairs(path):
+    with open(path, 'rb') as f:
+        while True:
+            pairs = array('q')
+            try:
+                pairs.fromfile(f, 2 * FLUSH_PAIRS)
+            except EOFError:
+                pass  # short last chunk, pairs holds what was read
+            if not pairs:
+                return
+            yield from zip(pairs[0::2], pairs[1::2])
+
+
+def _write_pairs(path, pairs):
+    with open(path, 'wb') as f:
+        array('q', pairs).tofile(f)
+
+
+def build_index(paths, index_dir):
+    """Write the deduplicated, frequency-sorted words of paths to index_dir"""
+    identity = _identity(paths)
+    bases = []
+    total = 0
+    for _, size, _ in identity:
+        bases.append(total)
+        total += size
+    partitions = min(MAX_PARTITIONS, total // PARTITION_BYTES + 1)
+
+    tmp_dir = f"{index_dir}.tmp{os.getpid()}.{threading.get_ident()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    try:
+        # 1. Spread every line over the partitions by its hash
+        part_files = [os.path.join(tmp_dir, f"part{i:03d}") for i in range(partitions)]
+        writers = [open(path, 'wb') for path in part_files]
+        buffers = [array('q') for _ in range(partitions)]
+        flush_at = 2 * max(2048, BUFFER_PAIRS // partitions)
+        lines = 0
+        try:
+            for base, path in zip(bases, paths):
+                offset = base
+                with open(path, 'rb', buffering=READ_BUFFER_SIZE) as f:
+                    for line in f:
+                        word = line.rstrip(b'\r\n')
+                        length = len(word)
+                        if word and length <= MAX_WORD_LENGTH:
+                            key = hash(word)
+                            pairs = buffers[key % partitions]
+                            pairs.append(key)
+                            pairs.append(offset << 16 | length)
+                            lines += 1
+                            if len(pairs) >= flush_at:
+                                pairs.tofile(writers[key % partitions])
+                                del pairs[:]
+                        offset += len(line)
+            for pairs, writer in zip(buffers, writers):
+                pairs.tofile(writer)
+        finally:
+            for writer in writers:
+                writer.close()
+        del buffers
+
+        # 2. Deduplicate each partition and sort it by frequency, then first occurrence
+        for part_file in part_files:
+            first = {}
+            counts = {}
+            for key, location in _iter_pairs(part_file):
+                if key in first:
+                    counts[key] = counts.get(key, 1) + 1
+                else:
+                    first[key] = location
+            run = sorted((-counts.get(key, 1), location) for key, location in first.items())
+            del first, counts
+            _write_pairs(part_file, (value for entry in run for value in entry))
+            del run
+
+        # 3. Merge the sorted runs into the words and offsets files
+        digest = hashlib.sha256()
+        words_file = os.path.join(tmp_dir, 'words.txt')
+        sources = []
+        try:
+            for path in paths:
+                f = open(path, 'rb')
+                sources.append((f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b''))
+            count = position = 0
+            offsets = array('Q')
+            with open(words_file, 'wb', buffering=READ_BUFFER_SIZE) as words, \
+                    open(os.path.join(tmp_dir, 'offsets.bin'), 'wb') as offsets_out:
+                for _, location in heapq.merge(*(_iter_pairs(path) for path in part_files)):
+                    offset, length = location >> 16, location & 0xFFFF
+                    source = bisect_right(bases, offset) - 1
+                    start = offset - bases[source]
+                    word = sources[source][1][start:start + length] + b'\n'
+                    words.write(word)
+                    digest.update(word)
+                    offsets.append(position)
+                    position += len(word)
+                    count += 1
+                    if len(offsets) >= 65536:
+                        offsets.tofile(offsets_out)
+                        offsets = array('Q')
+                offsets.append(position)  # end of the last word
+                offsets.tofile(offsets_out)
+        finally:
+            for f, buf in sources:
+                if buf:
+                    buf.close()
+                f.close()
+
+        for part_file in part_files:
+            os.remove(part_file)
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump({
+                'sources': identity,
+                'lines': lines,
+                'count': count,
+                'duplicates': lines - count,
+                'bytes': position,
+                'digest': digest.hexdigest(),
+            }, f)
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.replace(tmp_dir, index_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+class WordlistIndex:
+    """A built index: the deduplicated words file and the offset of every word"""
+
+    def __init__(self, index_dir):
+        self.index_dir = index_dir
+        with open(os.path.join(index_dir, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.path = os.path.join(index_dir, 'words.txt')
+        self.count = self.meta['count']
+        self.digest = self.meta['digest']
+        self._offsets = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def offsets(self):
+        """Offsets of all words plus the end of the file, memory-mapped"""
+        if self._offsets is None:
+            with open(os.path.join(self.index_dir, 'offsets.bin'), 'rb') as f:
+                self._offsets = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)).cast('Q')
+        return self._offsets
+
+    def shard_range(self, shard, shards):
+        """First and end word number of one of shards equal, non-overlapping slices"""
+        return self.count * shard // shards, self.count * (shard + 1) // shards
+
+    def iter_words(self, start=0, end=None):
+        """Yield the words from start to end as bytes"""
+        end = self.count if end is None else end
+        if start >= end:
+            return
+        offsets = self.offsets
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            for i in range(start, end):
+                yield buf[offsets[i]:offsets[i + 1] - 1]
+
+    def shard(self, shard, shards):
+        """Path of a file with one shard of the words, written on first use"""
+        path = os.path.join(self.index_dir, f"shard_{shard + 1}of{shards}.txt")
+        if not os.path.exists(path):
+            start, end = self.shard_range(shard, shards)
+            first, last = self.offsets[start], self.offsets[end]
+            tmp_file = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(self.path, 'rb') as src, open(tmp_file, 'wb') as dst:
+                src.seek(first)
+                remaining = last - first
+                while remaining:
+                    chunk = src.read(min(remaining, READ_BUFFER_SIZE))
+                    dst.write(chunk)
+                    remaining -= len(chunk)
+            os.replace(tmp_file, path)
+        return path
+
+    def copy_to(self, output_file):
+        shutil.copyfile(self.path, output_file)
+        return output_file
+
+
+class WordlistManager:
+    """Resolves named wordlists and builds each index once"""
+
+    def __init__(self, root=CACHE_DIR, lists=None):
+        self.root = root
+        self.lists = dict(WORDLISTS, **(lists or {}))
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def source(self, name):
+        """Path of a named wordlist; other names are taken as paths"""
+        return self.lists.get(name, name)
+
+    def index(self, *paths):
+        """Index of one wordlist, or of several merged; blocks while building"""
+        key = index_id(paths)
+        with self._lock:
+            if key not in self._indexes:
+                index_dir = os.path.join(self.root, key)
+                if not os.path.exists(os.path.join(index_dir, 'meta.json')):
+                    print(f"[*] Indexing wordlist {', '.join(paths)}...")
+                    os.makedirs(self.root, exist_ok=True)
+                    build_index(paths, index_dir)
+                    self._drop_stale(paths, key)
+                index = WordlistIndex(index_dir)
+                remember_digest(index.path, index.digest)
+                self._indexes[key] = index
+            return self._indexes[key]
+
+    def _drop_stale(self, paths, key):
+        """Remove indexes of earlier versions of the same lists"""
+        wanted = [os.path.abspath(path) for path in paths]
+        for name in os.listdir(self.root):
+            index_dir = os.path.join(self.root, name)
+            if name == key or not os.path.isdir(index_dir):
+                continue
+            try:
+                with open(os.path.join(index_dir, 'meta.json')) as f:
+                    sources = [source[0] for source in json.load(f)['sources']]
+            except (OSError, ValueError, KeyError):
+                continue
+            if sources == wanted:
+                shutil.rmtree(index_dir, ignore_errors=True)
+
+    def merge(self, paths, output_file):
+        """Write the words of several lists to output_file, duplicates removed"""
+        return self.index(*paths).copy_to(output_file)
+
+    async def path(self, name):
+        """
+        Path of the deduplicated copy of a wordlist for a tool to read, or
+        of the list itself if it cannot be indexed.
+        """
+        source = self.source(name)
+        if not os.path.isfile(source):
+            return source
+        try:
+            index = await asyncio.to_thread(self.index, source)
+        except OSError as e:
+            print(f"[-] Could not index wordlist {source}: {str(e)}")
+            return source
+        return index.path
+
+    async def shard(self, name, shard, shards):
+        """Path of one of shards non-overlapping slices of a wordlist"""
+        index = await asyncio.to_thread(self.index, self.source(name))
+        return await asyncio.to_thread(index.shard, shard, shards)
+
+
+_default_manager = None
+
+
+def get_wordlists():
+    """Process-wide wordlist manager shared by all modules"""
+    global _default_manager
+    if _default_manager is None:
+        _default_manager = WordlistManager()
+    return _default_manager
+
+
+def set_wordlists(manager):
+    """Replace the process-wide wordlist manager (e.g. with other lists)"""
+    global _default_manager
+    _default_manager = manager
+    return manager